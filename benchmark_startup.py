@@ -0,0 +1,109 @@
+"""
+benchmark_startup.py
+
+Measures the cold import time of main.py and of each heavy module it can pull
+in. Every module is imported in a fresh Python interpreter, so the numbers are
+what a new container / worker process pays for that import alone.
+
+Usage:
+    python benchmark_startup.py                 # default module list, 3 repeats
+    python benchmark_startup.py --repeat 5 --csv output/metrics/startup.csv
+    python benchmark_startup.py idf_creation cal.unified_surrogate
+"""
+
+import os
+import sys
+import csv
+import argparse
+import subprocess
+import statistics
+
+DEFAULT_MODULES = [
+    "main",
+    "pandas",
+    "excel_overrides",
+    "idf_objects.fenez.fenez_config_manager",
+    "geomeppy",
+    "Lookups.data_materials_residential",
+    "Lookups.data_materials_non_residential",
+    "idf_creation",
+    "main_modifi",
+    "validation.main_validation",
+    "cal.unified_sensitivity",
+    "cal.unified_surrogate",
+    "cal.unified_calibration",
+    "database_handler"
+]
+
+_TIMER_SNIPPET = (
+    "import time; t0 = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t0)"
+)
+
+
+def time_cold_import(module, repo_root):
+    """
+    Returns the import time of `module` (seconds) in a fresh interpreter,
+    or None if the import failed (e.g. optional dependency not installed).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", _TIMER_SNIPPET.format(module=module)],
+        cwd=repo_root,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        print(f"[WARN] import {module} failed: {last_line}")
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(modules, repeat=3):
+    repo_root = os.path.dirname(os.path.abspath(__file__))
+    rows = []
+    for module in modules:
+        samples = []
+        for _ in range(repeat):
+            t = time_cold_import(module, repo_root)
+            if t is None:
+                break
+            samples.append(t)
+        rows.append({
+            "module": module,
+            "ok": bool(samples) and len(samples) == repeat,
+            "median_s": round(statistics.median(samples), 4) if samples else None,
+            "min_s": round(min(samples), 4) if samples else None,
+            "max_s": round(max(samples), 4) if samples else None
+        })
+    return rows
+
+
+def print_table(rows):
+    print(f"{'module':45s} {'median_s':>9s} {'min_s':>9s} {'max_s':>9s}")
+    for r in rows:
+        if not r["ok"]:
+            print(f"{r['module']:45s} {'failed':>9s}")
+            continue
+        print(f"{r['module']:45s} {r['median_s']:9.4f} {r['min_s']:9.4f} {r['max_s']:9.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold import-time benchmark per module.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--csv", default=None, help="Optional CSV output path.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.modules, repeat=args.repeat)
+    print_table(results)
+
+    if args.csv:
+        folder = os.path.dirname(args.csv)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["module", "ok", "median_s", "min_s", "max_s"])
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"[INFO] Wrote {args.csv}")
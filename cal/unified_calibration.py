@@ -42,12 +42,15 @@ except ImportError:
 # For Surrogate usage
 import joblib
 
+from metrics import timed, add_items
+
 ###############################################################################
-# 0) Global placeholders for loaded Surrogate + Real Data
+# 0) Cache for loaded Surrogate + Real Data
+#    run_unified_calibration(..., run_context=ctx) uses ctx.cache, so
+#    concurrent runs keep their own surrogate / real data. Callers without a
+#    RunContext share this module-level fallback.
 ###############################################################################
-MODEL_SURROGATE = None
-MODEL_COLUMNS   = None
-REAL_DATA_DICT  = None
+_DEFAULT_CACHE = {}
 
 ###############################################################################
 # 1) ParamSpec
@@ -226,32 +229,39 @@ def build_param_specs_from_scenario(
 # 4) Evaluate param_dict => surrogate or E+
 ###############################################################################
 
-def load_surrogate_once(model_path: str, columns_path: str):
+def load_surrogate_once(model_path: str, columns_path: str, cache: Optional[dict] = None):
     """
-    Loads the surrogate model and column list into global variables if not loaded yet.
-    Adjust as needed if you have multiple surrogates or different model paths.
+    Loads the surrogate model and column list into the cache if not loaded yet.
+    Returns (model, columns). Entries are keyed by path, so different surrogates
+    can live in the same cache.
     """
-    global MODEL_SURROGATE, MODEL_COLUMNS
-    if MODEL_SURROGATE is None or MODEL_COLUMNS is None:
+    if cache is None:
+        cache = _DEFAULT_CACHE
+    key = ("surrogate", model_path, columns_path)
+    if key not in cache:
         print(f"[INFO] Loading surrogate => {model_path} / {columns_path}")
-        MODEL_SURROGATE = joblib.load(model_path)
-        MODEL_COLUMNS   = joblib.load(columns_path)
+        cache[key] = (joblib.load(model_path), joblib.load(columns_path))
+    return cache[key]
 
 
-def load_real_data_once(real_csv: str):
+def load_real_data_once(real_csv: str, cache: Optional[dict] = None):
     """
     You can interpret your real_data_csv and store it as a dictionary 
     if you have multiple scenario_index or building IDs. For this example, 
     we store a single usage or a dict with a single key.
+    Returns the real data dict (cached per real_csv).
     """
-    global REAL_DATA_DICT
-    if REAL_DATA_DICT is None:
+    if cache is None:
+        cache = _DEFAULT_CACHE
+    key = ("real_data", real_csv)
+    if key not in cache:
         print(f"[INFO] Loading real data => {real_csv}")
         # Example approach: read the entire CSV, sum or do something
         df = pd.read_csv(real_csv)
         # We'll just store a single number or store a dict of building-> usage
         # For demonstration, do a single building => buildingID=0 => usage= 1.23e7
-        REAL_DATA_DICT = {0: 1.23e7}
+        cache[key] = {0: 1.23e7}
+    return cache[key]
 
 
 def transform_calib_name_to_surrogate_col(full_name: str) -> str:
@@ -272,14 +282,13 @@ def transform_calib_name_to_surrogate_col(full_name: str) -> str:
     return full_name
 
 
-def build_feature_row_from_param_dict(param_dict: Dict[str, float]) -> pd.DataFrame:
+def build_feature_row_from_param_dict(param_dict: Dict[str, float], model_columns: List[str]) -> pd.DataFrame:
     """
-    1) We have a list of columns the surrogate expects => MODEL_COLUMNS
+    1) We have a list of columns the surrogate expects => model_columns
     2) param_dict keys are e.g. "scenario_params_dhw.csv:dhw.setpoint_c_VAL" => 58.0
     3) Map them => "dhw.setpoint_c" => 58.0
     """
-    global MODEL_COLUMNS
-    row_dict = {col: 0.0 for col in MODEL_COLUMNS}
+    row_dict = {col: 0.0 for col in model_columns}
 
     for k, v in param_dict.items():
         short_k = transform_calib_name_to_surrogate_col(k)
@@ -289,7 +298,7 @@ def build_feature_row_from_param_dict(param_dict: Dict[str, float]) -> pd.DataFr
     return pd.DataFrame([row_dict])
 
 
-def predict_error_with_surrogate(param_dict: Dict[str, float], config: dict) -> float:
+def predict_error_with_surrogate(param_dict: Dict[str, float], config: dict, cache: Optional[dict] = None) -> float:
     """
     1) load surrogate if not loaded
     2) build feature row
@@ -300,18 +309,18 @@ def predict_error_with_surrogate(param_dict: Dict[str, float], config: dict) ->
     columns_path= config.get("surrogate_columns_path","heating_surrogate_columns.joblib")
     real_csv    = config.get("real_data_csv", "")
 
-    load_surrogate_once(model_path, columns_path)
-    load_real_data_once(real_csv)
+    model, model_columns = load_surrogate_once(model_path, columns_path, cache)
+    real_data = load_real_data_once(real_csv, cache)
 
-    df_sample = build_feature_row_from_param_dict(param_dict)
-    preds = MODEL_SURROGATE.predict(df_sample)
+    df_sample = build_feature_row_from_param_dict(param_dict, model_columns)
+    preds = model.predict(df_sample)
 
     # If single-output => preds is shape (1,)
     predicted_usage = preds[0] if len(preds.shape)==1 else preds[0,0]
 
     # Retrieve real usage. Here we just pick buildingID=0
     # If you have multiple buildingIDs => param_dict might contain scenario_index
-    real_usage = REAL_DATA_DICT[0]
+    real_usage = real_data[0]
 
     # error measure => absolute difference
     error = abs(predicted_usage - real_usage)
@@ -329,14 +338,15 @@ def run_energyplus_and_compute_error(param_dict: Dict[str, float], config: dict)
     return error
 
 
-def simulate_or_surrogate(param_dict: Dict[str, float], config: dict) -> float:
+def simulate_or_surrogate(param_dict: Dict[str, float], config: dict, cache: Optional[dict] = None) -> float:
     """
     If config["use_surrogate"] => call surrogate
     else => re-run E+
+    cache: per-run cache (RunContext.cache); None => module-level cache
     """
     use_sur = config.get("use_surrogate", False)
     if use_sur:
-        return predict_error_with_surrogate(param_dict, config)
+        return predict_error_with_surrogate(param_dict, config, cache)
     else:
         return run_energyplus_and_compute_error(param_dict, config)
 
@@ -610,11 +620,15 @@ def save_best_params_separately(
 # 7) Master function => run_unified_calibration
 ###############################################################################
 
-def run_unified_calibration(calibration_config: dict):
+@timed("cal.run_unified_calibration")
+def run_unified_calibration(calibration_config: dict, run_context=None):
     """
     Example usage from main.py:
       if cal_cfg.get("perform_calibration", False):
-          run_unified_calibration(cal_cfg)
+          run_unified_calibration(cal_cfg, run_context=ctx)
+
+    run_context: optional RunContext; its .cache holds the loaded surrogate
+    and real data for this run only.
 
     The calibration_config can have keys like:
     {
@@ -660,8 +674,10 @@ def run_unified_calibration(calibration_config: dict):
     param_specs = build_param_specs_from_scenario(df_scen, calibrate_min_max=calibrate_mm)
 
     # 4) define local eval function
+    cache = run_context.cache if run_context is not None else None
+
     def local_eval_func(pdict: Dict[str, float]) -> float:
-        return simulate_or_surrogate(pdict, calibration_config)
+        return simulate_or_surrogate(pdict, calibration_config, cache)
 
     # 5) run method
     if method == "random":
@@ -683,6 +699,7 @@ def run_unified_calibration(calibration_config: dict):
         raise ValueError(f"Unknown calibration method: {method}")
 
     print(f"[CAL] Method={method}, Best error={best_err:.3f}, best_params={best_params}")
+    add_items(len(history))  # number of evaluations
 
     # 6) Save history
     hist_path = os.path.join(hist_dir, output_hist_csv)
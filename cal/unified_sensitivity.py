@@ -18,6 +18,8 @@ import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional, Union, List
 
+from metrics import timed, add_items
+
 # Attempt SALib imports
 try:
     from SALib.sample import morris as morris_sample
@@ -458,6 +460,7 @@ def run_sobol_method(params_meta: pd.DataFrame, simulate_func, n_samples=256):
 ###############################################################################
 # 6) MAIN ORCHESTRATION
 ###############################################################################
+@timed("cal.run_sensitivity_analysis")
 def run_sensitivity_analysis(
     scenario_folder: str,
     method: str = "morris",
@@ -488,6 +491,7 @@ def run_sensitivity_analysis(
     if df_params.empty:
         print("[WARNING] No numeric scenario parameters => no analysis.")
         return
+    add_items(len(df_params))
 
     # 2) If correlation-based
     if method.lower() == "correlation":
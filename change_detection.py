@@ -0,0 +1,279 @@
+"""
+change_detection.py
+
+Per-building fingerprints for incremental re-runs.
+
+After a successful run, a fingerprint of every building is stored in
+<output_root>/building_fingerprints.json. It is a hash of:
+  - the building's row (all columns of the CSV / load_buildings_from_db),
+  - the user override entries that can apply to it (geometry, lighting, DHW,
+    HVAC, ventilation, EPW) and its fenestration data entry,
+  - the EPW file it is simulated with (path, size, mtime),
+  - the run settings (scenario, calibration stage, strategy, seed, format),
+  - the code version (content hash of the IDF-creation sources) and any
+    extra input files (e.g. the Excel override workbooks).
+
+On the next run, a building whose fingerprint and DataFrame index are
+unchanged (and whose IDF is still on disk) is neither re-created nor re-simulated; its previous
+parameter log rows and simulation CSV are reused.
+
+Each record also holds one fingerprint per IDF module (idf_patching.py):
+the building row, run settings and core code, plus that module's own
+overrides and sources. changed_modules() lists the modules whose inputs
+changed, so the existing IDF can be patched instead of rebuilt.
+
+Override entries are matched conservatively: an entry is only ruled out for a
+building when its building_id or age_range says so. A changed type-specific
+override may therefore re-run more buildings than needed, never too few.
+
+Usage:
+    fps = BuildingFingerprints(run_context.path("building_fingerprints.json"))
+    current = fps.compute(df_buildings, settings, override_configs, ...)
+    unchanged = fps.unchanged(current, require_simulated=True)
+    fps.save(current, only_ids=<ogc_fids reused>)   # before changing anything
+    ...
+    fps.save(current, simulated=True)
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+from idf_objects.other.archetypes import compute_model_fingerprint
+from idf_patching import IDF_MODULES, MODULE_CODE_PATHS, CORE_CODE_PATHS
+
+# Folders / files whose Python sources define the generated model
+CODE_PATHS = ["idf_objects", "epw", "Lookups", "idf_creation.py", "rng_streams.py"]
+
+# Columns added by the pipeline itself
+IGNORE_COLUMNS = ["idf_name", "model_fingerprint"]
+
+# IDF module => its entry of override_lists (fenez: the fenestration data entry)
+MODULE_OVERRIDES = {
+    "geometry": "geometry",
+    "lighting": "lighting",
+    "dhw": "dhw",
+    "hvac": "hvac",
+    "vent": "vent",
+    "outputdef": "outputdef"
+}
+
+_CODE_VERSION = {}
+
+
+def code_version(paths=None, base_dir=None):
+    """
+    SHA-256 over the content of every .py file under paths (relative to
+    base_dir, default: this file's folder). Cached per process.
+    """
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    key = (base_dir, tuple(paths or CODE_PATHS))
+    if key in _CODE_VERSION:
+        return _CODE_VERSION[key]
+
+    files = []
+    for rel in key[1]:
+        path = os.path.join(base_dir, rel)
+        if os.path.isfile(path):
+            files.append(path)
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files += [os.path.join(root, n) for n in sorted(names) if n.endswith(".py")]
+
+    h = hashlib.sha256()
+    for path in files:
+        h.update(os.path.relpath(path, base_dir).encode("utf-8"))
+        with open(path, "rb") as f:
+            h.update(f.read())
+    _CODE_VERSION[key] = h.hexdigest()
+    return _CODE_VERSION[key]
+
+
+def files_digest(paths):
+    """(path, size, mtime) digest of input files; missing files count too."""
+    h = hashlib.sha256()
+    for path in sorted(set(p for p in paths or [] if p)):
+        h.update(path.encode("utf-8"))
+        if os.path.isfile(path):
+            st = os.stat(path)
+            h.update(f"|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+        else:
+            h.update(b"|<missing>")
+    return h.hexdigest()
+
+
+def _digest(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def override_applies(entry, building_row):
+    """
+    False only if the entry's building_id or age_range rules the building out.
+    """
+    if not isinstance(entry, dict):
+        return True
+    if entry.get("building_id") is not None:
+        ids = entry["building_id"] if isinstance(entry["building_id"], list) else [entry["building_id"]]
+        if str(building_row.get("ogc_fid")) not in {str(i) for i in ids}:
+            return False
+    age = entry.get("age_range")
+    if age is not None and building_row.get("age_range") is not None:
+        if str(age) != str(building_row.get("age_range")):
+            return False
+    return True
+
+
+def applicable_overrides(building_row, override_lists):
+    """
+    {name: [entries that may apply]} for each list of override rows.
+    """
+    result = {}
+    for name, entries in override_lists.items():
+        if not entries:
+            continue
+        if isinstance(entries, dict):
+            entries = [entries]
+        result[name] = [e for e in entries if override_applies(e, building_row)]
+    return result
+
+
+def fenez_entry(building_row, res_data, nonres_data, scenario, calibration_stage):
+    """The fenestration data entry used for this building (or None)."""
+    if str(building_row.get("building_function", "residential")).lower() == "residential":
+        data = res_data or {}
+        bldg_type = str(building_row.get("residential_type", "")).strip()
+    else:
+        data = nonres_data or {}
+        bldg_type = str(building_row.get("non_residential_type", "")).strip()
+    key = (bldg_type, str(building_row.get("age_range", "2015 and later")), str(scenario), str(calibration_stage))
+    return data.get(key)
+
+
+def epw_digest(epw_path):
+    if not epw_path:
+        return None
+    if os.path.isfile(epw_path):
+        st = os.stat(epw_path)
+        return f"{epw_path}|{st.st_size}|{st.st_mtime_ns}"
+    return f"{epw_path}|<missing>"
+
+
+class BuildingFingerprints:
+    """
+    path : str
+        JSON file {ogc_fid: {"idx": building index, "fp": fingerprint,
+        "simulated": bool}}.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    self.previous = json.load(f)
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f"[change_detection] Ignoring unreadable fingerprints {path}: {e}"
+                )
+
+    def compute(self, df_buildings, settings, override_lists=None, res_data=None, nonres_data=None,
+                user_config_epw=None, extra_input_paths=None):
+        """
+        Fingerprints of all rows of df_buildings.
+
+        settings : dict
+            Run settings (scenario, calibration_stage, strategy, random_seed, output_format).
+        override_lists : dict
+            {"geometry": user_config_geom, "lighting": ..., "epw": user_config_epw,
+             "outputdef": output_definitions, ...}
+        """
+        from epw.assign_epw_file import assign_epw_for_building_with_overrides
+
+        shared = {
+            k: str(v) for k, v in settings.items()
+        }
+        shared["code_version"] = code_version()
+        shared["extra_inputs"] = files_digest(extra_input_paths)
+
+        core = {k: str(v) for k, v in settings.items()}
+        core["code_version"] = code_version(CORE_CODE_PATHS)
+        core["extra_inputs"] = shared["extra_inputs"]
+        module_code = {m: code_version(MODULE_CODE_PATHS[m]) for m in IDF_MODULES}
+
+        current = {}
+        for idx, row in df_buildings.iterrows():
+            bldg_id = row.get("ogc_fid", idx)
+            epw_path = assign_epw_for_building_with_overrides(row, user_config_epw=user_config_epw)
+            overrides = applicable_overrides(row, override_lists or {})
+            fenez = _digest(fenez_entry(
+                row, res_data, nonres_data,
+                settings.get("scenario"), settings.get("calibration_stage")
+            ))
+            building_settings = dict(
+                shared,
+                overrides=_digest(overrides),
+                fenez=fenez,
+                epw=epw_digest(epw_path)
+            )
+            row_fp = compute_model_fingerprint(row, core, ignore_columns=IGNORE_COLUMNS)
+            modules = {}
+            for module in IDF_MODULES:
+                inputs = fenez if module == "fenez" else _digest(overrides.get(MODULE_OVERRIDES.get(module)))
+                modules[module] = _digest([row_fp, module_code[module], inputs])
+            current[str(bldg_id)] = {
+                "idx": int(idx) if hasattr(idx, "__int__") else str(idx),
+                "fp": compute_model_fingerprint(row, building_settings, ignore_columns=IGNORE_COLUMNS),
+                "modules": modules
+            }
+        return current
+
+    def unchanged(self, current, require_simulated=False):
+        """
+        Building indices whose fingerprint and index match the stored ones.
+        require_simulated: also require that the stored run simulated them.
+        """
+        indices = set()
+        for bldg_id, rec in current.items():
+            prev = self.previous.get(bldg_id)
+            if prev is None or prev.get("fp") != rec["fp"] or prev.get("idx") != rec["idx"]:
+                continue
+            if require_simulated and not prev.get("simulated", False):
+                continue
+            indices.add(rec["idx"])
+        return indices
+
+    def changed_modules(self, current):
+        """
+        {building index: [modules whose fingerprint changed]} for buildings
+        stored with module fingerprints under the same index. An empty list
+        means the model itself is unchanged (e.g. only the EPW changed).
+        """
+        changed = {}
+        for bldg_id, rec in current.items():
+            prev = self.previous.get(bldg_id)
+            if prev is None or prev.get("idx") != rec["idx"] or "modules" not in prev:
+                continue
+            changed[rec["idx"]] = [
+                m for m, fp in rec["modules"].items() if prev["modules"].get(m) != fp
+            ]
+        return changed
+
+    def save(self, current, simulated=False, only_ids=None):
+        """
+        Stores the fingerprints of current (only of only_ids, if given).
+        Call with only_ids=<reused buildings> before a run changes anything,
+        so an interrupted run never leaves stale fingerprints behind.
+        """
+        if only_ids is not None:
+            records = {k: self.previous[k] for k in only_ids if k in self.previous}
+        else:
+            records = {k: dict(v, simulated=simulated) for k, v in current.items()}
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, self.path)
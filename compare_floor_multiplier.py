@@ -0,0 +1,225 @@
+"""
+compare_floor_multiplier.py
+
+Accuracy check of the floor-multiplier reduced geometry
+(idf_creation.geometry.floor_multiplier). The geometry check in the geometry
+log only compares floor and wall areas, which are 1.0 whenever the reduced
+model is built correctly; it says nothing about the simulated energy use.
+
+This script builds the same set of 6-12 storey blocks twice, once with every
+floor modeled and once as ground + multiplied middle + top floor, simulates
+both with EnergyPlus and compares annual totals of the selected meters:
+
+    error = (reduced - full) / full
+
+Both runs use strategy "A" (range midpoints) and the same seed, so apart from
+the geometry they get identical parameters.
+
+Usage:
+    python compare_floor_multiplier.py --epw epw/Amsterdam.epw
+    python compare_floor_multiplier.py --epw my.epw --floors 6 9 12 --footprints 20x30 15x60
+    python compare_floor_multiplier.py --epw my.epw --csv output/metrics/floor_multiplier_check.csv
+"""
+
+import os
+import csv
+import json
+import argparse
+from multiprocessing import Pool
+
+import pandas as pd
+
+from epw.run_epw_sims import run_simulation
+from idf_creation import create_idfs_for_all_buildings
+from idf_objects.fenez.fenez_config_manager import build_fenez_config
+from run_context import RunContext
+
+DEFAULT_METERS = ["Heating:EnergyTransfer", "Cooling:EnergyTransfer", "Electricity:Facility"]
+
+
+def make_blocks(floors, footprints, building_function="residential", floor_height=3.0):
+    """One building row per (floors, width x length footprint)."""
+    rows = []
+    for n_floors in floors:
+        for width, length in footprints:
+            rows.append({
+                "ogc_fid": len(rows) + 1,
+                "area": width * length,
+                "perimeter": 2 * (width + length),
+                "gem_bouwlagen": n_floors,
+                "gem_hoogte": n_floors * floor_height,
+                "age_range": "1965-1974",
+                "building_function": building_function,
+                "residential_type": "Apartment",
+                "non_residential_type": "Office Function",
+                "north_side": "facade",
+                "east_side": "facade",
+                "south_side": "facade",
+                "west_side": "facade",
+                "building_orientation": 0.0,
+                "width": width,
+                "length": length
+            })
+    return pd.DataFrame(rows)
+
+
+def build_models(df_blocks, run_context, idf_cfg, res_data, nonres_data, meters, reduced, min_floors):
+    create_idfs_for_all_buildings(
+        df_buildings=df_blocks,
+        scenario=idf_cfg.get("scenario", "scenario1"),
+        calibration_stage=idf_cfg.get("calibration_stage", "pre_calibration"),
+        strategy="A",
+        random_seed=idf_cfg.get("random_seed", 42),
+        res_data=res_data,
+        nonres_data=nonres_data,
+        output_definitions={
+            "desired_variables": [],
+            "desired_meters": meters,
+            "override_variable_frequency": "Hourly",
+            "override_meter_frequency": "Hourly",
+            "include_tables": False,
+            "include_summary": False
+        },
+        run_simulations=False,
+        post_process=False,
+        run_context=run_context,
+        journal_config={"enabled": False},
+        geometry_config={
+            "precompute": True,
+            "skip_infeasible": True,
+            "floor_multiplier": {"enabled": reduced, "min_floors": min_floors}
+        }
+    )
+
+
+def annual_totals(csv_path, meters):
+    """{meter: annual sum} of one simulation_bldg<N>.csv."""
+    df = pd.read_csv(csv_path)
+    totals = {}
+    for meter in meters:
+        cols = [c for c in df.columns if c.startswith(meter)]
+        totals[meter] = float(df[cols[0]].sum()) if cols else None
+    return totals
+
+
+def run_comparison(epw, iddfile, idf_file_path, out_root, floors, footprints,
+                   building_function="residential", min_floors=4, meters=None, workers=1,
+                   idf_cfg=None, res_data=None, nonres_data=None):
+    meters = meters or DEFAULT_METERS
+    idf_cfg = idf_cfg or {}
+    df_blocks = make_blocks(floors, footprints, building_function)
+
+    tasks = []
+    contexts = {}
+    for variant in ("full", "reduced"):
+        ctx = RunContext(
+            run_id=f"floor_multiplier_{variant}",
+            iddfile=iddfile,
+            idf_file_path=idf_file_path,
+            output_root=os.path.join(out_root, variant)
+        )
+        contexts[variant] = ctx
+        build_models(df_blocks, ctx, idf_cfg, res_data, nonres_data, meters,
+                     reduced=(variant == "reduced"), min_floors=min_floors)
+        for idx in df_blocks.index:
+            idf_path = os.path.join(ctx.idf_output_dir, f"building_{idx}.idf")
+            tasks.append((idf_path, epw, iddfile, ctx.sim_results_dir, idx))
+
+    with Pool(workers) as pool:
+        codes = pool.map(run_simulation, tasks)
+    failed = [t[0] for t, code in zip(tasks, codes) if code != 0]
+    for path in failed:
+        print(f"[WARN] simulation failed: {path}")
+
+    rows = []
+    for idx, block in df_blocks.iterrows():
+        results = {}
+        for variant, ctx in contexts.items():
+            csv_path = os.path.join(ctx.sim_results_dir, f"simulation_bldg{idx}.csv")
+            results[variant] = annual_totals(csv_path, meters) if os.path.isfile(csv_path) else {}
+        for meter in meters:
+            full = results["full"].get(meter)
+            reduced = results["reduced"].get(meter)
+            rows.append({
+                "building": idx,
+                "floors": int(block["gem_bouwlagen"]),
+                "footprint": f"{block['width']:g}x{block['length']:g}",
+                "meter": meter,
+                "full": full,
+                "reduced": reduced,
+                "error": round((reduced - full) / full, 6) if full and reduced is not None else None
+            })
+    return rows
+
+
+def print_table(rows):
+    print(f"{'floors':>6s} {'footprint':>10s} {'meter':25s} {'full':>14s} {'reduced':>14s} {'error':>9s}")
+    for r in rows:
+        if r["error"] is None:
+            print(f"{r['floors']:6d} {r['footprint']:>10s} {r['meter']:25s} {'n/a':>14s} {'n/a':>14s} {'n/a':>9s}")
+            continue
+        print(f"{r['floors']:6d} {r['footprint']:>10s} {r['meter']:25s} "
+              f"{r['full']:14.4g} {r['reduced']:14.4g} {r['error']:9.2%}")
+    errors = [abs(r["error"]) for r in rows if r["error"] is not None]
+    if errors:
+        print(f"[INFO] max |error| = {max(errors):.2%} over {len(errors)} comparisons")
+
+
+def _footprint(text):
+    width, length = text.lower().split("x")
+    return float(width), float(length)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full vs floor-multiplier geometry, simulated with EnergyPlus.")
+    parser.add_argument("--epw", required=True, help="Weather file for all simulations.")
+    parser.add_argument("--config", default=os.path.join("user_configs", "main_config.json"))
+    parser.add_argument("--floors", type=int, nargs="+", default=[6, 8, 10, 12])
+    parser.add_argument("--footprints", type=_footprint, nargs="+", default=[(20.0, 30.0), (15.0, 60.0)],
+                        help="width x length in m, e.g. 20x30")
+    parser.add_argument("--function", default="residential", choices=["residential", "non_residential"])
+    parser.add_argument("--min-floors", type=int, default=4)
+    parser.add_argument("--meters", nargs="+", default=DEFAULT_METERS)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--out", default=os.path.join("output", "floor_multiplier_check"))
+    parser.add_argument("--csv", default=None, help="Optional CSV output path (default: <out>/comparison.csv).")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        main_config = json.load(f)
+    idf_cfg = main_config.get("idf_creation", {})
+    def_dicts = main_config.get("default_dicts", {})
+    res_data, nonres_data = build_fenez_config(
+        base_res_data=def_dicts.get("res_data", {}),
+        base_nonres_data=def_dicts.get("nonres_data", {}),
+        excel_path="",
+        do_excel_override=False,
+        user_fenez_overrides=[]
+    )
+
+    results = run_comparison(
+        epw=args.epw,
+        iddfile=idf_cfg.get("iddfile"),
+        idf_file_path=idf_cfg.get("idf_file_path"),
+        out_root=args.out,
+        floors=args.floors,
+        footprints=args.footprints,
+        building_function=args.function,
+        min_floors=args.min_floors,
+        meters=args.meters,
+        workers=args.workers,
+        idf_cfg=idf_cfg,
+        res_data=res_data,
+        nonres_data=nonres_data
+    )
+    print_table(results)
+
+    csv_path = args.csv or os.path.join(args.out, "comparison.csv")
+    folder = os.path.dirname(csv_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["building", "floors", "footprint", "meter", "full", "reduced", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"[INFO] Wrote {csv_path}")
@@ -1,19 +1,12 @@
 # epw/assign_epw_file.py
 
 import math
+from override_resolver import find_overrides
 from .epw_lookup import epw_lookup
 
 def find_epw_overrides(building_id, desired_year, user_config_epw):
-    matches = []
-    for row in user_config_epw:
-        if "building_id" in row:
-            if row["building_id"] != building_id:
-                continue
-        if "desired_year" in row:
-            if row["desired_year"] != desired_year:
-                continue
-        matches.append(row)
-    return matches
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides("epw", user_config_epw, building_id=building_id, desired_year=desired_year)
 
 def assign_epw_for_building_with_overrides(building_row, user_config_epw=None, assigned_epw_log=None):
     """
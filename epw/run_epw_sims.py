@@ -1,17 +1,25 @@
 # epw/run_epw_sims.py
 
 import os
+import json
 import logging
+import subprocess
 from eppy.modeleditor import IDF
 from multiprocessing import Pool
 
+from metrics import timed, add_items
+from idf_objects.other.idf_linter import IDFLinter
+
 from .assign_epw_file import assign_epw_for_building_with_overrides
 
 def run_simulation(args):
     """
     :param args: tuple (idf_path, epwfile, iddfile, output_directory, building_index)
+    :return: exit code (0 => OK)
     """
     idf_path, epwfile, iddfile, output_directory, bldg_idx = args
+    if idf_path.lower().endswith(".epjson"):
+        return run_epjson_simulation(args)
     try:
         # Set up IDF
         IDF.setiddname(iddfile)
@@ -31,9 +39,53 @@ def run_simulation(args):
         # Execute
         idf.run(**run_opts)
         logging.info(f"[run_simulation] OK: {idf_path} (Bldg {bldg_idx}) with EPW {epwfile} -> {output_directory}")
+        return 0
     except Exception as e:
         logging.error(f"[run_simulation] Error for building {bldg_idx} with {idf_path} & {epwfile}: {e}",
                       exc_info=True)
+        return getattr(e, "returncode", 1) or 1
+
+
+def energyplus_executable(iddfile):
+    """
+    The energyplus executable shipped in the same folder as Energy+.idd.
+    """
+    exe_name = "energyplus.exe" if os.name == "nt" else "energyplus"
+    return os.path.join(os.path.dirname(iddfile), exe_name)
+
+
+def run_epjson_simulation(args):
+    """
+    Runs an .epJSON model directly with the EnergyPlus CLI (eppy only reads
+    IDF text). Uses the same output naming as run_simulation.
+    :param args: tuple (epjson_path, epwfile, iddfile, output_directory, building_index)
+    :return: exit code of energyplus
+    """
+    epjson_path, epwfile, iddfile, output_directory, bldg_idx = args
+    try:
+        os.makedirs(output_directory, exist_ok=True)
+        cmd = [
+            energyplus_executable(iddfile),
+            "--weather", epwfile,
+            "--output-directory", output_directory,
+            "--output-prefix", f"simulation_bldg{bldg_idx}",
+            "--output-suffix", "C",
+            "--readvars",
+            "--expandobjects",
+            epjson_path
+        ]
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        logging.info(f"[run_epjson_simulation] OK: {epjson_path} (Bldg {bldg_idx}) with EPW {epwfile} -> {output_directory}")
+        return 0
+    except Exception as e:
+        logging.error(f"[run_epjson_simulation] Error for building {bldg_idx} with {epjson_path} & {epwfile}: {e}",
+                      exc_info=True)
+        return getattr(e, "returncode", 1) or 1
+
+
+def run_simulation_task(args):
+    """Pool helper: (task, exit_code) so the caller knows which building finished."""
+    return args, run_simulation(args)
 
 
     """
@@ -81,20 +133,54 @@ def generate_simulations(
 
         yield (idf_path, epw_path, iddfile, output_dir, idx)
 
+@timed("epw.simulate_all")
 def simulate_all(
     df_buildings,
-    idf_directory,
-    iddfile,
-    base_output_dir,
+    idf_directory=None,
+    iddfile=None,
+    base_output_dir=None,
     user_config_epw=None,       # <--- new
     assigned_epw_log=None,      # <--- new
-    num_workers=4
+    num_workers=4,
+    run_context=None,
+    dedup_simulations=False,
+    journal=None,
+    reuse_results=None,
+    lint_config=None
 ):
     """
     Runs E+ simulations in parallel:
       - For each row in df_buildings, we pick an EPW & IDF.
       - Group results by year so all building results for year X go in base_output_dir/X.
+
+    idf_directory / iddfile / base_output_dir default to the run_context
+    (idf_output_dir, iddfile, sim_results_dir) when not given explicitly.
+
+    With dedup_simulations, buildings sharing the same (IDF, EPW, year folder)
+    are simulated once; the other building indices are written to
+    <year folder>/archetype_map.json so merge_all_results can fan the
+    results out to them.
+
+    With a RunJournal (run_journal.py), each finished simulation is recorded
+    as it completes, and in resume mode buildings whose results are still
+    valid on disk are not simulated again.
+
+    reuse_results: building indices whose inputs did not change since the
+    last run (change_detection.py); they are not simulated again if their
+    simulation_bldg<idx>.csv is still there.
+
+    lint_config: {"enabled": bool, "min_surface_area": float, "report_path": str}.
+    Each model is checked by idf_objects/other/idf_linter.py before it is
+    queued; models with errors are not simulated (journal exit code
+    LINT_REJECTED) and all findings go to lint_report.json.
     """
+    if run_context is not None:
+        idf_directory = idf_directory or run_context.idf_output_dir
+        iddfile = iddfile or run_context.iddfile
+        base_output_dir = base_output_dir or run_context.sim_results_dir
+    if not (idf_directory and iddfile and base_output_dir):
+        raise ValueError("simulate_all needs idf_directory, iddfile and base_output_dir (or a run_context).")
+
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     logging.info("[simulate_all] Starting...")
 
@@ -115,8 +201,111 @@ def simulate_all(
         logging.warning("[simulate_all] No tasks to run. Exiting.")
         return
 
+    tasks = _dedup_tasks(tasks, enabled=dedup_simulations)
+
+    if reuse_results:
+        remaining = [
+            t for t in tasks
+            if t[4] not in reuse_results
+            or not os.path.isfile(os.path.join(t[3], f"simulation_bldg{t[4]}.csv"))
+        ]
+        if len(remaining) < len(tasks):
+            logging.info(f"[simulate_all] {len(tasks) - len(remaining)} unchanged buildings => results reused.")
+        tasks = remaining
+        if not tasks:
+            return
+
+    if journal is not None and journal.resume:
+        remaining = [t for t in tasks if not journal.sim_done(t[4], t[0], t[1], t[3])]
+        if len(remaining) < len(tasks):
+            logging.info(f"[simulate_all] Resume: {len(tasks) - len(remaining)} simulations already done.")
+        tasks = remaining
+        if not tasks:
+            return
+
+    linter = make_linter(iddfile, lint_config)
+    if linter is not None:
+        tasks = [t for t in tasks if lint_task(linter, t, journal)]
+        linter.write_report(lint_report_path(lint_config, run_context, base_output_dir))
+        if not tasks:
+            logging.warning("[simulate_all] All models were rejected by the linter.")
+            return
+
     logging.info(f"[simulate_all] Found {len(tasks)} tasks. Using {num_workers} workers.")
+    add_items(len(tasks))
     with Pool(num_workers) as pool:
-        pool.map(run_simulation, tasks)
+        if journal is None:
+            pool.map(run_simulation, tasks)
+        else:
+            for task, exit_code in pool.imap_unordered(run_simulation_task, tasks):
+                journal.record_sim(task[4], task[0], task[1], task[3], exit_code)
+
+    logging.info("[simulate_all] All simulations complete.")
+
+
+# journal exit code of a model rejected by the linter (never simulated)
+LINT_REJECTED = -1
+
+
+def make_linter(iddfile, lint_config):
+    """IDFLinter for lint_config, or None if linting is off or the IDD cannot be read."""
+    if not lint_config or not lint_config.get("enabled", False):
+        return None
+    try:
+        return IDFLinter(iddfile, min_surface_area=lint_config.get("min_surface_area", 1e-4))
+    except Exception as e:
+        logging.warning(f"[simulate_all] Linting disabled, cannot read IDD {iddfile}: {e}")
+        return None
+
+
+def lint_task(linter, task, journal=None):
+    """True if the task's model passes the linter; a rejection is journaled."""
+    if linter.check_task(task):
+        return True
+    if journal is not None:
+        journal.record_sim(task[4], task[0], task[1], task[3], LINT_REJECTED)
+    return False
+
+
+def lint_report_path(lint_config, run_context=None, base_output_dir=None):
+    if lint_config.get("report_path"):
+        return lint_config["report_path"]
+    if run_context is not None:
+        return run_context.path("lint_report.json")
+    return os.path.join(base_output_dir, "lint_report.json")
+
+
+def _dedup_tasks(tasks, enabled=True):
+    """
+    Keeps the first task per (idf_path, epw, output_dir) and writes the
+    {simulated_index: [other indices]} map per output folder. A stale map
+    from an earlier run is removed when dedup is off.
+    """
+    if not enabled:
+        kept = tasks
+        fanout = {}
+    else:
+        unique = {}
+        fanout = {}
+        for task in tasks:
+            idf_path, epw_path, _, output_dir, bldg_idx = task
+            key = (os.path.abspath(idf_path), os.path.abspath(epw_path), os.path.abspath(output_dir))
+            if key in unique:
+                rep_idx = unique[key][4]
+                fanout.setdefault(output_dir, {}).setdefault(str(rep_idx), []).append(bldg_idx)
+            else:
+                unique[key] = task
+        kept = list(unique.values())
+
+    for output_dir in {t[3] for t in tasks}:
+        map_path = os.path.join(output_dir, "archetype_map.json")
+        if output_dir in fanout:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(map_path, "w") as f:
+                json.dump(fanout[output_dir], f, indent=2, default=int)
+        elif os.path.isfile(map_path):
+            os.remove(map_path)
 
-    logging.info("[simulate_all] All simulations complete.")
\ No newline at end of file
+    if len(kept) < len(tasks):
+        logging.info(f"[simulate_all] {len(tasks)} buildings => {len(kept)} distinct simulations.")
+    return kept
@@ -15,14 +15,19 @@ main_config["idf_creation"]["post_process_config"]["outputs"].
 """
 
 import os
+import math
 import logging
 import pandas as pd
+from multiprocessing import Pool
 
 # geomeppy for IDF manipulation
 from geomeppy import IDF
 
 # --- Import your custom submodules (paths shown as examples) ---
 from idf_objects.geomz.building import create_building_with_roof_type
+from idf_objects.geomz.geometry_batch import precompute_geometry
+from idf_objects.geomz.zoning_policy import ZoningPolicy
+from idf_objects.geomz.geometry_cache import get_geometry_cache
 from idf_objects.fenez.fenestration import add_fenestration
 from idf_objects.fenez.materials import (
     update_construction_materials,
@@ -35,17 +40,42 @@ from idf_objects.ventilation.add_ventilation import add_ventilation_to_idf
 from idf_objects.setzone.add_outdoor_air_and_zone_sizing_to_all_zones import add_outdoor_air_and_zone_sizing_to_all_zones
 from idf_objects.tempground.add_ground_temperatures import add_ground_temperatures
 from idf_objects.other.zonelist import create_zonelist
+from idf_objects.other.idf_template import get_building_snapshot
+from idf_objects.other.epjson_emitter import save_epjson, verify_epjson
+from modification.common_utils import load_idf
+from idf_patching import (
+    ModuleTracker,
+    load_manifest,
+    manifest_path,
+    remove_module_objects,
+    affected_modules,
+    MODULE_LOGS
+)
+from idf_objects.other.archetypes import (
+    assign_model_fingerprints,
+    fan_out_archetypes,
+    archetype_rows
+)
 
 # Output & simulation modules
 from idf_objects.outputdef.assign_output_settings import assign_output_settings
 from idf_objects.outputdef.add_output_definitions import add_output_definitions
 from postproc.merge_results import merge_all_results
-from epw.run_epw_sims import simulate_all
+from epw.run_epw_sims import simulate_all, generate_simulations, make_linter, lint_task, lint_report_path
+from streaming_pipeline import run_streaming_pipeline
+from param_log_store import ParamLogStore, export_legacy_csvs, STORED_LOGS
+from run_journal import RunJournal
+from change_detection import BuildingFingerprints
+from presample import presample_parameters
+from rng_streams import use_presampled
+from metrics import track
+from run_context import RunContext
 
 
 ###############################################################################
 # Global Default IDF Config
-# You can override these in main.py or from main_config.json
+# Used only when no RunContext is passed; prefer a RunContext per run
+# (see run_context.py) so concurrent runs don't overwrite each other.
 ###############################################################################
 idf_config = {
     "iddfile": "D:/EnergyPlus/Energy+.idd",       # Default path to the IDD file
@@ -85,7 +115,21 @@ def create_idf_for_building(
     # Ground temps
     assigned_groundtemp_log=None,
     # Output definitions
-    output_definitions=None
+    output_definitions=None,
+    # Run-specific paths
+    run_context=None,
+    # Incremental per-module patching
+    patch_plan=None,
+    # Portfolio geometry pre-computation
+    precomputed_geometry=None,
+    # Reduced geometry with zone multipliers
+    floor_multiplier_min_floors=None,
+    # Adaptive single-zone vs perimeter+core
+    zoning_policy=None,
+    # Per-process geometry template cache
+    geometry_cache_config=None,
+    # Window generation
+    fenestration_config=None
 ):
     """
     Build an IDF for a single building, applying geometry, fenestration, lighting,
@@ -145,174 +189,281 @@ def create_idf_for_building(
           "include_tables": True,
           "include_summary": True
         }
+    run_context : RunContext or None
+        IDD / base IDF / output folder of this run. If None, built from the
+        module-level idf_config.
+    patch_plan : dict or None
+        {building_index: [modules]} (see idf_patching.py). If this building is
+        in it and its IDF and module manifest are on disk, only the listed
+        modules are removed from the existing IDF and applied again (an empty
+        list keeps the IDF as is). epJSON models are always rebuilt.
+    precomputed_geometry : PortfolioGeometry or None
+        Geometry of all buildings (idf_objects/geomz/geometry_batch.py); this
+        building's footprint, zoning picks and core polygon are taken from it.
+    floor_multiplier_min_floors : int or None
+        Model buildings with at least this many floors as ground + multiplied
+        middle + top floor (see create_building_with_roof_type).
+    zoning_policy : ZoningPolicy or None
+        Chooses single zone vs perimeter+core per building from its
+        footprint and an accuracy budget (idf_objects/geomz/zoning_policy.py).
+    geometry_cache_config : dict or None
+        {"max_entries": int, "round_decimals": int, "quantize_step": float or None}.
+        Zones / surfaces are replayed from the process-wide geometry cache
+        (idf_objects/geomz/geometry_cache.py) instead of being rebuilt.
+    fenestration_config : dict or None
+        {"window_generator": "analytic" | "geomeppy",
+         "wwr_by_orientation": {"north" | "east" | "south" | "west": wwr}},
+        passed to add_fenestration.
 
     Returns
     -------
     out_path : str
-        File path to the saved IDF.
+        File path to the saved IDF (or .epJSON if run_context.output_format == "epjson").
     """
+    if run_context is None:
+        run_context = RunContext.from_idf_config(idf_config)
+
+    out_path = building_model_path(run_context, building_index)
+
     # 1) Setup IDF from the minimal template
-    IDF.setiddname(idf_config["iddfile"])
-    idf = IDF(idf_config["idf_file_path"])
-
-    # 2) Basic building object settings
-    building_obj = idf.newidfobject("BUILDING")
-    building_obj.Name = f"Sample_Building_{building_index}"
-
-    orientation = building_row.get("building_orientation", 0.0)
-    if not pd.isna(orientation):
-        building_obj.North_Axis = orientation
-
-    # 3) Create geometry
-    # Initialize log dict if needed
-    if assigned_geom_log is not None and building_row.get("ogc_fid") not in assigned_geom_log:
-        assigned_geom_log[building_row.get("ogc_fid")] = {}
-
-    edge_types = []
-    for side_col in ["north_side", "east_side", "south_side", "west_side"]:
-        edge_types.append(building_row.get(side_col, "facade"))
-
-    create_building_with_roof_type(
-        idf=idf,
-        area=building_row.get("area", 100.0),
-        perimeter=building_row.get("perimeter", 40.0),
-        orientation=orientation,
-        building_row=building_row,
-        edge_types=edge_types,
+    #    (parsed once per process, with the building-independent objects
+    #     already added; see idf_objects/other/idf_template.py)
+    template = get_building_snapshot(
+        run_context.iddfile,
+        run_context.idf_file_path,
         calibration_stage=calibration_stage,
         strategy=strategy,
-        random_seed=random_seed,
-        user_config=user_config_geom,
-        assigned_geom_log=assigned_geom_log
+        random_seed=random_seed
     )
 
-    # 4) Update materials & constructions
-    construction_map = update_construction_materials(
-        idf=idf,
-        building_row=building_row,
-        building_index=building_index,
-        scenario=scenario,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        user_config_fenez=None,  # (not used directly here)
-        assigned_fenez_log=assigned_fenez_log
-    )
-    assign_constructions_to_surfaces(idf, construction_map)
+    #    ... or patch the existing model if only some modules changed
+    #    (see idf_patching.py)
+    patch_modules = None
+    manifest = None
+    if patch_plan and building_index in patch_plan and run_context.output_format != "epjson":
+        manifest = load_manifest(out_path)
+        if manifest is not None and os.path.isfile(out_path):
+            patch_modules = patch_plan[building_index]
+    if patch_modules is not None and not patch_modules:
+        print(f"[create_idf_for_building] IDF unchanged: {out_path}")
+        return out_path
 
-    # Create zone list
-    create_zonelist(idf, zonelist_name="ALL_ZONES")
+    if patch_modules is None:
+        idf = template.new_idf()
+    else:
+        idf = load_idf(out_path, run_context.iddfile, cache=False)
+        removed = remove_module_objects(idf, manifest, patch_modules)
+        print(f"[create_idf_for_building] Patching {patch_modules} of {out_path} ({removed} objects removed)")
+    tracker = ModuleTracker(idf, manifest, run_modules=patch_modules)
 
-    # 5) Fenestration
-    add_fenestration(
-        idf=idf,
-        building_row=building_row,
-        scenario=scenario,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        res_data=res_data,
-        nonres_data=nonres_data,
-        assigned_fenez_log=assigned_fenez_log
-    )
+    if tracker.should_run("geometry"):
+        # 2) Basic building object settings
+        building_obj = idf.newidfobject("BUILDING")
+        building_obj.Name = f"Sample_Building_{building_index}"
+
+        orientation = building_row.get("building_orientation", 0.0)
+        if not pd.isna(orientation):
+            building_obj.North_Axis = orientation
+
+        # 3) Create geometry
+        # Initialize log dict if needed
+        if assigned_geom_log is not None and building_row.get("ogc_fid") not in assigned_geom_log:
+            assigned_geom_log[building_row.get("ogc_fid")] = {}
+
+        edge_types = []
+        for side_col in ["north_side", "east_side", "south_side", "west_side"]:
+            edge_types.append(building_row.get(side_col, "facade"))
+
+        create_building_with_roof_type(
+            idf=idf,
+            area=building_row.get("area", 100.0),
+            perimeter=building_row.get("perimeter", 40.0),
+            orientation=orientation,
+            building_row=building_row,
+            edge_types=edge_types,
+            calibration_stage=calibration_stage,
+            strategy=strategy,
+            random_seed=random_seed,
+            user_config=user_config_geom,
+            assigned_geom_log=assigned_geom_log,
+            precomputed=(
+                precomputed_geometry.for_building(building_index)
+                if precomputed_geometry is not None and building_index in precomputed_geometry
+                else None
+            ),
+            floor_multiplier_min_floors=floor_multiplier_min_floors,
+            zoning_policy=zoning_policy,
+            geometry_cache=(
+                get_geometry_cache(**geometry_cache_config)
+                if geometry_cache_config is not None
+                else None
+            )
+        )
+
+        # Create zone list
+        create_zonelist(idf, zonelist_name="ALL_ZONES")
+
+    if tracker.should_run("fenez"):
+        with tracker.module("fenez"):
+            # 4) Update materials & constructions
+            construction_map = update_construction_materials(
+                idf=idf,
+                building_row=building_row,
+                building_index=building_index,
+                scenario=scenario,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config_fenez=None,  # (not used directly here)
+                assigned_fenez_log=assigned_fenez_log
+            )
+            assign_constructions_to_surfaces(idf, construction_map)
+
+            # 5) Fenestration
+            add_fenestration(
+                idf=idf,
+                building_row=building_row,
+                scenario=scenario,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                res_data=res_data,
+                nonres_data=nonres_data,
+                assigned_fenez_log=assigned_fenez_log,
+                wwr_by_orientation=(fenestration_config or {}).get("wwr_by_orientation"),
+                window_generator=(fenestration_config or {}).get("window_generator", "analytic")
+            )
 
     # 6) Lighting
-    add_lights_and_parasitics(
-        idf=idf,
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        user_config=user_config_lighting,
-        assigned_values_log=assigned_lighting_log
-    )
+    if tracker.should_run("lighting"):
+        with tracker.module("lighting"):
+            add_lights_and_parasitics(
+                idf=idf,
+                building_row=building_row,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config=user_config_lighting,
+                assigned_values_log=assigned_lighting_log
+            )
 
     # 7) DHW
-    add_dhw_to_idf(
-        idf=idf,
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        name_suffix=f"MyDHW_{building_index}",
-        user_config_dhw=user_config_dhw,
-        assigned_dhw_log=assigned_dhw_log,
-        use_nta=True
-    )
+    if tracker.should_run("dhw"):
+        with tracker.module("dhw"):
+            add_dhw_to_idf(
+                idf=idf,
+                building_row=building_row,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                name_suffix=f"MyDHW_{building_index}",
+                user_config_dhw=user_config_dhw,
+                assigned_dhw_log=assigned_dhw_log,
+                use_nta=True
+            )
 
     # 8) HVAC
-    add_HVAC_Ideal_to_all_zones(
-        idf=idf,
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        user_config_hvac=user_config_hvac,
-        assigned_hvac_log=assigned_hvac_log
-    )
+    if tracker.should_run("hvac"):
+        with tracker.module("hvac"):
+            add_HVAC_Ideal_to_all_zones(
+                idf=idf,
+                building_row=building_row,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config_hvac=user_config_hvac,
+                assigned_hvac_log=assigned_hvac_log
+            )
 
     # 9) Ventilation
-    add_ventilation_to_idf(
-        idf=idf,
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        user_config_vent=user_config_vent,
-        assigned_vent_log=assigned_vent_log
-    )
+    if tracker.should_run("vent"):
+        with tracker.module("vent"):
+            add_ventilation_to_idf(
+                idf=idf,
+                building_row=building_row,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config_vent=user_config_vent,
+                assigned_vent_log=assigned_vent_log
+            )
 
     # 10) Zone sizing
-    add_outdoor_air_and_zone_sizing_to_all_zones(
-        idf=idf,
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        assigned_setzone_log=assigned_setzone_log
-    )
+    if tracker.should_run("setzone"):
+        with tracker.module("setzone"):
+            add_outdoor_air_and_zone_sizing_to_all_zones(
+                idf=idf,
+                building_row=building_row,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                assigned_setzone_log=assigned_setzone_log
+            )
 
-    # 11) Ground temperatures
-    add_ground_temperatures(
-        idf=idf,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        assigned_groundtemp_log=assigned_groundtemp_log
-    )
+    # 11) Ground temperatures (already in the template if deterministic,
+    #     except when patching an existing model)
+    if tracker.should_run("groundtemp"):
+        with tracker.module("groundtemp"):
+            if template.ground_temps is not None and patch_modules is None:
+                if assigned_groundtemp_log is not None:
+                    assigned_groundtemp_log["ground_temperatures"] = template.ground_temps
+            else:
+                add_ground_temperatures(
+                    idf=idf,
+                    calibration_stage=calibration_stage,
+                    strategy=strategy,
+                    random_seed=random_seed,
+                    assigned_groundtemp_log=assigned_groundtemp_log
+                )
 
     # 12) Output definitions
     #    If no custom output_definitions provided, define some defaults here
-    if output_definitions is None:
-        output_definitions = {
-            "desired_variables": ["Facility Total Electric Demand Power", "Zone Air Temperature"],
-            "desired_meters": ["Electricity:Facility"],
-            "override_variable_frequency": "Hourly",
-            "override_meter_frequency": "Hourly",
-            "include_tables": True,
-            "include_summary": True
-        }
+    if tracker.should_run("outputdef"):
+        if output_definitions is None:
+            output_definitions = {
+                "desired_variables": ["Facility Total Electric Demand Power", "Zone Air Temperature"],
+                "desired_meters": ["Electricity:Facility"],
+                "override_variable_frequency": "Hourly",
+                "override_meter_frequency": "Hourly",
+                "include_tables": True,
+                "include_summary": True
+            }
 
-    out_settings = assign_output_settings(
-        desired_variables=output_definitions.get("desired_variables", []),
-        desired_meters=output_definitions.get("desired_meters", []),
-        override_variable_frequency=output_definitions.get("override_variable_frequency", "Hourly"),
-        override_meter_frequency=output_definitions.get("override_meter_frequency", "Hourly"),
-        include_tables=output_definitions.get("include_tables", True),
-        include_summary=output_definitions.get("include_summary", True)
-    )
-    add_output_definitions(idf, out_settings)
+        out_settings = assign_output_settings(
+            desired_variables=output_definitions.get("desired_variables", []),
+            desired_meters=output_definitions.get("desired_meters", []),
+            override_variable_frequency=output_definitions.get("override_variable_frequency", "Hourly"),
+            override_meter_frequency=output_definitions.get("override_meter_frequency", "Hourly"),
+            include_tables=output_definitions.get("include_tables", True),
+            include_summary=output_definitions.get("include_summary", True)
+        )
+        with tracker.module("outputdef"):
+            add_output_definitions(idf, out_settings)
 
-    # 13) Save final IDF
-    os.makedirs(idf_config["output_dir"], exist_ok=True)
-    idf_filename = f"building_{building_index}.idf"
-    out_path = os.path.join(idf_config["output_dir"], idf_filename)
-    idf.save(out_path)
-    print(f"[create_idf_for_building] IDF saved at: {out_path}")
+    # 13) Save final model (IDF via eppy, or epJSON via the json emitter)
+    os.makedirs(run_context.idf_output_dir, exist_ok=True)
+    if run_context.output_format == "epjson":
+        save_epjson(idf, out_path, run_context.epjson_schema)
+        print(f"[create_idf_for_building] epJSON saved at: {out_path}")
+        if building_index < run_context.epjson_verify:
+            diffs = verify_epjson(idf, out_path)
+            if diffs:
+                print(f"[create_idf_for_building] epJSON of building {building_index} differs from its IDF "
+                      f"({len(diffs)} differences): " + "; ".join(diffs[:5]))
+    else:
+        idf.save(out_path)
+        tracker.save(manifest_path(out_path))
+        print(f"[create_idf_for_building] IDF saved at: {out_path}")
 
     return out_path
 
 
+def building_model_path(run_context, building_index):
+    """Where create_idf_for_building saves the model of one building."""
+    ext = "epJSON" if run_context.output_format == "epjson" else "idf"
+    return os.path.join(run_context.idf_output_dir, f"building_{building_index}.{ext}")
+
+
 def create_idfs_for_all_buildings(
     df_buildings,
     scenario="scenario1",
@@ -334,7 +485,31 @@ def create_idfs_for_all_buildings(
     run_simulations=True,
     simulate_config=None,
     post_process=True,
-    post_process_config=None
+    post_process_config=None,
+    # run-specific paths & caches
+    run_context=None,
+    # parallel IDF generation
+    idf_workers=1,
+    idf_chunk_size=None,
+    # archetype deduplication
+    archetype_config=None,
+    # pipelined create -> simulate -> post-process
+    pipeline_config=None,
+    # on-disk parameter log
+    param_log_config=None,
+    # checkpoint / resume
+    journal_config=None,
+    resume=False,
+    # incremental re-runs
+    incremental_config=None,
+    # portfolio-wide parameter matrix
+    presample_config=None,
+    # pre-simulation model checks
+    lint_config=None,
+    # vectorized geometry pre-computation
+    geometry_config=None,
+    # window generation
+    fenestration_config=None
 ):
     """
     Loops over df_buildings, calls create_idf_for_building for each building, 
@@ -365,6 +540,104 @@ def create_idfs_for_all_buildings(
         Whether to do result merging after simulation
     post_process_config : dict
         Contains details for the merging, e.g. multiple daily/monthly passes
+    run_context : RunContext or None
+        IDD, base IDF and output folders of this run. If None, built from the
+        module-level idf_config with output root "output".
+    idf_workers : int
+        Number of processes used to create the IDFs. 1 => serial loop.
+        Every parameter picker re-seeds with random_seed per building, so the
+        parallel output (IDFs + assigned logs) is the same as the serial one.
+    idf_chunk_size : int or None
+        Buildings per pool task. None => about 4 chunks per worker.
+    archetype_config : dict or None
+        {"dedup": bool, "ignore_columns": [...], "round_decimals": int}.
+        With dedup, buildings sharing a model fingerprint (see
+        idf_objects/other/archetypes.py) get one IDF and one simulation;
+        results and assigned logs are fanned out to every member.
+    pipeline_config : dict or None
+        {"enabled": bool, "max_pending": int, "cleanup_sim_outputs": bool}.
+        When enabled (and both run_simulations and post_process are on), IDFs
+        are created one at a time and each is simulated and merged as soon as
+        it is ready (see streaming_pipeline.py) instead of stage by stage.
+        IDF creation is serial in this mode; idf_workers is not used.
+    param_log_config : dict or None
+        {"format": "csv" | "parquet", "batch_size": int}. Each building's
+        picks are moved from the assigned_*_log dicts to the on-disk
+        ParamLogStore (param_log_store.py) under <output_root>/param_log as
+        soon as the building is done; the assigned_*.csv files are exported
+        from it at the end.
+    journal_config : dict or None
+        {"enabled": bool}. Records per-building progress (IDF + hash,
+        simulation exit code, post-processed) in <output_root>/run_journal.jsonl
+        (see run_journal.py).
+    resume : bool
+        Continue an interrupted run: buildings whose IDF / simulation results
+        on disk still match the journal are not created / simulated again.
+        Implies the journal.
+    incremental_config : dict or None
+        {"enabled": bool, "extra_input_paths": [...]}. Stores a fingerprint
+        per building (row, applicable overrides, EPW, settings, code version;
+        see change_detection.py) in <output_root>/building_fingerprints.json.
+        Buildings unchanged since the last run keep their IDF, simulation
+        results and parameter log rows instead of being created / simulated
+        again. With "patch_modules" (default true), a model whose geometry
+        inputs did not change is patched: only the modules whose inputs
+        changed (and their dependents) are re-applied to the existing IDF
+        (see idf_patching.py), then it is simulated again.
+    presample_config : dict or None
+        {"enabled": bool}. Before any IDF is built, resolves the parameter
+        ranges of every module for all of df_buildings and draws them in one
+        vectorized pass (see presample.py); the (buildings x parameters)
+        matrix is written to <output_root>/param_matrix.csv, with the ranges
+        in param_matrix_ranges.csv, and the builders then take their uniform
+        draws from it read-only (rng_streams.use_presampled). Off by
+        default; not a speed-up, as the ranges pass runs every picker once
+        more per building.
+    lint_config : dict or None
+        {"enabled": bool, "min_surface_area": float}. Every model is checked
+        against the IDD before it is queued for simulation (dangling
+        references such as missing schedules / constructions / boundary
+        surfaces, degenerate surfaces, duplicate names; see
+        idf_objects/other/idf_linter.py). Models with errors are not
+        simulated; the findings are written to <output_root>/lint_report.json.
+    geometry_config : dict or None
+        {"precompute": bool, "skip_infeasible": bool,
+         "floor_multiplier": {"enabled": bool, "min_floors": int},
+         "zoning_policy": {"enabled": bool, "error_budget": float,
+                           "calibration_file": str, "respect_lookup": bool},
+         "cache": {"enabled": bool, "max_entries": int, "round_decimals": int,
+                   "quantize_step": float or None}}. Computes width / length,
+        footprints, perimeter / core polygons and floor heights of all
+        buildings in one vectorized pass (idf_objects/geomz/geometry_batch.py)
+        before any IDF is built; the builders use these instead of computing
+        them per building. Per-row flags go to <output_root>/geometry_flags.csv;
+        with skip_infeasible (default), rows that cannot be built (bad area,
+        perimeter, floors or height) are not created.
+        With floor_multiplier enabled, buildings with at least min_floors
+        floors are modeled as ground + one middle floor (EnergyPlus zone
+        multiplier = floors - 2) + top floor; the multiplier and an area
+        check against full geometry are written to the geometry log. The
+        area check only confirms the model is complete; the simulated
+        error of the reduction is unverified, measure it for your
+        portfolio with compare_floor_multiplier.py before enabling this.
+        With zoning_policy enabled, each building is modeled as a single zone
+        per floor unless its predicted error (from the core share and
+        elongation of the footprint, coefficients calibrated with
+        calibrate_zoning_policy) exceeds error_budget; with respect_lookup
+        (default) the policy only removes cores the lookup asked for.
+        With cache enabled, buildings whose (width, length, wall height,
+        floors, perimeter depth, core, edge types), rounded to round_decimals
+        or snapped to quantize_step, match an earlier one in the same process
+        get its zones and surfaces replayed, rotated to their orientation
+        (least recently used templates evicted beyond max_entries).
+    fenestration_config : dict or None
+        {"window_generator": "analytic" | "geomeppy",
+         "wwr_by_orientation": {"north" | "east" | "south" | "west": wwr} or None}.
+        "analytic" (default) computes one centred window per rectangular
+        exterior wall from its corners (idf_objects/fenez/fenestration.py),
+        falling back to geomeppy's set_wwr if a wall is not a rectangle.
+        wwr_by_orientation replaces the picked WWR on the facades facing
+        that way.
 
     Returns
     -------
@@ -373,6 +646,9 @@ def create_idfs_for_all_buildings(
     """
     logger = logging.getLogger(__name__)
 
+    if run_context is None:
+        run_context = RunContext.from_idf_config(idf_config)
+
     # A) Prepare dictionaries to store final picks for each module
     assigned_geom_log       = {}
     assigned_lighting_log   = {}
@@ -384,96 +660,410 @@ def create_idfs_for_all_buildings(
     assigned_groundtemp_log = {}
     assigned_setzone_log    = {}
 
-    # B) Create an IDF for each building
-    for idx, row in df_buildings.iterrows():
-        bldg_id = row.get("ogc_fid", idx)
-        logger.info(f"--- Creating IDF for building index {idx}, ogc_fid={bldg_id} ---")
+    # Per-building log dicts, passed to create_idf_for_building by keyword
+    assigned_logs = {
+        "assigned_geom_log":       assigned_geom_log,
+        "assigned_lighting_log":   assigned_lighting_log,
+        "assigned_dhw_log":        assigned_dhw_log,
+        "assigned_fenez_log":      assigned_fenez_log,
+        "assigned_hvac_log":       assigned_hvac_log,
+        "assigned_vent_log":       assigned_vent_log,
+        "assigned_setzone_log":    assigned_setzone_log,
+        "assigned_groundtemp_log": assigned_groundtemp_log
+    }
 
-        idf_path = create_idf_for_building(
-            building_row=row,
-            building_index=idx,
-            scenario=scenario,
-            calibration_stage=calibration_stage,
-            strategy=strategy,
-            random_seed=random_seed,
-            # geometry
-            user_config_geom=user_config_geom,
-            assigned_geom_log=assigned_geom_log,
-            # lighting
-            user_config_lighting=user_config_lighting,
-            assigned_lighting_log=assigned_lighting_log,
-            # DHW
-            user_config_dhw=user_config_dhw,
-            assigned_dhw_log=assigned_dhw_log,
-            # Fenestration
+    # Everything create_idf_for_building needs besides the row / index / logs
+    building_kwargs = {
+        "scenario": scenario,
+        "calibration_stage": calibration_stage,
+        "strategy": strategy,
+        "random_seed": random_seed,
+        "user_config_geom": user_config_geom,
+        "user_config_lighting": user_config_lighting,
+        "user_config_dhw": user_config_dhw,
+        "res_data": res_data,
+        "nonres_data": nonres_data,
+        "user_config_hvac": user_config_hvac,
+        "user_config_vent": user_config_vent,
+        "output_definitions": output_definitions,
+        "run_context": run_context
+    }
+
+    run_settings = {
+        "scenario": scenario,
+        "calibration_stage": calibration_stage,
+        "strategy": strategy,
+        "random_seed": random_seed,
+        "output_format": run_context.output_format
+    }
+
+    # Reduced geometry for tall buildings (ground + multiplied middle + top floor)
+    geometry_config = geometry_config or {}
+    floor_multiplier = geometry_config.get("floor_multiplier") or {}
+    if floor_multiplier.get("enabled", False):
+        building_kwargs["floor_multiplier_min_floors"] = floor_multiplier.get("min_floors", 4)
+        run_settings["floor_multiplier_min_floors"] = building_kwargs["floor_multiplier_min_floors"]
+
+    # Window generation (analytic vs set_wwr, per-orientation WWR)
+    if fenestration_config:
+        building_kwargs["fenestration_config"] = fenestration_config
+        if fenestration_config.get("wwr_by_orientation"):
+            run_settings["wwr_by_orientation"] = fenestration_config["wwr_by_orientation"]
+
+    # Adaptive zoning (single zone vs perimeter + core per building)
+    zoning_config = geometry_config.get("zoning_policy") or {}
+    zoning_policy = None
+    if zoning_config.get("enabled", False):
+        zoning_policy = ZoningPolicy.from_config(zoning_config)
+        building_kwargs["zoning_policy"] = zoning_policy
+        run_settings["zoning_policy"] = {
+            "error_budget": zoning_policy.error_budget,
+            "coefficients": zoning_policy.coefficients,
+            "respect_lookup": zoning_policy.respect_lookup
+        }
+
+    # Geometry template cache (zones / surfaces replayed per rounded key)
+    cache_config = geometry_config.get("cache") or {}
+    if cache_config.get("enabled", False):
+        building_kwargs["geometry_cache_config"] = {
+            "max_entries": cache_config.get("max_entries", 256),
+            "round_decimals": cache_config.get("round_decimals", 3),
+            "quantize_step": cache_config.get("quantize_step")
+        }
+        # (rounding / quantization change the geometry => part of the fingerprints)
+        run_settings["geometry_cache"] = {
+            k: v for k, v in building_kwargs["geometry_cache_config"].items() if k != "max_entries"
+        }
+
+    # A1b) Optionally pre-sample every parameter of the portfolio as one
+    # matrix; the builders below take their picks from it (an extra pass over
+    # the pickers, not a speed-up)
+    presample_config = presample_config or {}
+    presampled = None
+    if presample_config.get("enabled", False):
+        with track("idf_creation.presample", items=len(df_buildings)):
+            matrix = presample_parameters(
+                df_buildings,
+                scenario=scenario,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config_geom=user_config_geom,
+                user_config_lighting=user_config_lighting,
+                user_config_dhw=user_config_dhw,
+                res_data=res_data,
+                nonres_data=nonres_data,
+                user_config_hvac=user_config_hvac,
+                user_config_vent=user_config_vent
+            )
+            matrix.to_csv(run_context.path("param_matrix.csv"))
+        presampled = matrix
+        logger.info(
+            f"[create_idfs_for_all_buildings] Parameter matrix: {matrix.values.shape[0]} buildings "
+            f"x {matrix.values.shape[1]} parameters => {run_context.path('param_matrix.csv')}"
+        )
+
+    # A1c) Optionally pre-compute the geometry of all buildings at once and
+    # flag the rows that cannot be built (geomz/geometry_batch.py)
+    infeasible = []
+    if geometry_config.get("precompute", False):
+        with track("idf_creation.geometry_precompute", items=len(df_buildings)):
+            portfolio_geometry = precompute_geometry(
+                df_buildings,
+                calibration_stage=calibration_stage,
+                strategy=strategy,
+                random_seed=random_seed,
+                user_config=user_config_geom,
+                zoning_policy=zoning_policy
+            )
+            flags_path = run_context.path("geometry_flags.csv")
+            os.makedirs(os.path.dirname(flags_path), exist_ok=True)
+            portfolio_geometry.flags.to_csv(flags_path)
+        building_kwargs["precomputed_geometry"] = portfolio_geometry
+        if geometry_config.get("skip_infeasible", True):
+            infeasible = portfolio_geometry.infeasible_index()
+        for idx, flag in portfolio_geometry.flags[portfolio_geometry.flags["infeasible"]].iterrows():
+            logger.error(
+                f"[create_idfs_for_all_buildings] Building index {idx} (ogc_fid={flag['ogc_fid']}) "
+                f"has infeasible geometry: {flag['reason']}"
+            )
+
+    # A2) Optionally group buildings that produce the same model
+    archetype_config = archetype_config or {}
+    archetype_groups = None
+    df_to_build = df_buildings
+    if archetype_config.get("dedup", False):
+        archetype_groups = assign_model_fingerprints(
+            df_buildings,
+            settings=run_settings,
+            override_configs=(
+                user_config_geom, user_config_lighting, user_config_dhw,
+                user_config_hvac, user_config_vent, res_data, nonres_data
+            ),
+            archetype_config=archetype_config
+        )
+        df_to_build = df_buildings.loc[list(archetype_groups.keys())]
+    if infeasible:
+        df_to_build = df_to_build.drop([idx for idx in infeasible if idx in df_to_build.index])
+        logger.warning(f"[create_idfs_for_all_buildings] {len(infeasible)} buildings skipped (infeasible geometry).")
+
+    # A2b) Incremental re-run: models whose buildings all kept their
+    # fingerprint since the last run (and whose IDF is on disk) are reused
+    incremental_config = incremental_config or {}
+    fingerprints = None
+    reused = set()
+    reused_ids = []
+    patch_plan = {}
+    patched_logs = {}
+    if incremental_config.get("enabled", False):
+        fingerprints = BuildingFingerprints(run_context.path("building_fingerprints.json"))
+        current_fps = fingerprints.compute(
+            df_buildings,
+            run_settings,
+            override_lists={
+                "geometry": user_config_geom,
+                "lighting": user_config_lighting,
+                "dhw": user_config_dhw,
+                "hvac": user_config_hvac,
+                "vent": user_config_vent,
+                "epw": user_config_epw,
+                "outputdef": output_definitions
+            },
             res_data=res_data,
             nonres_data=nonres_data,
-            assigned_fenez_log=assigned_fenez_log,
-            # HVAC
-            user_config_hvac=user_config_hvac,
-            assigned_hvac_log=assigned_hvac_log,
-            # Vent
-            user_config_vent=user_config_vent,
-            assigned_vent_log=assigned_vent_log,
-            # zone sizing
-            assigned_setzone_log=assigned_setzone_log,
-            # ground temps
-            assigned_groundtemp_log=assigned_groundtemp_log,
-            # output definitions
-            output_definitions=output_definitions
+            user_config_epw=user_config_epw,
+            extra_input_paths=incremental_config.get("extra_input_paths")
         )
-        # Store the final IDF filename in df_buildings
-        df_buildings.loc[idx, "idf_name"] = os.path.basename(idf_path)
+        unchanged = fingerprints.unchanged(current_fps, require_simulated=run_simulations)
+        groups = archetype_groups or {idx: [idx] for idx in df_buildings.index}
+        reused = {
+            rep_idx for rep_idx, members in groups.items()
+            if all(m in unchanged for m in members)
+            and os.path.isfile(building_model_path(run_context, rep_idx))
+        }
+        reused_ids = [
+            str(df_buildings.loc[m].get("ogc_fid", m)) for rep_idx in reused for m in groups[rep_idx]
+        ]
+
+        # Models where only some modules changed are patched, not rebuilt
+        # (idf_patching.py); their other modules keep their parameter log rows
+        if incremental_config.get("patch_modules", True) and run_context.output_format != "epjson":
+            changed = fingerprints.changed_modules(current_fps)
+            for rep_idx, members in groups.items():
+                if rep_idx in reused or not all(m in changed for m in members):
+                    continue
+                modules = set().union(*(changed[m] for m in members))
+                if "geometry" in modules or load_manifest(building_model_path(run_context, rep_idx)) is None:
+                    continue
+                patch_plan[rep_idx] = affected_modules(modules)
+                for m in members:
+                    patched_logs[str(df_buildings.loc[m].get("ogc_fid", m))] = [
+                        STORED_LOGS[MODULE_LOGS[module]] for module in patch_plan[rep_idx]
+                        if MODULE_LOGS.get(module) in STORED_LOGS
+                    ]
+            building_kwargs["patch_plan"] = patch_plan
+
+        fingerprints.save(current_fps, only_ids=reused_ids)
+        logger.info(
+            f"[create_idfs_for_all_buildings] Incremental: {len(reused)} of {len(groups)} models "
+            f"unchanged since the last run, {len(patch_plan)} patched."
+        )
+
+    # A3) Run journal for checkpoint / resume
+    journal_config = journal_config or {}
+    journal = None
+    if resume or journal_config.get("enabled", False):
+        journal = RunJournal(run_context.path("run_journal.jsonl"), resume=resume)
+        logger.info(f"[create_idfs_for_all_buildings] Run journal: {journal.summary()}")
+
+    # A4) On-disk parameter log; buildings are appended as they finish.
+    # A resumed run keeps the shards of earlier attempts and writes new ones.
+    param_log_config = param_log_config or {}
+    param_store = ParamLogStore(
+        run_context.path("param_log"),
+        shard_id=f"a{journal.attempt:02d}" if journal is not None else "main",
+        batch_size=param_log_config.get("batch_size", 5000),
+        fmt=param_log_config.get("format", "csv")
+    )
+    member_ids = _archetype_member_ids(df_buildings, archetype_groups)
+    resume_done = []
+    if not resume:
+        ParamLogStore.reset(param_store.root_dir, keep_ids=reused_ids, drop_modules=patched_logs)
+    else:
+        # Buildings the journal has no valid IDF for are built again: their
+        # rows from earlier attempts are superseded by the new ones
+        candidates = [idx for idx in df_to_build.index if idx not in reused]
+        resume_done = [
+            idx for idx in candidates
+            if journal.idf_done(idx, building_model_path(run_context, idx))
+        ]
+        done_set = set(resume_done)
+        rebuilt_ids = []
+        for idx in candidates:
+            if idx not in done_set:
+                rebuilt_ids.append(df_buildings.loc[idx].get("ogc_fid", idx))
+                rebuilt_ids.extend(member_ids.get(idx, []))
+        ParamLogStore.supersede(param_store.root_dir, rebuilt_ids)
+
+    if simulate_config is None:
+        simulate_config = {}
+    if post_process_config is None:
+        # Minimal fallback if not provided
+        post_process_config = {
+            "base_output_dir": run_context.sim_results_dir,
+            "outputs": [
+                {
+                    "convert_to_daily": False,
+                    "convert_to_monthly": False,
+                    "aggregator": "none",
+                    "output_csv": os.path.join(run_context.results_dir, "merged_as_is.csv")
+                }
+            ]
+        }
+    pipeline_config = pipeline_config or {}
+    streaming = pipeline_config.get("enabled", False) and run_simulations and post_process
+
+    # A5) Incremental / resume: keep IDFs that are unchanged on disk
+    # (the streaming generator skips / checks them itself, as it still needs their tasks)
+    if reused and not streaming:
+        for idx in reused:
+            df_buildings.loc[idx, "idf_name"] = os.path.basename(building_model_path(run_context, idx))
+        df_to_build = df_to_build.drop([idx for idx in reused if idx in df_to_build.index])
+
+    if resume and not streaming:
+        done = resume_done
+        for idx in done:
+            df_buildings.loc[idx, "idf_name"] = os.path.basename(building_model_path(run_context, idx))
+        if done:
+            logger.info(f"[create_idfs_for_all_buildings] Resume: {len(done)} IDFs already created.")
+            df_to_build = df_to_build.drop(done)
+
+    # B) Create an IDF for each building (or each distinct model)
+    if streaming:
+        # B0) Streaming: create, simulate and merge overlap (covers C and D merging)
+        logger.info("[create_idfs_for_all_buildings] => Streaming create -> simulate -> post-process ...")
+        fanout_map = {}
+        linter = make_linter(run_context.iddfile, lint_config)
+        sim_tasks = _generate_streaming_tasks(
+            df_buildings,
+            df_to_build,
+            archetype_groups,
+            building_kwargs,
+            assigned_logs,
+            param_store,
+            member_ids,
+            fanout_map,
+            run_context,
+            journal=journal,
+            base_output_dir=simulate_config.get("base_output_dir", run_context.sim_results_dir),
+            user_config_epw=user_config_epw,
+            assigned_epw_log=assigned_epw_log,
+            skip_creation=reused,
+            linter=linter,
+            presampled=presampled
+        )
+        run_streaming_pipeline(
+            sim_tasks,
+            merge_outputs=[
+                {**item, "output_csv": item.get(
+                    "output_csv", os.path.join(run_context.results_dir, "merged_default.csv"))}
+                for item in post_process_config.get("outputs", [])
+            ],
+            num_workers=simulate_config.get("num_workers", 4),
+            max_pending=pipeline_config.get("max_pending"),
+            fanout_map=fanout_map,
+            cleanup_sim_outputs=pipeline_config.get("cleanup_sim_outputs", False),
+            journal=journal,
+            reuse_results=reused
+        )
+        if linter is not None:
+            linter.write_report(lint_report_path(lint_config, run_context))
+    elif idf_workers and idf_workers > 1 and len(df_to_build) > 1:
+        # B1) Parallel: chunks of buildings in a process pool, logs merged in order.
+        # Each chunk is journaled when it finishes (its parameter shard is
+        # already closed), so a crash mid-pool can resume from there.
+        def journal_chunk(idf_names):
+            for idx, idf_name in idf_names:
+                journal.record_idf(idx, os.path.join(run_context.idf_output_dir, idf_name))
+
+        with track("idf_creation.parallel_generation", items=len(df_to_build)):
+            idf_names = _create_idfs_in_pool(
+                df_to_build,
+                building_kwargs,
+                assigned_logs,
+                param_store,
+                member_ids,
+                num_workers=idf_workers,
+                chunk_size=idf_chunk_size,
+                on_chunk_done=journal_chunk if journal is not None else None,
+                presampled=presampled
+            )
+        for idx, idf_name in idf_names:
+            df_buildings.loc[idx, "idf_name"] = idf_name
+    else:
+        # B2) Serial
+        for idx, row in df_to_build.iterrows():
+            bldg_id = row.get("ogc_fid", idx)
+            logger.info(f"--- Creating IDF for building index {idx}, ogc_fid={bldg_id} ---")
+
+            with track("idf_creation.create_idf_for_building", items=1), \
+                    use_presampled(presampled.picks if presampled is not None else None):
+                idf_path = create_idf_for_building(
+                    building_row=row,
+                    building_index=idx,
+                    **building_kwargs,
+                    **assigned_logs
+                )
+            # Store the final IDF filename in df_buildings
+            df_buildings.loc[idx, "idf_name"] = os.path.basename(idf_path)
+            param_store.append_building_logs(assigned_logs, bldg_id, member_ids.get(idx))
+            if journal is not None:
+                # parameter rows on disk before the building counts as done
+                param_store.flush()
+                journal.record_idf(idx, idf_path)
+
+    param_store.close()
+
+    # B3) Members of an archetype share the representative's IDF
+    # (their parameter log rows were already written by the store)
+    if archetype_groups is not None and not streaming:
+        fan_out_archetypes(df_buildings, archetype_groups, assigned_logs)
 
     # C) If requested, run simulations
-    if run_simulations:
+    if run_simulations and not streaming:
         logger.info("[create_idfs_for_all_buildings] => Running simulations ...")
-        idf_directory = idf_config["output_dir"]
-        iddfile       = idf_config["iddfile"]
-
-        if simulate_config is None:
-            simulate_config = {}
 
         # Example parallel sim
         simulate_all(
             df_buildings=df_buildings,
-            idf_directory=idf_directory,
-            iddfile=iddfile,
-            base_output_dir=simulate_config.get("base_output_dir", "output/Sim_Results"),
+            idf_directory=run_context.idf_output_dir,
+            iddfile=run_context.iddfile,
+            base_output_dir=simulate_config.get("base_output_dir", run_context.sim_results_dir),
             user_config_epw=user_config_epw,  # pass user epw overrides
             assigned_epw_log=assigned_epw_log,
-            num_workers=simulate_config.get("num_workers", 4)
-            ,
+            num_workers=simulate_config.get("num_workers", 4),
            # ep_force_overwrite=simulate_config.get("ep_force_overwrite", False)
+            run_context=run_context,
+            dedup_simulations=archetype_groups is not None,
+            journal=journal,
+            reuse_results=reused,
+            lint_config=lint_config
         )
 
     # D) If requested, post-process results and write assigned CSV logs
     if post_process:
         logger.info("[create_idfs_for_all_buildings] => Post-processing results & writing logs ...")
 
-        if post_process_config is None:
-            # Minimal fallback if not provided
-            post_process_config = {
-                "base_output_dir": "output/Sim_Results",
-                "outputs": [
-                    {
-                        "convert_to_daily": False,
-                        "convert_to_monthly": False,
-                        "aggregator": "none",
-                        "output_csv": "output/results/merged_as_is.csv"
-                    }
-                ]
-            }
-
-        base_output_dir = post_process_config.get("base_output_dir", "output/Sim_Results")
-        multiple_outputs = post_process_config.get("outputs", [])
+        base_output_dir = post_process_config.get("base_output_dir", run_context.sim_results_dir)
+        # (already merged per building in streaming mode)
+        multiple_outputs = [] if streaming else post_process_config.get("outputs", [])
 
         # Possibly handle multiple post-process outputs
         for proc_item in multiple_outputs:
             convert_daily = proc_item.get("convert_to_daily", False)
             convert_monthly = proc_item.get("convert_to_monthly", False)
             aggregator = proc_item.get("aggregator", "mean")  # daily aggregator
-            output_csv = proc_item.get("output_csv", "output/results/merged_default.csv")
+            output_csv = proc_item.get("output_csv", os.path.join(run_context.results_dir, "merged_default.csv"))
 
             merge_all_results(
                 base_output_dir=base_output_dir,
@@ -483,115 +1073,211 @@ def create_idfs_for_all_buildings(
                 convert_to_monthly=convert_monthly
             )
 
-        # Write CSV logs for assigned parameters
-        _write_geometry_csv(assigned_geom_log)
-        _write_lighting_csv(assigned_lighting_log)
-        _write_fenestration_csv(assigned_fenez_log)
-        _write_dhw_csv(assigned_dhw_log)
-        _write_hvac_csv(assigned_hvac_log)
-        _write_vent_csv(assigned_vent_log)
+        if journal is not None and multiple_outputs:
+            journal.record_post(df_buildings.index[df_buildings["idf_name"].notna()].tolist())
+
+        # Write CSV logs for assigned parameters (exported from the parameter log)
+        assigned_dir = run_context.assigned_dir
+        export_legacy_csvs(param_store.root_dir, assigned_dir)
+        if archetype_groups is not None:
+            _write_archetype_csv(archetype_rows(df_buildings, archetype_groups), assigned_dir)
         # (If needed, also EPW or groundtemp logs)
 
         logger.info("[create_idfs_for_all_buildings] => Done post-processing.")
 
+    if fingerprints is not None:
+        fingerprints.save(current_fps, simulated=run_simulations)
+
     return df_buildings  # includes "idf_name" column
 
 
 ###############################################################################
-# Internal Helper Functions to Write Assigned Logs
+# Parallel IDF generation helpers
 ###############################################################################
-def _write_geometry_csv(assigned_geom_log):
-    rows = []
-    for bldg_id, param_dict in assigned_geom_log.items():
-        for param_name, param_val in param_dict.items():
-            rows.append({
-                "ogc_fid": bldg_id,
-                "param_name": param_name,
-                "assigned_value": param_val
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_geometry.csv"
-    df.to_csv(out_path, index=False)
+def _create_idf_chunk(task):
+    """
+    Pool worker: creates the IDFs of one chunk of buildings with fresh log
+    dicts (and the chunk's pre-sampled picks, if any). Returns
+    (chunk_no, [(building_index, idf_name), ...], {log_name: log_dict}).
+    """
+    chunk_no, rows, building_kwargs, log_names, store_settings, shard_id, member_ids, picks = task
+    chunk_logs = {name: {} for name in log_names}
+    store = ParamLogStore(shard_id=shard_id, **store_settings)
+    idf_names = []
+    for idx, row in rows:
+        bldg_id = row.get("ogc_fid", idx)
+        logging.getLogger(__name__).info(f"--- Creating IDF for building index {idx}, ogc_fid={bldg_id} ---")
+        with use_presampled(picks):
+            idf_path = create_idf_for_building(
+                building_row=row,
+                building_index=idx,
+                **building_kwargs,
+                **chunk_logs
+            )
+        idf_names.append((idx, os.path.basename(idf_path)))
+        store.append_building_logs(chunk_logs, bldg_id, member_ids.get(idx))
+    store.close()
+    return chunk_no, idf_names, chunk_logs
 
 
-def _write_lighting_csv(assigned_lighting_log):
-    rows = []
-    for bldg_id, param_dict in assigned_lighting_log.items():
-        for param_name, subdict in param_dict.items():
-            assigned_val = subdict.get("assigned_value")
-            min_v = subdict.get("min_val")
-            max_v = subdict.get("max_val")
-            obj_name = subdict.get("object_name", "")
-            rows.append({
-                "ogc_fid": bldg_id,
-                "object_name": obj_name,
-                "param_name": param_name,
-                "assigned_value": assigned_val,
-                "min_val": min_v,
-                "max_val": max_v
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_lighting.csv"
-    df.to_csv(out_path, index=False)
+def _merge_assigned_log(target, source):
+    """
+    Merges one worker's log into the run log the same way the serial loop
+    would have filled it (per ogc_fid, later buildings update earlier ones).
+    """
+    for bldg_id, entries in source.items():
+        if isinstance(target.get(bldg_id), dict) and isinstance(entries, dict):
+            target[bldg_id].update(entries)
+        else:
+            target[bldg_id] = entries
 
 
-def _write_fenestration_csv(assigned_fenez_log):
-    rows = []
-    for bldg_id, param_dict in assigned_fenez_log.items():
-        for key, val in param_dict.items():
-            rows.append({
-                "ogc_fid": bldg_id,
-                "param_name": key,
-                "assigned_value": val
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_fenez_params.csv"
-    df.to_csv(out_path, index=False)
+def _create_idfs_in_pool(df_buildings, building_kwargs, assigned_logs, param_store, member_ids,
+                         num_workers=4, chunk_size=None, on_chunk_done=None, presampled=None):
+    """
+    Creates the IDFs of df_buildings in a multiprocessing Pool.
+    Chunks are processed and collected in any order; their logs are merged
+    in submission order at the end, so the merged assigned logs match the
+    serial loop. Every chunk writes its own parameter-log shard (named by
+    chunk number, so shards read back in building order).
+    on_chunk_done([(building_index, idf_name), ...]) is called as soon as a
+    chunk is finished (its shard closed), e.g. to journal its buildings.
+    presampled: ParameterMatrix (presample.py) whose picks the builders
+    use; each chunk only gets the picks of its own buildings.
+    """
+    rows = list(df_buildings.iterrows())
+    if not chunk_size:
+        chunk_size = max(1, math.ceil(len(rows) / (num_workers * 4)))
+    log_names = list(assigned_logs.keys())
+    tasks = [
+        (
+            i // chunk_size, rows[i:i + chunk_size], building_kwargs, log_names,
+            param_store.settings(), f"{param_store.shard_id}-c{i // chunk_size:05d}",
+            {idx: member_ids[idx] for idx, _ in rows[i:i + chunk_size] if idx in member_ids},
+            presampled.picks_for(
+                [f for idx, row in rows[i:i + chunk_size] for f in (row.get("ogc_fid", idx), idx)]
+            ) if presampled is not None else None
+        )
+        for i in range(0, len(rows), chunk_size)
+    ]
+    logging.getLogger(__name__).info(
+        f"[create_idfs_for_all_buildings] => {len(rows)} buildings in {len(tasks)} chunks "
+        f"of <= {chunk_size}, using {num_workers} workers."
+    )
 
+    results = {}
+    with Pool(num_workers) as pool:
+        for chunk_no, idf_names, chunk_logs in pool.imap_unordered(_create_idf_chunk, tasks):
+            results[chunk_no] = (idf_names, chunk_logs)
+            if on_chunk_done is not None:
+                on_chunk_done(idf_names)
 
-def _write_dhw_csv(assigned_dhw_log):
-    rows = []
-    for bldg_id, param_dict in assigned_dhw_log.items():
-        for param_name, param_val in param_dict.items():
-            rows.append({
-                "ogc_fid": bldg_id,
-                "param_name": param_name,
-                "assigned_value": param_val
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_dhw_params.csv"
-    df.to_csv(out_path, index=False)
+    all_idf_names = []
+    for chunk_no in sorted(results):
+        idf_names, chunk_logs = results[chunk_no]
+        all_idf_names.extend(idf_names)
+        for name, log in chunk_logs.items():
+            _merge_assigned_log(assigned_logs[name], log)
+    return all_idf_names
 
 
-def _write_hvac_csv(assigned_hvac_log):
-    rows = []
-    for bldg_id, param_dict in assigned_hvac_log.items():
-        for param_name, param_val in param_dict.items():
-            rows.append({
-                "ogc_fid": bldg_id,
-                "param_name": param_name,
-                "assigned_value": param_val
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_hvac_params.csv"
-    df.to_csv(out_path, index=False)
+def _archetype_member_ids(df_buildings, archetype_groups):
+    """
+    {representative_index: [ogc_fid of every member]} for the parameter log;
+    empty without archetype deduplication.
+    """
+    if archetype_groups is None:
+        return {}
+    return {
+        rep_idx: [df_buildings.loc[m].get("ogc_fid", m) for m in members]
+        for rep_idx, members in archetype_groups.items()
+    }
 
 
-def _write_vent_csv(assigned_vent_log):
-    rows = []
-    for bldg_id, param_dict in assigned_vent_log.items():
-        for param_name, param_val in param_dict.items():
-            rows.append({
-                "ogc_fid": bldg_id,
-                "param_name": param_name,
-                "assigned_value": param_val
-            })
-    df = pd.DataFrame(rows)
-    os.makedirs("output/assigned", exist_ok=True)
-    out_path = "output/assigned/assigned_ventilation.csv"
+###############################################################################
+# Streaming pipeline helper
+###############################################################################
+def _generate_streaming_tasks(
+    df_buildings,
+    df_to_build,
+    archetype_groups,
+    building_kwargs,
+    assigned_logs,
+    param_store,
+    member_ids,
+    fanout_map,
+    run_context,
+    base_output_dir,
+    user_config_epw=None,
+    assigned_epw_log=None,
+    journal=None,
+    skip_creation=(),
+    linter=None,
+    presampled=None
+):
+    """
+    Generator stage of the streaming pipeline: creates one IDF at a time and
+    yields its simulation task(s) right away. With archetype groups, the
+    members get the representative's IDF and logs, and identical
+    (IDF, EPW, year folder) tasks are recorded in fanout_map instead of
+    being simulated again. In resume mode, IDFs still valid per the journal,
+    and the models in skip_creation (incremental runs), are not re-created
+    (their tasks are still yielded). With a linter, tasks whose model fails
+    the pre-simulation checks are dropped. With presampled (a
+    ParameterMatrix), the builders take their picks from it.
+    """
+    logger = logging.getLogger(__name__)
+    seen = {}
+    for idx, row in df_to_build.iterrows():
+        bldg_id = row.get("ogc_fid", idx)
+        idf_path = building_model_path(run_context, idx)
+
+        reuse_idf = idx in skip_creation or (journal is not None and journal.idf_done(idx, idf_path))
+        if not reuse_idf:
+            logger.info(f"--- Creating IDF for building index {idx}, ogc_fid={bldg_id} ---")
+            with track("idf_creation.create_idf_for_building", items=1), \
+                    use_presampled(presampled.picks if presampled is not None else None):
+                idf_path = create_idf_for_building(
+                    building_row=row,
+                    building_index=idx,
+                    **building_kwargs,
+                    **assigned_logs
+                )
+            param_store.append_building_logs(assigned_logs, bldg_id, member_ids.get(idx))
+            if journal is not None:
+                param_store.flush()
+                journal.record_idf(idx, idf_path)
+        df_buildings.loc[idx, "idf_name"] = os.path.basename(idf_path)
+
+        members = [idx]
+        if archetype_groups is not None:
+            members = archetype_groups[idx]
+            fan_out_archetypes(df_buildings, {idx: members}, assigned_logs)
+
+        for task in generate_simulations(
+            df_buildings.loc[members],
+            run_context.idf_output_dir,
+            run_context.iddfile,
+            base_output_dir,
+            user_config_epw=user_config_epw,
+            assigned_epw_log=assigned_epw_log
+        ):
+            task_idf, task_epw, _, task_dir, task_idx = task
+            key = (task_idf, task_epw, task_dir)
+            if key in seen:
+                fanout_map.setdefault(seen[key], []).append(task_idx)
+                continue
+            seen[key] = task_idx
+            if linter is not None and not lint_task(linter, task, journal):
+                continue
+            yield task
+
+
+###############################################################################
+# Internal Helper Functions to Write Assigned Logs
+###############################################################################
+def _write_archetype_csv(archetype_rows, assigned_dir="output/assigned"):
+    df = pd.DataFrame(archetype_rows)
+    os.makedirs(assigned_dir, exist_ok=True)
+    out_path = os.path.join(assigned_dir, "assigned_archetypes.csv")
     df.to_csv(out_path, index=False)
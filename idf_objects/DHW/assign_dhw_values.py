@@ -1,6 +1,7 @@
 # DHW/assign_dhw_values.py
 
-import random
+from rng_streams import BuildingRandom, draw_uniform
+from override_resolver import find_overrides
 from .dhw_lookup import dhw_lookup
 
 def find_dhw_overrides(
@@ -34,54 +35,33 @@ def find_dhw_overrides(
       }
       etc.
     """
-    matches = []
-    for row in (user_config or []):
-        # 1) If row has "building_id", must match building_id
-        if "building_id" in row:
-            if row["building_id"] is not None and row["building_id"] != building_id:
-                continue
-
-        # 2) If row has "dhw_key", must match dhw_key
-        if "dhw_key" in row:
-            if row["dhw_key"] is not None and row["dhw_key"] != dhw_key:
-                continue
-
-        # 3) If row has "building_function", must match (case-insensitive)
-        if "building_function" in row:
-            if row["building_function"] is not None:
-                if building_function is None:
-                    continue
-                if row["building_function"].lower() != building_function.lower():
-                    continue
-
-        # 4) If row has "age_range", must match exactly
-        if "age_range" in row:
-            if row["age_range"] is not None:
-                if age_range is None:
-                    continue
-                if row["age_range"] != age_range:
-                    continue
-
-        # If we haven't continued away, it's a match
-        matches.append(row)
-    return matches
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides(
+        "dhw", user_config,
+        building_id=building_id,
+        dhw_key=dhw_key,
+        building_function=building_function,
+        age_range=age_range
+    )
 
 def pick_val_with_range(
     rng_tuple,
     strategy: str = "A",
     log_dict: dict = None,
-    param_name: str = None
+    param_name: str = None,
+    rng=None
 ):
     """
     rng_tuple = (min_val, max_val)
     strategy  = "A" => pick midpoint
-                "B" => random.uniform(min_val, max_val)
+                "B" => uniform draw from the building's random stream
                 else => pick min_val as fallback
 
     If log_dict is provided, store the final chosen value and (min_val, max_val)
     under keys like log_dict[param_name] and log_dict[f"{param_name}_range"].
 
     If both min_val and max_val are None => final value is None (no range).
+    rng => BuildingRandom of the building (rng_streams.py) for strategy "B".
     """
     if rng_tuple is None or len(rng_tuple) < 2:
         chosen = None
@@ -101,7 +81,7 @@ def pick_val_with_range(
     if strategy == "A":
         chosen = (min_val + max_val) / 2.0
     elif strategy == "B":
-        chosen = random.uniform(min_val, max_val)
+        chosen = draw_uniform(rng, min_val, max_val, param_name)
     else:
         chosen = min_val
 
@@ -149,9 +129,8 @@ def assign_dhw_parameters(
       6) Return a dict with final picks. Also store them in assigned_dhw_log if provided.
     """
 
-    # optional reproducibility
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Per-building random stream => reproducible regardless of order / process
+    rng = BuildingRandom(random_seed, building_id, "dhw")
 
     # Ensure assigned_dhw_log has a subdict for building_id
     if assigned_dhw_log is not None and building_id is not None:
@@ -268,18 +247,18 @@ def assign_dhw_parameters(
     # 4) Now pick final numeric values for each parameter
     logd = assigned_dhw_log[building_id] if (assigned_dhw_log and (building_id in assigned_dhw_log)) else None
 
-    occupant_density = pick_val_with_range(occdens_rng, strategy, logd, "occupant_density_m2_per_person")
-    liters_pp_day    = pick_val_with_range(liters_rng,  strategy, logd, "liters_per_person_per_day")
-    tank_vol         = pick_val_with_range(vol_rng,     strategy, logd, "default_tank_volume_liters")
-    heater_cap       = pick_val_with_range(cap_rng,     strategy, logd, "default_heater_capacity_w")
-    setpoint_c       = pick_val_with_range(setp_rng,    strategy, logd, "setpoint_c")
-    usage_split      = pick_val_with_range(usplit_rng,  strategy, logd, "usage_split_factor")
-    peak_hrs         = pick_val_with_range(peak_rng,    strategy, logd, "peak_hours")
-
-    sch_morn = pick_val_with_range(sched_morn_rng,   strategy, logd, "sched_morning")
-    sch_peak = pick_val_with_range(sched_peak_rng,   strategy, logd, "sched_peak")
-    sch_after= pick_val_with_range(sched_aftern_rng, strategy, logd, "sched_afternoon")
-    sch_even = pick_val_with_range(sched_even_rng,   strategy, logd, "sched_evening")
+    occupant_density = pick_val_with_range(occdens_rng, strategy, logd, "occupant_density_m2_per_person", rng)
+    liters_pp_day    = pick_val_with_range(liters_rng,  strategy, logd, "liters_per_person_per_day", rng)
+    tank_vol         = pick_val_with_range(vol_rng,     strategy, logd, "default_tank_volume_liters", rng)
+    heater_cap       = pick_val_with_range(cap_rng,     strategy, logd, "default_heater_capacity_w", rng)
+    setpoint_c       = pick_val_with_range(setp_rng,    strategy, logd, "setpoint_c", rng)
+    usage_split      = pick_val_with_range(usplit_rng,  strategy, logd, "usage_split_factor", rng)
+    peak_hrs         = pick_val_with_range(peak_rng,    strategy, logd, "peak_hours", rng)
+
+    sch_morn = pick_val_with_range(sched_morn_rng,   strategy, logd, "sched_morning", rng)
+    sch_peak = pick_val_with_range(sched_peak_rng,   strategy, logd, "sched_peak", rng)
+    sch_after= pick_val_with_range(sched_aftern_rng, strategy, logd, "sched_afternoon", rng)
+    sch_even = pick_val_with_range(sched_even_rng,   strategy, logd, "sched_evening", rng)
 
     # 5) If use_nta => override occupant usage from building_row in a second pass
     if use_nta and (building_row is not None):
@@ -1,6 +1,6 @@
 # Elec/assign_lighting_values.py
 
-import random
+from rng_streams import BuildingRandom
 from .lighting_lookup import lighting_lookup
 from .constants import (
     DEFAULT_LIGHTING_WM2,
@@ -45,7 +45,7 @@ def assign_lighting_parameters(
       3) Override the relevant ranges with those rows (either fixed_value => (v,v) or min_val/max_val).
       4) Pick the final assigned value from the resulting range using strategy:
          - "A" => midpoint
-         - "B" => random.uniform
+         - "B" => uniform draw from the building's random stream (rng_streams)
          - else => pick the lower bound
       5) Construct a final dict describing the assigned values 
          and (optionally) store in assigned_log[building_id].
@@ -92,9 +92,8 @@ def assign_lighting_parameters(
         }
     """
 
-    # (A) Set random seed if specified
-    if random_seed is not None:
-        random.seed(random_seed)
+    # (A) Per-building random stream (reproducible when random_seed is set)
+    rng = BuildingRandom(random_seed, building_id, "lighting")
 
     # (B) Get the "stage_dict" for the given calibration_stage
     if calibration_stage not in lighting_lookup:
@@ -234,26 +233,26 @@ def assign_lighting_parameters(
             # else param_name not recognized => ignore
 
     # Helper to pick final value from a (min,max) range
-    def pick_val(r):
+    def pick_val(r, param_name):
         if strategy == "A":   # midpoint
             return (r[0] + r[1]) / 2.0
         elif strategy == "B": # random
-            return random.uniform(r[0], r[1])
+            return rng.uniform(r[0], r[1], param_name)
         else:
             # fallback => pick min
             return r[0]
 
     # (G) Pick final values
-    assigned_lights = pick_val(lights_rng)
-    assigned_paras  = pick_val(parasitic_rng)
-    assigned_tD     = pick_val(tD_rng)
-    assigned_tN     = pick_val(tN_rng)
+    assigned_lights = pick_val(lights_rng, "lights_wm2")
+    assigned_paras  = pick_val(parasitic_rng, "parasitic_wm2")
+    assigned_tD     = pick_val(tD_rng, "tD")
+    assigned_tN     = pick_val(tN_rng, "tN")
 
-    assigned_lights_frac_rad = pick_val(lights_fraction_radiant_rng)
-    assigned_lights_frac_vis = pick_val(lights_fraction_visible_rng)
-    assigned_lights_frac_rep = pick_val(lights_fraction_replace_rng)
-    assigned_equip_frac_rad  = pick_val(equip_fraction_radiant_rng)
-    assigned_equip_frac_lost = pick_val(equip_fraction_lost_rng)
+    assigned_lights_frac_rad = pick_val(lights_fraction_radiant_rng, "lights_fraction_radiant")
+    assigned_lights_frac_vis = pick_val(lights_fraction_visible_rng, "lights_fraction_visible")
+    assigned_lights_frac_rep = pick_val(lights_fraction_replace_rng, "lights_fraction_replaceable")
+    assigned_equip_frac_rad  = pick_val(equip_fraction_radiant_rng, "equip_fraction_radiant")
+    assigned_equip_frac_lost = pick_val(equip_fraction_lost_rng, "equip_fraction_lost")
 
     # (H) Build final dict
     assigned = {
@@ -1,6 +1,7 @@
 # HVAC/assign_hvac_values.py
 
-import random
+from rng_streams import BuildingRandom, draw_uniform
+from override_resolver import find_overrides, resolve_nested
 from .hvac_lookup import hvac_lookup
 
 def find_hvac_overrides(
@@ -17,35 +18,26 @@ def find_hvac_overrides(
     Returns a list of user_config rows that match the specified building_id, 
     building_function, etc.
     """
-    matches = []
-    for row in user_config or []:
-        if "building_id" in row and row["building_id"] != building_id:
-            continue
-        if "building_function" in row and row["building_function"] != building_function:
-            continue
-
-        if "residential_type" in row and row["residential_type"] != residential_type:
-            continue
-        if "non_residential_type" in row and row["non_residential_type"] != non_residential_type:
-            continue
-
-        if "age_range" in row and row["age_range"] != age_range:
-            continue
-        if "scenario" in row and row["scenario"] != scenario:
-            continue
-        if "calibration_stage" in row and row["calibration_stage"] != calibration_stage:
-            continue
-
-        matches.append(row)
-    return matches
-
-
-def pick_val_with_range(rng_tuple, strategy="A", log_dict=None, param_name=None):
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides(
+        "hvac", user_config,
+        building_id=building_id,
+        building_function=building_function,
+        residential_type=residential_type,
+        non_residential_type=non_residential_type,
+        age_range=age_range,
+        scenario=scenario,
+        calibration_stage=calibration_stage
+    )
+
+
+def pick_val_with_range(rng_tuple, strategy="A", log_dict=None, param_name=None, rng=None):
     """
     rng_tuple = (min_val, max_val).
     strategy  = "A" => midpoint, "B" => random, else => pick min_val.
     log_dict  => optional dict to store param_name_range + param_name => chosen_value
     param_name=> e.g. "heating_day_setpoint".
+    rng       => BuildingRandom of the building (rng_streams.py) for strategy "B".
 
     Returns the chosen numeric value.
     Also logs (param_name + param_name_range) if log_dict is provided.
@@ -56,7 +48,7 @@ def pick_val_with_range(rng_tuple, strategy="A", log_dict=None, param_name=None)
     if strategy == "A":  # midpoint
         chosen = (min_v + max_v) / 2.0
     elif strategy == "B":
-        chosen = random.uniform(min_v, max_v)
+        chosen = draw_uniform(rng, min_v, max_v, param_name)
     else:
         chosen = min_v  # default => pick min
 
@@ -79,11 +71,14 @@ def assign_hvac_ideal_parameters(
     strategy="A",
     random_seed=None,
     user_config_hvac=None,
-    assigned_hvac_log=None
+    assigned_hvac_log=None,
+    construction_year=None
 ):
     """
     1) Looks up default parameter ranges from hvac_lookup using 
        (calibration_stage, scenario, building_function, subtype, age_range).
+       An age_range missing from the lookup is matched by construction_year
+       (e.g. building_row["bouwjaar"]) to the age range containing it.
     2) Applies user_config overrides to update those ranges or fix values.
     3) Picks final values using pick_val_with_range(...).
     4) Builds a single dictionary 'final_hvac_params' that includes both the 
@@ -109,41 +104,31 @@ def assign_hvac_ideal_parameters(
     }
     """
 
-    # For reproducibility if desired
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Per-building random stream => reproducible regardless of order / process
+    rng = BuildingRandom(random_seed, building_id, "hvac")
 
     # 1) Fallback if stage not in hvac_lookup
     if calibration_stage not in hvac_lookup:
         calibration_stage = "pre_calibration"
-    stage_block = hvac_lookup[calibration_stage]
-
-    # scenario fallback
-    if scenario not in stage_block:
-        scenario = next(iter(stage_block.keys()))
-    scenario_block = stage_block[scenario]
 
-    # building_function fallback
-    if building_function not in scenario_block:
-        building_function = next(iter(scenario_block.keys()))
-    bf_block = scenario_block[building_function]
+    # scenario / building_function fallback => first key
+    (scenario, building_function), bf_block = resolve_nested(
+        hvac_lookup[calibration_stage], [scenario, building_function]
+    )
 
     # Determine subtype
     # If building_function=="residential", use 'residential_type'
     # else use 'non_residential_type'
     if building_function and building_function.lower() == "residential":
-        subtype = residential_type or next(iter(bf_block.keys()))
+        subtype = residential_type
     else:
-        subtype = non_residential_type or next(iter(bf_block.keys()))
-
-    if subtype not in bf_block:
-        subtype = next(iter(bf_block.keys()))
-    sub_block = bf_block[subtype]
+        subtype = non_residential_type
 
-    # age_range fallback
-    if age_range not in sub_block:
-        age_range = next(iter(sub_block.keys()))
-    final_block = sub_block[age_range]
+    # subtype fallback => first key; an age_range missing from the lookup is
+    # matched to the interval containing construction_year, else first key
+    (subtype, age_range), final_block = resolve_nested(
+        bf_block, [subtype or None, age_range], year=construction_year, age_level=1
+    )
 
     # final_block might have:
     # {
@@ -213,12 +198,12 @@ def assign_hvac_ideal_parameters(
         # etc. This depends on how you structure your user config.
 
     # 4) Pick final numeric values using pick_val_with_range
-    heating_day_setpoint      = pick_val_with_range(heat_day_rng,     strategy, local_log, "heating_day_setpoint")
-    heating_night_setpoint    = pick_val_with_range(heat_night_rng,   strategy, local_log, "heating_night_setpoint")
-    cooling_day_setpoint      = pick_val_with_range(cool_day_rng,     strategy, local_log, "cooling_day_setpoint")
-    cooling_night_setpoint    = pick_val_with_range(cool_night_rng,   strategy, local_log, "cooling_night_setpoint")
-    max_heating_supply_air_temp=pick_val_with_range(max_heat_air_rng, strategy, local_log, "max_heating_supply_air_temp")
-    min_cooling_supply_air_temp=pick_val_with_range(min_cool_air_rng, strategy, local_log, "min_cooling_supply_air_temp")
+    heating_day_setpoint      = pick_val_with_range(heat_day_rng,     strategy, local_log, "heating_day_setpoint", rng)
+    heating_night_setpoint    = pick_val_with_range(heat_night_rng,   strategy, local_log, "heating_night_setpoint", rng)
+    cooling_day_setpoint      = pick_val_with_range(cool_day_rng,     strategy, local_log, "cooling_day_setpoint", rng)
+    cooling_night_setpoint    = pick_val_with_range(cool_night_rng,   strategy, local_log, "cooling_night_setpoint", rng)
+    max_heating_supply_air_temp=pick_val_with_range(max_heat_air_rng, strategy, local_log, "max_heating_supply_air_temp", rng)
+    min_cooling_supply_air_temp=pick_val_with_range(min_cool_air_rng, strategy, local_log, "min_cooling_supply_air_temp", rng)
 
     # 5) Build a single dictionary with final picks + ranges + schedule_details
     final_hvac_params = {
@@ -1,6 +1,36 @@
 # HVAC/custom_hvac.py
 
 from .assign_hvac_values import assign_hvac_ideal_parameters
+from idf_objects.other.idf_index import get_idf_index
+
+
+def add_hvac_schedule_type_limits(idf):
+    """
+    Building-independent objects used by the Ideal Loads setup:
+    SCHEDULETYPELIMITS "Temperature" / "ControlType" and the
+    "ZONE CONTROL TYPE SCHEDULE". Only created if missing.
+    """
+    if not idf.getobject("SCHEDULETYPELIMITS", "Temperature"):
+        stl = idf.newidfobject("SCHEDULETYPELIMITS")
+        stl.Name = "Temperature"
+        stl.Lower_Limit_Value = -100
+        stl.Upper_Limit_Value = 200
+        stl.Numeric_Type = "CONTINUOUS"
+
+    if not idf.getobject("SCHEDULETYPELIMITS", "ControlType"):
+        stl = idf.newidfobject("SCHEDULETYPELIMITS")
+        stl.Name = "ControlType"
+        stl.Lower_Limit_Value = 0
+        stl.Upper_Limit_Value = 4
+        stl.Numeric_Type = "DISCRETE"
+
+    if not idf.getobject("SCHEDULE:COMPACT", "ZONE CONTROL TYPE SCHEDULE"):
+        sc = idf.newidfobject("SCHEDULE:COMPACT")
+        sc.Name = "ZONE CONTROL TYPE SCHEDULE"
+        sc.Schedule_Type_Limits_Name = "ControlType"
+        sc.Field_1 = "Through: 12/31"
+        sc.Field_2 = "For: AllDays"
+        sc.Field_3 = "Until: 24:00,4"  # dual setpoint
 
 def add_HVAC_Ideal_to_all_zones(
     idf,
@@ -55,7 +85,8 @@ def add_HVAC_Ideal_to_all_zones(
         strategy=strategy,
         random_seed=random_seed,
         user_config_hvac=user_config_hvac,
-        assigned_hvac_log=assigned_hvac_log
+        assigned_hvac_log=assigned_hvac_log,
+        construction_year=building_row.get("bouwjaar")
     )
     # Example contents of hvac_params:
     # {
@@ -69,29 +100,9 @@ def add_HVAC_Ideal_to_all_zones(
     # If assigned_hvac_log is not None, we already have hvac_params stored under
     # assigned_hvac_log[bldg_id]["hvac_params"] (done inside assign_hvac_values.py).
 
-    # 3) Ensure schedule type limits exist
-    if not idf.getobject("SCHEDULETYPELIMITS", "Temperature"):
-        stl = idf.newidfobject("SCHEDULETYPELIMITS")
-        stl.Name = "Temperature"
-        stl.Lower_Limit_Value = -100
-        stl.Upper_Limit_Value = 200
-        stl.Numeric_Type = "CONTINUOUS"
-
-    if not idf.getobject("SCHEDULETYPELIMITS", "ControlType"):
-        stl = idf.newidfobject("SCHEDULETYPELIMITS")
-        stl.Name = "ControlType"
-        stl.Lower_Limit_Value = 0
-        stl.Upper_Limit_Value = 4
-        stl.Numeric_Type = "DISCRETE"
-
-    # 4) Create a control type schedule if missing
-    if not idf.getobject("SCHEDULE:COMPACT", "ZONE CONTROL TYPE SCHEDULE"):
-        sc = idf.newidfobject("SCHEDULE:COMPACT")
-        sc.Name = "ZONE CONTROL TYPE SCHEDULE"
-        sc.Schedule_Type_Limits_Name = "ControlType"
-        sc.Field_1 = "Through: 12/31"
-        sc.Field_2 = "For: AllDays"
-        sc.Field_3 = "Until: 24:00,4"  # dual setpoint
+    # 3) + 4) Ensure schedule type limits + control type schedule exist
+    #    (already present when the IDF comes from the prepared template)
+    add_hvac_schedule_type_limits(idf)
 
     # 5) Build or update the Heating Setpoint schedule (simplified example)
     #    We'll define day from 07:00-19:00 => day setpoint
@@ -153,19 +164,14 @@ def add_HVAC_Ideal_to_all_zones(
     if assigned_hvac_log is not None and "zones" not in assigned_hvac_log[bldg_id]:
         assigned_hvac_log[bldg_id]["zones"] = {}
 
+    # Type / name / zone lookups in O(1) instead of a scan per zone
+    index = get_idf_index(idf)
+
     for zone_obj in zones:
         zone_name = zone_obj.Name
 
         # 7a) Thermostat
-        existing_thermo = [
-            t for t in idf.idfobjects["ZONECONTROL:THERMOSTAT"]
-            if (
-                (hasattr(t, "Zone_or_ZoneList_or_Space_or_SpaceList_Name") and
-                 getattr(t, "Zone_or_ZoneList_or_Space_or_SpaceList_Name") == zone_name)
-                or
-                (hasattr(t, "Zone_or_ZoneList_Name") and t.Zone_or_ZoneList_Name == zone_name)
-            )
-        ]
+        existing_thermo = index.for_zone("ZONECONTROL:THERMOSTAT", zone_name)
         if not existing_thermo:
             thermo = idf.newidfobject("ZONECONTROL:THERMOSTAT")
             thermo.Name = f"{zone_name} CONTROLS"
@@ -176,6 +182,7 @@ def add_HVAC_Ideal_to_all_zones(
             thermo.Control_Type_Schedule_Name = "ZONE CONTROL TYPE SCHEDULE"
             thermo.Control_1_Object_Type = "ThermostatSetpoint:DualSetpoint"
             thermo.Control_1_Name = f"{zone_name} SETPOINTS"
+            index.add(thermo)
 
             # ThermostatSetpoint:DualSetpoint
             dual = idf.newidfobject("THERMOSTATSETPOINT:DUALSETPOINT")
@@ -187,10 +194,7 @@ def add_HVAC_Ideal_to_all_zones(
             pass
 
         # 7b) EquipmentConnections
-        existing_equip_conns = [
-            ec for ec in idf.idfobjects["ZONEHVAC:EQUIPMENTCONNECTIONS"]
-            if ec.Zone_Name == zone_name
-        ]
+        existing_equip_conns = index.for_zone("ZONEHVAC:EQUIPMENTCONNECTIONS", zone_name)
         if not existing_equip_conns:
             eq_conn = idf.newidfobject("ZONEHVAC:EQUIPMENTCONNECTIONS")
             eq_conn.Zone_Name = zone_name
@@ -199,13 +203,10 @@ def add_HVAC_Ideal_to_all_zones(
             eq_conn.Zone_Air_Exhaust_Node_or_NodeList_Name = ""
             eq_conn.Zone_Air_Node_Name = f"{zone_name} NODE"
             eq_conn.Zone_Return_Air_Node_or_NodeList_Name = f"{zone_name} OUTLET"
+            index.add(eq_conn)
 
         # 7c) EquipmentList
-        existing_equip_lists = [
-            el for el in idf.idfobjects["ZONEHVAC:EQUIPMENTLIST"]
-            if el.Name == f"{zone_name} EQUIPMENT"
-        ]
-        if not existing_equip_lists:
+        if index.get("ZONEHVAC:EQUIPMENTLIST", f"{zone_name} EQUIPMENT") is None:
             eq_list = idf.newidfobject("ZONEHVAC:EQUIPMENTLIST")
             eq_list.Name = f"{zone_name} EQUIPMENT"
             eq_list.Load_Distribution_Scheme = "SequentialLoad"
@@ -213,13 +214,11 @@ def add_HVAC_Ideal_to_all_zones(
             eq_list.Zone_Equipment_1_Name = f"{zone_name} Ideal Loads"
             eq_list.Zone_Equipment_1_Cooling_Sequence = 1
             eq_list.Zone_Equipment_1_Heating_or_NoLoad_Sequence = 1
+            index.add(eq_list)
 
         # 7d) IdealLoads
-        existing_ideal = [
-            ild for ild in idf.idfobjects["ZONEHVAC:IDEALLOADSAIRSYSTEM"]
-            if ild.Name == f"{zone_name} Ideal Loads"
-        ]
-        if not existing_ideal:
+        ideal = index.get("ZONEHVAC:IDEALLOADSAIRSYSTEM", f"{zone_name} Ideal Loads")
+        if ideal is None:
             ideal = idf.newidfobject("ZONEHVAC:IDEALLOADSAIRSYSTEM")
             ideal.Name = f"{zone_name} Ideal Loads"
             ideal.Availability_Schedule_Name = ""  # or "AlwaysOn"
@@ -240,18 +239,18 @@ def add_HVAC_Ideal_to_all_zones(
             ideal.Maximum_Cooling_Air_Flow_Rate = "Autosize"
             ideal.Dehumidification_Control_Type = "ConstantSupplyHumidityRatio"
             ideal.Humidification_Control_Type = "ConstantSupplyHumidityRatio"
+            index.add(ideal)
         else:
             # Update the existing IdealLoads object
-            ideal = existing_ideal[0]
             ideal.Maximum_Heating_Supply_Air_Temperature = max_heat_temp
             ideal.Minimum_Cooling_Supply_Air_Temperature = min_cool_temp
 
         # 7e) NodeList for supply inlets
-        existing_inlet_list = idf.getobject("NODELIST", f"{zone_name} INLETS")
-        if not existing_inlet_list:
+        if index.get("NODELIST", f"{zone_name} INLETS") is None:
             nlist = idf.newidfobject("NODELIST")
             nlist.Name = f"{zone_name} INLETS"
             nlist.Node_1_Name = f"{zone_name} INLET"
+            index.add(nlist)
 
         # 7f) Store zone-level data in assigned_hvac_log
         if assigned_hvac_log is not None:
@@ -1,6 +1,6 @@
 # eequip/assign_equip_values.py
 
-import random
+from rng_streams import BuildingRandom
 from .equip_lookup import equip_lookup
 from .overrides_helper import find_applicable_overrides  # if you use override logic
 
@@ -29,8 +29,7 @@ def assign_equipment_parameters(
       6) Return assigned dictionary, optionally log it in assigned_log[building_id].
     """
 
-    if random_seed is not None:
-        random.seed(random_seed)
+    rng = BuildingRandom(random_seed, building_id, "equip")
 
     # 1) Grab the stage dictionary or fallback
     if calibration_stage not in equip_lookup:
@@ -71,18 +70,18 @@ def assign_equipment_parameters(
         # else ignore
 
     # 5) Strategy to pick final values
-    def pick_val(r):
+    def pick_val(r, param_name):
         if strategy == "A":  # midpoint
             return (r[0] + r[1]) / 2.0
         elif strategy == "B":  # random
-            return random.uniform(r[0], r[1])
+            return rng.uniform(r[0], r[1], param_name)
         else:
             return r[0]
 
     assigned = {
-        "equip_wm2": pick_val(equip_rng),
-        "tD": pick_val(tD_rng),
-        "tN": pick_val(tN_rng)
+        "equip_wm2": pick_val(equip_rng, "equip_wm2"),
+        "tD": pick_val(tD_rng, "tD"),
+        "tN": pick_val(tN_rng, "tN")
     }
 
     # 6) Optional logging
@@ -19,7 +19,7 @@ Usage:
   )
 """
 
-import random
+from rng_streams import BuildingRandom
 from .materials_config import compute_wwr
 
 def assign_fenestration_parameters(
@@ -66,8 +66,8 @@ def assign_fenestration_parameters(
     (final_wwr, wwr_range_used) : (float, tuple or None)
         The numeric WWR (0.0–1.0) and the range that was used (or None if computed).
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Same stream / parameter as the wwr pick in materials_config, so both agree
+    stream = BuildingRandom(random_seed, building_row.get("ogc_fid"), "fenez")
 
     # A) Determine if building is residential or non_residential
     bldg_func = str(building_row.get("building_function", "residential")).lower()
@@ -109,7 +109,7 @@ def assign_fenestration_parameters(
             final_wwr = min_v
         else:
             if strategy == "B":
-                final_wwr = random.uniform(min_v, max_v)
+                final_wwr = stream.uniform(min_v, max_v, "wwr")
             else:
                 # strategy="A" => midpoint by default
                 final_wwr = (min_v + max_v) / 2.0
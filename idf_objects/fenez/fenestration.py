@@ -6,10 +6,133 @@ It references final fenestration dictionaries (res_data, nonres_data) that
 already incorporate Excel + user JSON overrides. 
 """
 
+import math
+
 import pandas as pd
 from geomeppy import IDF as GeppyIDF
 from .assign_fenestration_values import assign_fenestration_parameters
 
+# Facade orientation => outward azimuth (degrees clockwise from the model's +Y)
+ORIENTATION_AZIMUTHS = {"north": 0.0, "east": 90.0, "south": 180.0, "west": 270.0}
+
+# Relative tolerance of the rectangle check (vs the wall's longest side)
+RECTANGLE_TOL = 1e-6
+
+
+def rectangular_wall_corners(wall):
+    """
+    (p1, p2, p3, p4) of a wall whose 4 vertices form a rectangle
+    (p1 -> p2 along the bottom, p3 / p4 above p2 / p1 as create_zone_surfaces
+    writes them), or None for any other shape.
+    """
+    try:
+        pts = [tuple(float(c) for c in p) for p in wall.coords]
+    except (TypeError, ValueError):
+        return None
+    if len(pts) != 4:
+        return None
+    p1, p2, p3, p4 = pts
+    u = [b - a for a, b in zip(p1, p2)]
+    v = [b - a for a, b in zip(p1, p4)]
+    scale = max(math.sqrt(sum(c * c for c in u)), math.sqrt(sum(c * c for c in v)))
+    if scale <= 0:
+        return None
+    tol = RECTANGLE_TOL * scale
+    # parallelogram (p3 = p2 + v) with a right angle at p1
+    if any(abs(p3[i] - (p2[i] + v[i])) > tol for i in range(3)):
+        return None
+    if abs(sum(a * b for a, b in zip(u, v))) > tol * scale:
+        return None
+    return p1, p2, p3, p4
+
+
+def wall_azimuth(corners):
+    """Azimuth of the wall's outward normal (u x v), degrees clockwise from +Y."""
+    p1, p2, _, p4 = corners
+    u = [b - a for a, b in zip(p1, p2)]
+    v = [b - a for a, b in zip(p1, p4)]
+    nx = u[1] * v[2] - u[2] * v[1]
+    ny = u[2] * v[0] - u[0] * v[2]
+    return math.degrees(math.atan2(nx, ny)) % 360.0
+
+
+def facade_orientation(azimuth):
+    """The nearest cardinal direction of an azimuth ("north", "east", "south", "west")."""
+    return min(
+        ORIENTATION_AZIMUTHS,
+        key=lambda o: abs((azimuth - ORIENTATION_AZIMUTHS[o] + 180.0) % 360.0 - 180.0)
+    )
+
+
+def centred_window_vertices(corners, wwr):
+    """
+    The wall rectangle scaled by sqrt(wwr) about its centre (the window
+    set_wwr would create), vertices in the wall's order.
+    """
+    scale = math.sqrt(wwr)
+    centre = [sum(p[i] for p in corners) / 4.0 for i in range(3)]
+    return [tuple(c + scale * (p[i] - c) for i, c in enumerate(centre)) for p in corners]
+
+
+def exterior_walls(idf):
+    """Walls with an Outdoors boundary condition (the ones set_wwr glazes)."""
+    return [
+        srf for srf in idf.idfobjects["BUILDINGSURFACE:DETAILED"]
+        if str(srf.Surface_Type).lower() == "wall"
+        and str(srf.Outside_Boundary_Condition).lower() == "outdoors"
+    ]
+
+
+def geomeppy_wwr_map(idf, wwr_by_orientation):
+    """
+    set_wwr's wwr_map ({wall azimuth: wwr}, matched exactly) for
+    wwr_by_orientation: every exterior wall's own azimuth is mapped to the
+    WWR of its nearest cardinal direction, as in add_windows_analytic.
+    """
+    by_orientation = {str(k).lower(): v for k, v in wwr_by_orientation.items()}
+    wwr_map = {}
+    for wall in exterior_walls(idf):
+        orientation = facade_orientation(float(wall.azimuth))
+        if orientation in by_orientation:
+            wwr_map[wall.azimuth] = by_orientation[orientation]
+    return wwr_map
+
+
+def add_windows_analytic(idf, wwr, wwr_by_orientation=None, construction="Window1C"):
+    """
+    One centred window per exterior (Outdoors) wall, vertices computed from
+    the wall's corners. Returns the per-orientation WWRs used, or None
+    (nothing added) if some exterior wall is not a rectangle.
+    """
+    placed = []
+    for wall in exterior_walls(idf):
+        corners = rectangular_wall_corners(wall)
+        if corners is None:
+            return None
+        placed.append((wall, corners, facade_orientation(wall_azimuth(corners))))
+
+    wwr_by_orientation = {str(k).lower(): v for k, v in (wwr_by_orientation or {}).items()}
+    used = {}
+    for wall, corners, orientation in placed:
+        wall_wwr = wwr_by_orientation.get(orientation, wwr)
+        used[orientation] = wall_wwr
+        if not wall_wwr or wall_wwr <= 0:
+            continue
+        fields = {
+            "Name": f"{wall.Name} window",
+            "Surface_Type": "Window",
+            "Construction_Name": construction,
+            "Building_Surface_Name": wall.Name,
+            "View_Factor_to_Ground": "autocalculate",
+            "Number_of_Vertices": 4
+        }
+        for n, point in enumerate(centred_window_vertices(corners, wall_wwr), start=1):
+            fields[f"Vertex_{n}_Xcoordinate"] = point[0]
+            fields[f"Vertex_{n}_Ycoordinate"] = point[1]
+            fields[f"Vertex_{n}_Zcoordinate"] = point[2]
+        idf.newidfobject("FENESTRATIONSURFACE:DETAILED", **fields)
+    return used
+
 
 def add_fenestration(
     idf,
@@ -22,7 +145,9 @@ def add_fenestration(
     nonres_data=None,
     assigned_fenez_log=None,
     use_computed_wwr=False,
-    include_doors_in_wwr=False
+    include_doors_in_wwr=False,
+    wwr_by_orientation=None,
+    window_generator="analytic"
 ):
     """
     Adds fenestration to the given IDF for the specified building_row.
@@ -31,7 +156,10 @@ def add_fenestration(
       1) Determine building function => use 'res_data' or 'nonres_data'.
       2) Call 'assign_fenestration_parameters(...)' to get final WWR or computed WWR.
       3) Remove existing fenestration surfaces.
-      4) Use geomeppy 'idf.set_wwr(...)' to add windows with the final WWR.
+      4) Add one centred window per exterior wall with the final WWR:
+         computed from the wall corners ("analytic"), or with geomeppy's
+         'set_wwr(...)' if some exterior wall is not a rectangle (or
+         window_generator="geomeppy").
       5) Log picks & new fenestration object names in 'assigned_fenez_log'.
 
     Parameters
@@ -55,6 +183,12 @@ def add_fenestration(
         rather than from the dictionary's wwr_range.
     include_doors_in_wwr : bool
         If True, door area is counted as fenestration in the WWR ratio.
+    wwr_by_orientation : dict or None
+        {"north" | "east" | "south" | "west": wwr} overriding the final WWR
+        on the facades facing that way (nearest cardinal direction of the
+        wall's outward normal). Other facades keep the final WWR.
+    window_generator : str
+        "analytic" (default) or "geomeppy".
     """
 
     # 1) Determine final WWR (and WWR range used)
@@ -83,9 +217,22 @@ def add_fenestration(
     fen_objects = idf.idfobjects["FENESTRATIONSURFACE:DETAILED"]
     del fen_objects[:]  # clear them
 
-    # 4) Use geomeppy to create new window surfaces
+    # 4) Create new window surfaces
     #    We assume the construction "Window1C" already exists or will be created in materials step
-    GeppyIDF.set_wwr(idf, wwr=wwr, construction="Window1C")
+    used = None
+    if window_generator == "analytic":
+        used = add_windows_analytic(idf, wwr, wwr_by_orientation, construction="Window1C")
+    if used is None:
+        # generic (any wall shape); per-orientation WWRs by nearest cardinal
+        if wwr_by_orientation:
+            wwr_map = geomeppy_wwr_map(idf, wwr_by_orientation)
+            GeppyIDF.set_wwr(idf, wwr=wwr, construction="Window1C", wwr_map=wwr_map)
+        else:
+            GeppyIDF.set_wwr(idf, wwr=wwr, construction="Window1C")
+    if assigned_fenez_log and bldg_id is not None:
+        assigned_fenez_log[bldg_id]["fenez_window_generator"] = "analytic" if used is not None else "geomeppy"
+        if wwr_by_orientation and used:
+            assigned_fenez_log[bldg_id]["fenez_wwr_by_orientation"] = used
 
     # 5) Optional: Log fenestration object names
     new_fens = idf.idfobjects["FENESTRATIONSURFACE:DETAILED"]
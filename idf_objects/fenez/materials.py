@@ -74,7 +74,8 @@ def update_construction_materials(
         calibration_stage=calibration_stage,
         strategy=strategy,
         random_seed=random_seed,
-        user_config_fenez=user_config_fenez
+        user_config_fenez=user_config_fenez,
+        building_id=building_id
     )
 
     mat_opq = data.get("material_opaque", None)
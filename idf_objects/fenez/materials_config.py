@@ -1,6 +1,6 @@
 # fenez/materials_config.py
 
-import random
+from rng_streams import BuildingRandom, draw_uniform
 from Lookups.data_materials_residential import residential_materials_data
 from Lookups.data_materials_non_residential import non_residential_materials_data
 from .materials_lookup import material_lookup
@@ -9,11 +9,12 @@ from .materials_lookup import material_lookup
 #   pick_val(...) & assign_material_from_lookup(...) helper functions
 ###############################################################################
 
-def pick_val(rng, strategy="A"):
+def pick_val(rng, strategy="A", stream=None, param_name=""):
     """
     Helper to pick a single float from (min_val, max_val).
     If rng=(x,x), return x.
-    If strategy="A", pick the midpoint. If "B", pick random uniform in the range.
+    If strategy="A", pick the midpoint. If "B", pick random uniform in the range
+    (from the building's random stream if given).
     Otherwise, fallback to rng[0].
     """
     if not rng or len(rng) < 2:
@@ -27,7 +28,7 @@ def pick_val(rng, strategy="A"):
         if strategy == "A":
             return (min_val + max_val) / 2.0
         elif strategy == "B":
-            return random.uniform(min_val, max_val)
+            return draw_uniform(stream, min_val, max_val, param_name)
         else:
             # fallback => pick min
             return min_val
@@ -35,7 +36,7 @@ def pick_val(rng, strategy="A"):
     return min_val if min_val is not None else max_val
 
 
-def assign_material_from_lookup(mat_def: dict, strategy="A"):
+def assign_material_from_lookup(mat_def: dict, strategy="A", stream=None, label=""):
     """
     Takes a dict from material_lookup, which has fields like "Thickness_range",
     "Conductivity_range", etc. Returns a *copy* with final numeric picks assigned.
@@ -43,6 +44,9 @@ def assign_material_from_lookup(mat_def: dict, strategy="A"):
     # NEW OR CHANGED:
     # This function remains mostly the same, but you can store the picked range
     # in the returned dict if you want. For instance, final_mat["Thickness_range_used"] = ...
+
+    stream / label: the building's random stream and the material's role
+    (e.g. "top_opq"), so each field draws from its own stream "label.field".
     """
     final_mat = dict(mat_def)  # shallow copy to preserve original
     obj_type = final_mat["obj_type"].upper()
@@ -53,35 +57,35 @@ def assign_material_from_lookup(mat_def: dict, strategy="A"):
 
     if obj_type == "MATERIAL":
         # mass-based
-        final_mat["Thickness"] = pick_val(thick_rng, strategy)
-        final_mat["Conductivity"] = pick_val(cond_rng, strategy)
-        final_mat["Density"] = pick_val(final_mat.get("Density_range", (2300, 2300)), strategy)
-        final_mat["Specific_Heat"] = pick_val(final_mat.get("Specific_Heat_range", (900, 900)), strategy)
-        final_mat["Thermal_Absorptance"] = pick_val(final_mat.get("Thermal_Absorptance_range", (0.9, 0.9)), strategy)
-        final_mat["Solar_Absorptance"]   = pick_val(final_mat.get("Solar_Absorptance_range", (0.7, 0.7)), strategy)
-        final_mat["Visible_Absorptance"] = pick_val(final_mat.get("Visible_Absorptance_range", (0.7, 0.7)), strategy)
+        final_mat["Thickness"] = pick_val(thick_rng, strategy, stream, f"{label}.Thickness")
+        final_mat["Conductivity"] = pick_val(cond_rng, strategy, stream, f"{label}.Conductivity")
+        final_mat["Density"] = pick_val(final_mat.get("Density_range", (2300, 2300)), strategy, stream, f"{label}.Density")
+        final_mat["Specific_Heat"] = pick_val(final_mat.get("Specific_Heat_range", (900, 900)), strategy, stream, f"{label}.Specific_Heat")
+        final_mat["Thermal_Absorptance"] = pick_val(final_mat.get("Thermal_Absorptance_range", (0.9, 0.9)), strategy, stream, f"{label}.Thermal_Absorptance")
+        final_mat["Solar_Absorptance"]   = pick_val(final_mat.get("Solar_Absorptance_range", (0.7, 0.7)), strategy, stream, f"{label}.Solar_Absorptance")
+        final_mat["Visible_Absorptance"] = pick_val(final_mat.get("Visible_Absorptance_range", (0.7, 0.7)), strategy, stream, f"{label}.Visible_Absorptance")
 
     elif obj_type == "MATERIAL:NOMASS":
         # no-mass => thermal_resistance
         r_rng = final_mat.get("Thermal_Resistance_range", None)
-        final_mat["Thermal_Resistance"] = pick_val(r_rng, strategy)
-        final_mat["Thermal_Absorptance"] = pick_val(final_mat.get("Thermal_Absorptance_range", (0.9, 0.9)), strategy)
-        final_mat["Solar_Absorptance"]   = pick_val(final_mat.get("Solar_Absorptance_range", (0.7, 0.7)), strategy)
-        final_mat["Visible_Absorptance"] = pick_val(final_mat.get("Visible_Absorptance_range", (0.7, 0.7)), strategy)
+        final_mat["Thermal_Resistance"] = pick_val(r_rng, strategy, stream, f"{label}.Thermal_Resistance")
+        final_mat["Thermal_Absorptance"] = pick_val(final_mat.get("Thermal_Absorptance_range", (0.9, 0.9)), strategy, stream, f"{label}.Thermal_Absorptance")
+        final_mat["Solar_Absorptance"]   = pick_val(final_mat.get("Solar_Absorptance_range", (0.7, 0.7)), strategy, stream, f"{label}.Solar_Absorptance")
+        final_mat["Visible_Absorptance"] = pick_val(final_mat.get("Visible_Absorptance_range", (0.7, 0.7)), strategy, stream, f"{label}.Visible_Absorptance")
 
     elif obj_type == "WINDOWMATERIAL:GLAZING":
         # single-pane or multi-pane glass
-        final_mat["Thickness"] = pick_val(thick_rng, strategy)
-        final_mat["Solar_Transmittance"] = pick_val(final_mat.get("Solar_Transmittance_range", (0.76, 0.76)), strategy)
-        final_mat["Front_Solar_Reflectance"] = pick_val(final_mat.get("Front_Solar_Reflectance_range", (0.07, 0.07)), strategy)
-        final_mat["Back_Solar_Reflectance"]  = pick_val(final_mat.get("Back_Solar_Reflectance_range", (0.07, 0.07)), strategy)
-        final_mat["Visible_Transmittance"]   = pick_val(final_mat.get("Visible_Transmittance_range", (0.86, 0.86)), strategy)
-        final_mat["Front_Visible_Reflectance"] = pick_val(final_mat.get("Front_Visible_Reflectance_range", (0.06, 0.06)), strategy)
-        final_mat["Back_Visible_Reflectance"]  = pick_val(final_mat.get("Back_Visible_Reflectance_range", (0.06, 0.06)), strategy)
-        final_mat["Front_IR_Emissivity"]       = pick_val(final_mat.get("Front_IR_Emissivity_range", (0.84, 0.84)), strategy)
-        final_mat["Back_IR_Emissivity"]        = pick_val(final_mat.get("Back_IR_Emissivity_range", (0.84, 0.84)), strategy)
-        final_mat["Conductivity"]              = pick_val(cond_rng, strategy)
-        final_mat["Dirt_Correction_Factor"]    = pick_val(final_mat.get("Dirt_Correction_Factor_range", (1.0, 1.0)), strategy)
+        final_mat["Thickness"] = pick_val(thick_rng, strategy, stream, f"{label}.Thickness")
+        final_mat["Solar_Transmittance"] = pick_val(final_mat.get("Solar_Transmittance_range", (0.76, 0.76)), strategy, stream, f"{label}.Solar_Transmittance")
+        final_mat["Front_Solar_Reflectance"] = pick_val(final_mat.get("Front_Solar_Reflectance_range", (0.07, 0.07)), strategy, stream, f"{label}.Front_Solar_Reflectance")
+        final_mat["Back_Solar_Reflectance"]  = pick_val(final_mat.get("Back_Solar_Reflectance_range", (0.07, 0.07)), strategy, stream, f"{label}.Back_Solar_Reflectance")
+        final_mat["Visible_Transmittance"]   = pick_val(final_mat.get("Visible_Transmittance_range", (0.86, 0.86)), strategy, stream, f"{label}.Visible_Transmittance")
+        final_mat["Front_Visible_Reflectance"] = pick_val(final_mat.get("Front_Visible_Reflectance_range", (0.06, 0.06)), strategy, stream, f"{label}.Front_Visible_Reflectance")
+        final_mat["Back_Visible_Reflectance"]  = pick_val(final_mat.get("Back_Visible_Reflectance_range", (0.06, 0.06)), strategy, stream, f"{label}.Back_Visible_Reflectance")
+        final_mat["Front_IR_Emissivity"]       = pick_val(final_mat.get("Front_IR_Emissivity_range", (0.84, 0.84)), strategy, stream, f"{label}.Front_IR_Emissivity")
+        final_mat["Back_IR_Emissivity"]        = pick_val(final_mat.get("Back_IR_Emissivity_range", (0.84, 0.84)), strategy, stream, f"{label}.Back_IR_Emissivity")
+        final_mat["Conductivity"]              = pick_val(cond_rng, strategy, stream, f"{label}.Conductivity")
+        final_mat["Dirt_Correction_Factor"]    = pick_val(final_mat.get("Dirt_Correction_Factor_range", (1.0, 1.0)), strategy, stream, f"{label}.Dirt_Correction_Factor")
         # IR_Transmittance is usually zero, so we keep as is
 
     else:
@@ -123,7 +127,8 @@ def get_extended_materials_data(
     calibration_stage: str,
     strategy: str = "A",
     random_seed=None,
-    user_config_fenez=None
+    user_config_fenez=None,
+    building_id=None
 ):
     """
     1) Looks up either residential_materials_data or non_residential_materials_data
@@ -142,8 +147,7 @@ def get_extended_materials_data(
     # - We handle user_config_fenez that might override "R_value_range", "U_value_range", etc.
     """
 
-    if random_seed is not None:
-        random.seed(random_seed)
+    stream = BuildingRandom(random_seed, building_id, "fenez")
 
     # decide data source
     if building_function.lower() == "residential":
@@ -182,7 +186,7 @@ def get_extended_materials_data(
         default_wwr_range = user_config_fenez["wwr_range"]  # override the range
 
     # Now pick final wwr from that range
-    wwr_val = pick_val(default_wwr_range, strategy)
+    wwr_val = pick_val(default_wwr_range, strategy, stream, "wwr")
 
     # Possibly override the final wwr if user_config_fenez["wwr"] is present
     if user_config_fenez and "wwr" in user_config_fenez:
@@ -205,10 +209,10 @@ def get_extended_materials_data(
     # create final picks for top-level materials
     final_opq = None
     if mat_opq_key and mat_opq_key in material_lookup:
-        final_opq = assign_material_from_lookup(material_lookup[mat_opq_key], strategy)
+        final_opq = assign_material_from_lookup(material_lookup[mat_opq_key], strategy, stream, "top_opq")
     final_win = None
     if mat_win_key and mat_win_key in material_lookup:
-        final_win = assign_material_from_lookup(material_lookup[mat_win_key], strategy)
+        final_win = assign_material_from_lookup(material_lookup[mat_win_key], strategy, stream, "top_win")
 
     # sub-elements
     possible_elems = [
@@ -238,10 +242,10 @@ def get_extended_materials_data(
 
             # (B) pick R_value from its range
             r_val_rng = subd.get("R_value_range", None)
-            r_val = pick_val(r_val_rng, strategy) if r_val_rng else None
+            r_val = pick_val(r_val_rng, strategy, stream, f"{elem_name}.R_value") if r_val_rng else None
             # (C) pick U_value from its range
             u_val_rng = subd.get("U_value_range", None)
-            u_val = pick_val(u_val_rng, strategy) if u_val_rng else None
+            u_val = pick_val(u_val_rng, strategy, stream, f"{elem_name}.U_value") if u_val_rng else None
 
             # If user_config_fenez sets a fixed R_value or U_value, override
             if user_config_fenez and "elements" in user_config_fenez:
@@ -263,7 +267,7 @@ def get_extended_materials_data(
             mat_opq_sub_key = subd.get("material_opaque_lookup", None)
             if mat_opq_sub_key and mat_opq_sub_key in material_lookup:
                 out_sub["material_opaque"] = assign_material_from_lookup(
-                    material_lookup[mat_opq_sub_key], strategy
+                    material_lookup[mat_opq_sub_key], strategy, stream, f"{elem_name}_opq"
                 )
             else:
                 out_sub["material_opaque"] = None
@@ -272,7 +276,7 @@ def get_extended_materials_data(
             mat_win_sub_key = subd.get("material_window_lookup", None)
             if mat_win_sub_key and mat_win_sub_key in material_lookup:
                 out_sub["material_window"] = assign_material_from_lookup(
-                    material_lookup[mat_win_sub_key], strategy
+                    material_lookup[mat_win_sub_key], strategy, stream, f"{elem_name}_win"
                 )
             else:
                 out_sub["material_window"] = None
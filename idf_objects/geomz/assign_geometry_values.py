@@ -1,6 +1,7 @@
 # geomz/assign_geometry_values.py
 
-import random
+from rng_streams import BuildingRandom, draw_uniform
+from override_resolver import find_overrides
 from .geometry_lookup import geometry_lookup
 from .geometry_overrides_from_excel import pick_geom_params_from_rules
 
@@ -15,25 +16,16 @@ def find_geom_overrides(building_id, building_type, user_config):
       - min_val, max_val (for numeric overrides)
       - fixed_value (for boolean or "lock" numeric)
     """
-    matches = []
-    for row in (user_config or []):
-        # Match building_id if specified
-        if "building_id" in row:
-            if row["building_id"] != building_id:
-                continue
-        # Match building_type if specified
-        if "building_type" in row:
-            if row["building_type"] != building_type:
-                continue
-        matches.append(row)
-    return matches
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides("geometry", user_config, building_id=building_id, building_type=building_type)
 
 
 def pick_val_with_range(
     rng_tuple,
     strategy="A",
     log_dict=None,      # e.g. assigned_geom_log[bldg_id]
-    param_name=None
+    param_name=None,
+    rng=None            # BuildingRandom of this building (rng_streams.py)
 ):
     """
     rng_tuple = (min_val, max_val)
@@ -52,7 +44,7 @@ def pick_val_with_range(
     if strategy == "A":         # midpoint
         chosen = (min_v + max_v) / 2.0
     elif strategy == "B":       # random uniform
-        chosen = random.uniform(min_v, max_v)
+        chosen = draw_uniform(rng, min_v, max_v, param_name)
     else:
         chosen = min_v          # fallback => min
 
@@ -87,15 +79,14 @@ def assign_geometry_values(
     8) Log final picks (and numeric range) in assigned_geom_log if provided.
     """
 
-    # optional reproducibility
-    if random_seed is not None:
-        random.seed(random_seed)
-
     bldg_id        = building_row.get("ogc_fid", 0)
     bldg_function  = building_row.get("building_function", "residential").lower()
     area           = building_row.get("area", 100.0)
     perimeter      = building_row.get("perimeter", 40.0)
 
+    # per-building random stream => reproducible regardless of order / process
+    rng = BuildingRandom(random_seed, bldg_id, "geometry")
+
     # 1) get sub-type
     if bldg_function == "residential":
         sub_type = building_row.get("residential_type", "Two-and-a-half-story House")
@@ -165,7 +156,8 @@ def assign_geometry_values(
         rng_tuple=perimeter_depth_range,
         strategy=strategy,
         log_dict=log_dict,
-        param_name="perimeter_depth"
+        param_name="perimeter_depth",
+        rng=rng
     )
 
     # 7) has_core => store directly
@@ -1,68 +1,85 @@
 # geomz/building.py
 
 from .assign_geometry_values import assign_geometry_values
-from .geometry import compute_dimensions_from_area_perimeter, create_building_base_polygon
+from .geometry import compute_dimensions_from_area_perimeter, create_building_base_polygon, polygon_area
 from .zoning import create_zones_with_perimeter_depth, link_surfaces
+from idf_objects.other.idf_index import get_idf_index
 
-def create_building_with_roof_type(
+
+def _zone_areas(zone_data, wall_height):
+    """(floor area, exterior wall area) of one zone (zname, bpoly, tpoly, surfs)."""
+    _, bpoly, _, surfs = zone_data
+    ext_wall = 0.0
+    for i in range(4):
+        if str(surfs[1 + i].Outside_Boundary_Condition).lower() == "outdoors":
+            p1, p2 = bpoly[i], bpoly[(i + 1) % 4]
+            ext_wall += ((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2) ** 0.5 * wall_height
+    return polygon_area(bpoly), ext_wall
+
+
+def reduced_geometry_check(floors_zones, modeled_floors, num_floors, wall_height, base_poly, edge_types):
+    """
+    Checks the floor-multiplier model against the full building it stands for:
+    floor area and exterior wall area of the modeled zones (weighted by their
+    multipliers) divided by
+      - footprint area (base_poly) x num_floors, and
+      - length of the non-"shared" footprint edges x wall_height x num_floors.
+    Both ratios are 1.0 when every floor of the building is represented
+    exactly once with the footprint's layout; a missing / doubled floor, a
+    wrong multiplier or lost zones show up as a ratio != 1.0.
+    This is a consistency check of the model, not of its accuracy: the
+    energy error of the reduction has not been verified; measure it with
+    compare_floor_multiplier.py (full vs reduced simulations).
+    """
+    modeled_floor = modeled_wall = 0.0
+    for floor_i, multiplier in modeled_floors:
+        for zone_data in floors_zones[floor_i].values():
+            floor_area, wall_area = _zone_areas(zone_data, wall_height)
+            modeled_floor += multiplier * floor_area
+            modeled_wall += multiplier * wall_area
+    full_floor = polygon_area(base_poly) * num_floors
+    full_wall = 0.0
+    for i, edge in enumerate(edge_types):
+        if str(edge).lower().strip() != "shared":
+            p1, p2 = base_poly[i], base_poly[(i + 1) % 4]
+            full_wall += ((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2) ** 0.5 * wall_height * num_floors
+    return {
+        "floor_area_ratio": round(modeled_floor / full_floor, 6) if full_floor else 1.0,
+        "exterior_wall_area_ratio": round(modeled_wall / full_wall, 6) if full_wall else 1.0
+    }
+
+
+def _build_floors(
     idf,
-    area,
-    perimeter,
-    orientation,
-    building_row,
+    base_poly_0,
+    core_poly_0,
+    num_floors,
+    wall_height,
     edge_types,
-    wall_height=None,
-    roof_slope_axis='length',
-    ridge_position=0.5,
-    calibration_stage="pre_calibration",
-    strategy="A",
-    random_seed=None,
-    user_config=None,
-    assigned_geom_log=None,
-    excel_rules=None
+    perimeter_depth,
+    has_core,
+    floor_multiplier_min_floors=None
 ):
     """
-    Create building geometry in the IDF, multi-floor, optionally perimeter+core.
-    Now includes logic to link each new floor's Floor to the old floor's Ceiling.
+    Steps 5-6 of create_building_with_roof_type: zones and surfaces of every
+    modeled floor, linked floor-to-ceiling. Returns (floors_zones, log entries
+    of the floor-multiplier reduction, or {}).
     """
+    # 5) Floors to model: all of them, or ground + one middle floor (zone
+    #    multiplier = number of middle floors) + top floor
+    modeled_floors = [(floor_i, 1) for floor_i in range(1, num_floors + 1)]
+    if floor_multiplier_min_floors and num_floors >= max(floor_multiplier_min_floors, 4):
+        modeled_floors = [(1, 1), ((num_floors + 1) // 2, num_floors - 2), (num_floors, 1)]
 
-    # 1) Figure out total building height & default per-floor height
-    gem_hoogte = building_row.get("gem_hoogte", None)
-    num_floors = building_row.get("gem_bouwlagen", 1)
-
-    if wall_height is None:
-        if gem_hoogte is not None:
-            total_height = gem_hoogte
-        else:
-            total_height = 3.0 * num_floors
-        wall_height = total_height / num_floors
-
-    # 2) Determine geometry parameters (perimeter_depth, has_core) from dictionary + overrides
-    geom_params = assign_geometry_values(
-        building_row=building_row,
-        calibration_stage=calibration_stage,
-        strategy=strategy,
-        random_seed=random_seed,
-        user_config=user_config,
-        assigned_geom_log=assigned_geom_log,
-        excel_rules=excel_rules
-    )
-    perimeter_depth = geom_params["perimeter_depth"]
-    has_core = geom_params["has_core"]
-
-    # 3) Rectangle dimensions from area & perimeter
-    width, length = compute_dimensions_from_area_perimeter(area, perimeter)
-
-    # 4) Create base polygon for ground floor
-    A0, B0, C0, D0 = create_building_base_polygon(width, length, orientation)
-    base_poly_0 = [A0, B0, C0, D0]
-
-    # 5) Create each floor in a loop
+    # 6) Create each floor in a loop
     floors_zones = {}
-    current_base_poly = base_poly_0
-
     prev_floor_zones = None  # Will store the zone surfaces from the previous floor
-    for floor_i in range(1, num_floors + 1):
+    for floor_i, multiplier in modeled_floors:
+        # floor polygons at this floor's elevation
+        dz = (floor_i - 1) * wall_height
+        current_base_poly = [(p[0], p[1], p[2] + dz) for p in base_poly_0]
+        current_core_poly = [(p[0], p[1], p[2] + dz) for p in core_poly_0] if core_poly_0 else core_poly_0
+
         # "Ground" for 1st floor, else "Internal"
         floor_type = "Ground" if floor_i == 1 else "Internal"
         is_top_floor = (floor_i == num_floors)
@@ -77,9 +94,14 @@ def create_building_with_roof_type(
             perimeter_depth=perimeter_depth,
             floor_type=floor_type,
             has_core=has_core,
-            is_top_floor=is_top_floor
+            is_top_floor=is_top_floor,
+            core_poly=current_core_poly
         )
         floors_zones[floor_i] = zones_data
+        if multiplier > 1:
+            index = get_idf_index(idf)
+            for zone_name in zones_data:
+                index.get("ZONE", zone_name).Multiplier = multiplier
 
         # -------------------------------------------------------
         #  LINK THIS FLOOR’S "FLOOR" SURFACES TO PREV FLOOR’S "CEILING" SURFACES
@@ -111,8 +133,143 @@ def create_building_with_roof_type(
 
         prev_floor_zones = zones_data
 
-        # shift the base polygon upward by wall_height for the next floor
-        current_base_poly = [(p[0], p[1], p[2] + wall_height) for p in current_base_poly]
+    # 7) Log the reduction (floor area incl. multipliers == full building)
+    reduction_log = {}
+    if len(modeled_floors) < num_floors:
+        reduction_log = {
+            "floor_multiplier": modeled_floors[1][1],
+            "modeled_floors": [floor_i for floor_i, _ in modeled_floors],
+            "geometry_check": reduced_geometry_check(
+                floors_zones, modeled_floors, num_floors, wall_height, base_poly_0, edge_types
+            )
+        }
+    return floors_zones, reduction_log
+
+
+def create_building_with_roof_type(
+    idf,
+    area,
+    perimeter,
+    orientation,
+    building_row,
+    edge_types,
+    wall_height=None,
+    roof_slope_axis='length',
+    ridge_position=0.5,
+    calibration_stage="pre_calibration",
+    strategy="A",
+    random_seed=None,
+    user_config=None,
+    assigned_geom_log=None,
+    excel_rules=None,
+    precomputed=None,
+    floor_multiplier_min_floors=None,
+    zoning_policy=None,
+    geometry_cache=None
+):
+    """
+    Create building geometry in the IDF, multi-floor, optionally perimeter+core.
+    Now includes logic to link each new floor's Floor to the old floor's Ceiling.
+
+    precomputed: this building's entry of a PortfolioGeometry
+    (geometry_batch.py). Its wall height, zoning picks, footprint and core
+    polygon are used instead of computing them here (the picks are logged
+    the same way).
+
+    floor_multiplier_min_floors: buildings with at least this many floors
+    (and at least 4) are modeled as ground floor + one representative
+    middle floor + top floor. The middle floor's zones get an EnergyPlus
+    zone Multiplier of (floors - 2) and it is linked floor-to-ceiling to the
+    ground and top floors. None => every floor is modeled.
+
+    zoning_policy: a ZoningPolicy (zoning_policy.py) that decides single zone
+    vs perimeter+core from the footprint and its accuracy budget. A
+    precomputed entry already carries the policy's decision.
+
+    geometry_cache: a GeometryCache (geometry_cache.py). Buildings with the
+    same rounded / quantized dimensions, zoning and edge types share one
+    template, built at orientation 0 and replayed rotated into each IDF.
+    """
+
+    if precomputed is not None:
+        # 1-4) From the portfolio pre-computation
+        num_floors = precomputed["num_floors"]
+        if wall_height is None:
+            wall_height = precomputed["wall_height"]
+        width, length = precomputed["width"], precomputed["length"]
+        perimeter_depth = precomputed["perimeter_depth"]
+        has_core = precomputed["has_core"]
+        if assigned_geom_log is not None and precomputed["geom_log"]:
+            assigned_geom_log.setdefault(building_row.get("ogc_fid", 0), {}).update(precomputed["geom_log"])
+        base_poly_0 = precomputed["base_poly"]
+        core_poly_0 = precomputed["core_poly"]
+    else:
+        # 1) Figure out total building height & default per-floor height
+        gem_hoogte = building_row.get("gem_hoogte", None)
+        num_floors = building_row.get("gem_bouwlagen", 1)
+
+        if wall_height is None:
+            if gem_hoogte is not None:
+                total_height = gem_hoogte
+            else:
+                total_height = 3.0 * num_floors
+            wall_height = total_height / num_floors
+
+        # 2) Determine geometry parameters (perimeter_depth, has_core) from dictionary + overrides
+        geom_params = assign_geometry_values(
+            building_row=building_row,
+            calibration_stage=calibration_stage,
+            strategy=strategy,
+            random_seed=random_seed,
+            user_config=user_config,
+            assigned_geom_log=assigned_geom_log,
+            excel_rules=excel_rules
+        )
+        perimeter_depth = geom_params["perimeter_depth"]
+        has_core = geom_params["has_core"]
+
+        # 3) Rectangle dimensions from area & perimeter
+        width, length = compute_dimensions_from_area_perimeter(area, perimeter)
+
+        # 3b) Adaptive zoning: drop (or add) the core per the accuracy budget
+        if zoning_policy is not None:
+            has_core, predicted_error = zoning_policy.decide(width, length, perimeter_depth, has_core)
+            if assigned_geom_log is not None:
+                log = assigned_geom_log.setdefault(building_row.get("ogc_fid", 0), {})
+                log["zoning_policy_has_core"] = has_core
+                log["zoning_policy_error"] = round(predicted_error, 6)
+
+        # 4) Create base polygon for ground floor
+        A0, B0, C0, D0 = create_building_base_polygon(width, length, orientation)
+        base_poly_0 = [A0, B0, C0, D0]
+        core_poly_0 = None
+
+    # 5-6) Zones and surfaces of every floor, or a replay of the cached
+    #      geometry of an identical (rounded) building
+    if geometry_cache is None:
+        floors_zones, reduction_log = _build_floors(
+            idf, base_poly_0, core_poly_0, num_floors, wall_height, edge_types,
+            perimeter_depth, has_core, floor_multiplier_min_floors
+        )
+    else:
+        key = geometry_cache.key(
+            width, length, wall_height, num_floors, perimeter_depth, has_core, edge_types,
+            floor_multiplier_min_floors
+        )
+        key_width, key_length, key_height, _, key_depth = key[:5]
+
+        def build_template(target_idf):
+            # at orientation 0, from the key's (rounded) values
+            return _build_floors(
+                target_idf, list(create_building_base_polygon(key_width, key_length, 0)), None,
+                num_floors, key_height, edge_types, key_depth, has_core, floor_multiplier_min_floors
+            )
+
+        floors_zones, reduction_log = geometry_cache.build(idf, key, orientation, build_template)
+
+    # 7) Log the reduction (floor area incl. multipliers == full building)
+    if assigned_geom_log is not None and reduction_log:
+        assigned_geom_log.setdefault(building_row.get("ogc_fid", 0), {}).update(reduction_log)
 
     # (Optional) if you want to add pitched roof logic, do it after the top floor is created
     return floors_zones
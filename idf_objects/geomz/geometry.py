@@ -38,8 +38,8 @@ def create_building_base_polygon(width, length, orientation):
 
     return A, B, C, D
 
-def polygon_area(poly):
-    """Compute area in XY plane via Shoelace formula."""
+def polygon_signed_area(poly):
+    """Signed area in XY plane via Shoelace formula (counter-clockwise > 0)."""
     x = [p[0] for p in poly]
     y = [p[1] for p in poly]
     n = len(poly)
@@ -47,7 +47,11 @@ def polygon_area(poly):
     for i in range(n):
         j = (i + 1) % n
         area += x[i] * y[j] - x[j] * y[i]
-    return abs(area) / 2.0
+    return area / 2.0
+
+def polygon_area(poly):
+    """Compute area in XY plane via Shoelace formula."""
+    return abs(polygon_signed_area(poly))
 
 def inward_offset_polygon(A, B, C, D, depth):
     """
@@ -0,0 +1,300 @@
+# geomz/geometry_batch.py
+"""
+Vectorized geometry pre-computation for a whole df_buildings.
+
+The per-building geometry helpers (geometry.py) run scalar Python math one
+building at a time, and a bad area / perimeter / floor count only shows up as
+an exception deep inside create_building_with_roof_type. Here the same
+quantities are computed for all buildings in a few NumPy passes:
+
+  - width / length        (compute_dimensions_from_area_perimeter)
+  - rotated footprint     (create_building_base_polygon, rotate_point)
+  - perimeter / core split (inward_offset_polygon, polygon_area)
+  - wall height, number of floors, per-floor polygons
+
+and every row is flagged before any IDF work starts. Rows that cannot be
+built (non-positive or missing area / perimeter, no valid floor count or
+wall height) are "infeasible"; rows that build, but not as configured
+(has_core without room for a core), get a warning.
+
+perimeter_depth / has_core come from assign_geometry_values (same streams,
+same overrides), whose log entries are kept so the builder can record them
+without picking again.
+
+Usage:
+    geom = precompute_geometry(df_buildings, strategy="B", random_seed=42, user_config=...)
+    geom.flags                      # DataFrame: infeasible, reason, warning
+    b = geom.for_building(idx)      # dict consumed by create_building_with_roof_type
+"""
+
+import numpy as np
+import pandas as pd
+
+from .assign_geometry_values import assign_geometry_values
+
+# Minimum core area (m2), as in create_zones_with_perimeter_depth
+MIN_CORE_AREA = 1e-3
+
+
+def dimensions_from_area_perimeter(area, perimeter):
+    """
+    Array version of compute_dimensions_from_area_perimeter:
+      width = A / (P/4), length = A / width.
+    Returns (width, length, valid); invalid rows are NaN.
+    """
+    area = np.asarray(area, dtype=float)
+    perimeter = np.asarray(perimeter, dtype=float)
+    valid = (area > 0) & (perimeter > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width = np.where(valid, area / (perimeter / 4.0), np.nan)
+        length = np.where(valid, area / width, np.nan)
+    return width, length, valid
+
+
+def rotate_points(points, orientation_deg):
+    """
+    Rotates (n, k, 3) points about the origin by orientation_deg (per row),
+    like rotate_point.
+    """
+    rad = np.radians(np.asarray(orientation_deg, dtype=float))[:, None]
+    c, s = np.cos(rad), np.sin(rad)
+    x, y = points[..., 0], points[..., 1]
+    out = points.copy()
+    out[..., 0] = c * x - s * y
+    out[..., 1] = s * x + c * y
+    return out
+
+
+def base_polygons(width, length, orientation):
+    """(n, 4, 3) footprints A, B, C, D as in create_building_base_polygon."""
+    n = len(width)
+    polys = np.zeros((n, 4, 3))
+    polys[:, 1, 0] = width
+    polys[:, 2, 0] = width
+    polys[:, 2, 1] = length
+    polys[:, 3, 1] = length
+    orientation = np.nan_to_num(np.asarray(orientation, dtype=float))
+    rotated = rotate_points(polys, orientation)
+    # (orientation 0 is left exactly as is, like the scalar helper)
+    return np.where((orientation != 0)[:, None, None], rotated, polys)
+
+
+def signed_areas(polys):
+    """Signed shoelace area of (n, k, 3) polygons in the XY plane (CCW > 0)."""
+    x, y = polys[..., 0], polys[..., 1]
+    return 0.5 * np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1)
+
+
+def inward_offsets(polys, depth):
+    """
+    Array version of inward_offset_polygon for (n, 4, 3) quads.
+    Returns (inner polygons, valid); a row is valid if the offset lines
+    intersect, the core keeps the footprint's orientation (depth smaller
+    than half the shorter side) and its area is at least MIN_CORE_AREA.
+    """
+    depth = np.asarray(depth, dtype=float)[:, None]
+    p1 = polys
+    p2 = np.roll(polys, -1, axis=1)  # edges AB, BC, CD, DA
+    v = p2[..., :2] - p1[..., :2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        length = np.sqrt(np.sum(v * v, axis=-1))
+        nx = -v[..., 1] / length
+        ny = v[..., 0] / length
+    o1 = p1[..., :2] + np.stack([nx * depth, ny * depth], axis=-1)
+    o2 = p2[..., :2] + np.stack([nx * depth, ny * depth], axis=-1)
+
+    # corner k = intersection of edge k with the previous edge (A2 = front x left, ...)
+    def intersect(a1, a2, b1, b2):
+        d1 = a2 - a1
+        d2 = b2 - b1
+        denom = d2[..., 1] * d1[..., 0] - d2[..., 0] * d1[..., 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ua = (d2[..., 0] * (a1[..., 1] - b1[..., 1]) - d2[..., 1] * (a1[..., 0] - b1[..., 0])) / denom
+        pts = a1 + ua[..., None] * d1
+        return pts, np.abs(denom) >= 1e-12
+
+    prev1 = np.roll(o1, 1, axis=1)
+    prev2 = np.roll(o2, 1, axis=1)
+    xy, ok = intersect(o1, o2, prev1, prev2)
+    inner = np.concatenate([xy, polys[..., 2:3]], axis=-1)
+
+    valid = np.all(ok, axis=1) & np.all(np.isfinite(inner), axis=(1, 2))
+    outer_area = signed_areas(polys)
+    inner_area = signed_areas(inner)
+    valid &= (np.sign(inner_area) == np.sign(outer_area)) & (np.abs(inner_area) >= MIN_CORE_AREA)
+    return inner, valid
+
+
+def floor_polygons(poly, wall_height, num_floors):
+    """(num_floors, k, 3): poly shifted up by wall_height for each floor."""
+    poly = np.asarray(poly, dtype=float)
+    shifts = np.zeros((num_floors, 1, 3))
+    shifts[:, 0, 2] = np.arange(num_floors) * wall_height
+    return poly[None, :, :] + shifts
+
+
+def _as_points(poly):
+    return [tuple(float(c) for c in p) for p in poly]
+
+
+class PortfolioGeometry:
+    """
+    Per-building arrays (aligned with index) plus the flags DataFrame.
+    """
+
+    def __init__(self, index, arrays, geom_params, logs, flags):
+        self.index = list(index)
+        self._pos = {idx: i for i, idx in enumerate(self.index)}
+        self.arrays = arrays
+        self.geom_params = geom_params
+        self.logs = logs
+        self.flags = flags
+
+    def __contains__(self, building_index):
+        return building_index in self._pos
+
+    def infeasible_index(self):
+        return list(self.flags.index[self.flags["infeasible"]])
+
+    def for_building(self, building_index):
+        """
+        {"width", "length", "wall_height", "num_floors", "perimeter_depth",
+         "has_core", "base_poly", "core_poly" ([] => no valid core),
+         "geom_log"} of one building, or None if it is infeasible / unknown.
+        """
+        i = self._pos.get(building_index)
+        if i is None or bool(self.flags["infeasible"].iloc[i]):
+            return None
+        a = self.arrays
+        return {
+            "width": float(a["width"][i]),
+            "length": float(a["length"][i]),
+            "wall_height": float(a["wall_height"][i]),
+            "num_floors": int(a["num_floors"][i]),
+            "perimeter_depth": self.geom_params[i]["perimeter_depth"],
+            "has_core": self.geom_params[i]["has_core"],
+            "base_poly": _as_points(a["base_poly"][i]),
+            "core_poly": _as_points(a["core_poly"][i]) if a["core_valid"][i] else [],
+            "geom_log": self.logs[i]
+        }
+
+    def floor_polygons(self, building_index, core=False):
+        """(num_floors, 4, 3) base (or core) polygons of every floor."""
+        i = self._pos[building_index]
+        key = "core_poly" if core else "base_poly"
+        return floor_polygons(self.arrays[key][i], self.arrays["wall_height"][i], int(self.arrays["num_floors"][i]))
+
+
+def precompute_geometry(
+    df_buildings,
+    calibration_stage="pre_calibration",
+    strategy="A",
+    random_seed=None,
+    user_config=None,
+    excel_rules=None,
+    zoning_policy=None
+):
+    """
+    Geometry of every row of df_buildings (see module docstring), with the
+    same defaults as create_idf_for_building / create_building_with_roof_type.
+
+    zoning_policy: a ZoningPolicy (zoning_policy.py); its decisions replace
+    the picked has_core and are logged like in the scalar builder.
+    """
+    n = len(df_buildings)
+    area = pd.to_numeric(df_buildings.get("area", pd.Series(100.0, index=df_buildings.index)), errors="coerce")
+    perimeter = pd.to_numeric(df_buildings.get("perimeter", pd.Series(40.0, index=df_buildings.index)), errors="coerce")
+    orientation = pd.to_numeric(
+        df_buildings.get("building_orientation", pd.Series(0.0, index=df_buildings.index)), errors="coerce"
+    ).fillna(0.0)
+    floors = pd.to_numeric(df_buildings.get("gem_bouwlagen", pd.Series(1, index=df_buildings.index)), errors="coerce")
+    height = pd.to_numeric(df_buildings.get("gem_hoogte", pd.Series(np.nan, index=df_buildings.index)), errors="coerce")
+
+    # 1) Dimensions & footprints
+    width, length, dims_ok = dimensions_from_area_perimeter(area.to_numpy(), perimeter.to_numpy())
+    base = base_polygons(np.nan_to_num(width), np.nan_to_num(length), orientation.to_numpy())
+
+    # 2) Floors & wall height (total height / floors, default 3 m per floor)
+    floors_arr = floors.to_numpy(dtype=float)
+    floors_ok = np.isfinite(floors_arr) & (floors_arr >= 1) & (floors_arr == np.floor(floors_arr))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_height = np.where(np.isfinite(height.to_numpy(dtype=float)), height.to_numpy(dtype=float), 3.0 * floors_arr)
+        wall_height = total_height / floors_arr
+    height_ok = np.isfinite(wall_height) & (wall_height > 0)
+
+    # 3) Zoning parameters (scalar pickers, same streams as the builder)
+    geom_params = []
+    logs = []
+    for _, row in df_buildings.iterrows():
+        bldg_id = row.get("ogc_fid", 0)
+        log = {bldg_id: {}}
+        geom_params.append(assign_geometry_values(
+            building_row=row,
+            calibration_stage=calibration_stage,
+            strategy=strategy,
+            random_seed=random_seed,
+            user_config=user_config,
+            assigned_geom_log=log,
+            excel_rules=excel_rules
+        ))
+        logs.append(log[bldg_id])
+    depth = np.array([p["perimeter_depth"] for p in geom_params], dtype=float)
+    has_core = np.array([bool(p["has_core"]) for p in geom_params])
+
+    # 3b) Adaptive zoning (all buildings in one call)
+    zoning_error = np.full(n, np.nan)
+    if zoning_policy is not None and n:
+        has_core, zoning_error = zoning_policy.decide(
+            np.nan_to_num(width), np.nan_to_num(length), depth, has_core
+        )
+        for i in range(n):
+            geom_params[i]["has_core"] = bool(has_core[i])
+            logs[i]["zoning_policy_has_core"] = bool(has_core[i])
+            logs[i]["zoning_policy_error"] = round(float(zoning_error[i]), 6)
+
+    # 4) Perimeter / core split
+    core, core_ok = inward_offsets(base, depth)
+    core_ok &= has_core & dims_ok
+
+    # 5) Flags
+    reasons = np.full(n, "", dtype=object)
+    for mask, reason in (
+        (~(area.to_numpy() > 0), "invalid_area"),
+        (~(perimeter.to_numpy() > 0), "invalid_perimeter"),
+        (~floors_ok, "invalid_floors"),
+        (floors_ok & ~height_ok, "invalid_wall_height"),
+    ):
+        reasons[mask & (reasons == "")] = reason
+    infeasible = reasons != ""
+
+    warnings = np.full(n, "", dtype=object)
+    warnings[has_core & ~core_ok & ~infeasible] = "no_room_for_core"
+    with np.errstate(invalid="ignore"):
+        not_rectangle = perimeter.to_numpy() < 4.0 * np.sqrt(np.abs(area.to_numpy()))
+    warnings[not_rectangle & (warnings == "") & ~infeasible] = "perimeter_below_square"
+
+    flags = pd.DataFrame({
+        "ogc_fid": df_buildings.get("ogc_fid", pd.Series(df_buildings.index, index=df_buildings.index)).to_numpy(),
+        "width": width,
+        "length": length,
+        "num_floors": floors_arr,
+        "wall_height": wall_height,
+        "perimeter_depth": depth,
+        "has_core": has_core,
+        "zoning_error": zoning_error,
+        "core": core_ok,
+        "infeasible": infeasible,
+        "reason": reasons,
+        "warning": warnings
+    }, index=df_buildings.index)
+
+    arrays = {
+        "width": width,
+        "length": length,
+        "wall_height": wall_height,
+        "num_floors": np.where(floors_ok, floors_arr, 0).astype(int),
+        "base_poly": base,
+        "core_poly": core,
+        "core_valid": core_ok
+    }
+    return PortfolioGeometry(df_buildings.index, arrays, geom_params, logs, flags)
@@ -0,0 +1,219 @@
+# geomz/geometry_cache.py
+"""
+Per-process cache of generated building geometry (zones + surfaces).
+
+Most buildings of a residential portfolio share their rounded (width, length,
+wall_height, floors, perimeter_depth, has_core, edge_types) tuple, yet
+create_zones_with_perimeter_depth / create_zone_surfaces rebuild every zone,
+surface and setcoords call for each of them. Here the geometry of a key is
+built once, at orientation 0, and stored as plain field values:
+
+    (object type, {field: value}) for every ZONE and BUILDINGSURFACE:DETAILED
+
+plus the per-floor zone polygons. Later buildings with the same key get those
+objects replayed into their IDF with only the orientation (a rotation about
+the origin, as in create_building_base_polygon) applied to the vertices; no
+polygon offsets, no setcoords.
+
+Keys are the dimensions rounded to round_decimals, or snapped to a multiple
+of quantize_step (e.g. 0.25 m) to share templates between near-identical
+buildings. The template is always built from the key's values, so the
+geometry of a building does not depend on which building came first.
+Least-recently used templates are evicted beyond max_entries.
+
+Usage:
+    cache = get_geometry_cache(max_entries=256, quantize_step=0.1)
+    key = cache.key(width, length, wall_height, num_floors, perimeter_depth, has_core, edge_types)
+    floors_zones, extra = cache.build(idf, key, orientation, build_fn)
+"""
+
+import threading
+from collections import OrderedDict
+from math import radians, sin, cos, isnan
+
+from idf_objects.other.idf_index import get_idf_index
+
+_CACHES = {}
+_LOCK = threading.Lock()
+
+
+def _rotate_xy(x, y, c, s):
+    return c * x - s * y, s * x + c * y
+
+
+def _rotate_poly(poly, c, s):
+    return [(*_rotate_xy(p[0], p[1], c, s), p[2]) for p in poly]
+
+
+def _rotate_fields(fields, c, s):
+    """Field dict with every (Vertex_n_Xcoordinate, Vertex_n_Ycoordinate) pair rotated."""
+    out = dict(fields)
+    n = 1
+    while f"Vertex_{n}_Xcoordinate" in fields:
+        xk, yk = f"Vertex_{n}_Xcoordinate", f"Vertex_{n}_Ycoordinate"
+        out[xk], out[yk] = _rotate_xy(float(fields[xk]), float(fields[yk]), c, s)
+        n += 1
+    return out
+
+
+class GeometryTemplate:
+    """
+    objects : list of (object type, {field: value}), in creation order
+    floors : {floor_i: [(zone_name, base_poly, top_poly, [object positions])]}
+    extra : dict returned by build_fn besides the zones (e.g. log entries)
+    """
+
+    def __init__(self, objects, floors, extra):
+        self.objects = objects
+        self.floors = floors
+        self.extra = extra
+
+
+def capture_template(idf, floors_zones, extra=None):
+    """GeometryTemplate of the ZONE / surface objects of floors_zones (as built in idf)."""
+    index = get_idf_index(idf)
+    objects = []
+    floors = {}
+    for floor_i, zones_data in floors_zones.items():
+        zones = []
+        for zname, (_, bpoly, tpoly, surfs) in zones_data.items():
+            positions = []
+            for obj in [index.get("ZONE", zname)] + list(surfs):
+                fields = {
+                    name: value
+                    for name, value in zip(obj.fieldnames[1:], obj.fieldvalues[1:])
+                    if value != ""
+                }
+                positions.append(len(objects))
+                objects.append((obj.key.upper(), fields))
+            zones.append((zname, list(bpoly), list(tpoly), positions))
+        floors[floor_i] = zones
+    return GeometryTemplate(objects, floors, dict(extra or {}))
+
+
+def replay_template(idf, template, orientation):
+    """
+    Adds the template's objects to idf, rotated by orientation (degrees).
+    Returns floors_zones as create_zones_with_perimeter_depth does:
+    {floor_i: {zone_name: (zone_name, base_poly, top_poly, [surfaces])}}.
+    """
+    c, s = cos(radians(orientation or 0.0)), sin(radians(orientation or 0.0))
+    rotate = bool(orientation)
+    index = get_idf_index(idf)
+    created = []
+    for obj_type, fields in template.objects:
+        obj = idf.newidfobject(obj_type, **(_rotate_fields(fields, c, s) if rotate else fields))
+        index.add(obj)
+        created.append(obj)
+
+    floors_zones = {}
+    for floor_i, zones in template.floors.items():
+        zones_data = {}
+        for zname, bpoly, tpoly, positions in zones:
+            if rotate:
+                bpoly, tpoly = _rotate_poly(bpoly, c, s), _rotate_poly(tpoly, c, s)
+            # positions[0] is the ZONE, the rest its surfaces
+            zones_data[zname] = (zname, bpoly, tpoly, [created[p] for p in positions[1:]])
+        floors_zones[floor_i] = zones_data
+    return floors_zones
+
+
+def rotate_objects_in_place(floors_zones, orientation):
+    """
+    Rotates already created surfaces (and the zone polygons) by orientation;
+    used for the building whose geometry just became the template.
+    """
+    if not orientation:
+        return floors_zones
+    c, s = cos(radians(orientation)), sin(radians(orientation))
+    rotated = {}
+    for floor_i, zones_data in floors_zones.items():
+        rotated[floor_i] = {}
+        for zname, (_, bpoly, tpoly, surfs) in zones_data.items():
+            for surf in surfs:
+                surf.setcoords(_rotate_poly(surf.coords, c, s))
+            rotated[floor_i][zname] = (zname, _rotate_poly(bpoly, c, s), _rotate_poly(tpoly, c, s), surfs)
+    return rotated
+
+
+class GeometryCache:
+    """
+    max_entries : int
+        Templates kept (least recently used evicted first).
+    round_decimals : int
+        Decimals of the float parts of the key.
+    quantize_step : float or None
+        If set, the float parts of the key are snapped to multiples of it.
+    """
+
+    def __init__(self, max_entries=256, round_decimals=3, quantize_step=None):
+        self.max_entries = max_entries
+        self.round_decimals = round_decimals
+        self.quantize_step = quantize_step
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _q(self, value):
+        value = float(value)
+        if self.quantize_step:
+            value = round(value / self.quantize_step) * self.quantize_step
+        return round(value, self.round_decimals)
+
+    def key(self, width, length, wall_height, num_floors, perimeter_depth, has_core, edge_types,
+            floor_multiplier_min_floors=None):
+        """Canonical key; its float parts are the values the template is built from."""
+        return (
+            self._q(width), self._q(length), self._q(wall_height), int(num_floors),
+            self._q(perimeter_depth), bool(has_core),
+            tuple(str(e).strip().lower() for e in edge_types),
+            floor_multiplier_min_floors
+        )
+
+    def get(self, key):
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+            return template
+
+    def put(self, key, template):
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+
+    def build(self, idf, key, orientation, build_fn):
+        """
+        Geometry of key in idf at orientation.
+        build_fn(idf) builds it at orientation 0 from the key's values and
+        returns (floors_zones, extra); it only runs on a cache miss.
+        Returns (floors_zones, extra).
+        """
+        orientation = float(orientation or 0.0)
+        if isnan(orientation):
+            orientation = 0.0
+        template = self.get(key)
+        if template is not None:
+            self.hits += 1
+            return replay_template(idf, template, orientation), dict(template.extra)
+        self.misses += 1
+        floors_zones, extra = build_fn(idf)
+        self.put(key, capture_template(idf, floors_zones, extra))
+        return rotate_objects_in_place(floors_zones, orientation), extra
+
+    def stats(self):
+        return {"entries": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+def get_geometry_cache(max_entries=256, round_decimals=3, quantize_step=None):
+    """The process-wide GeometryCache for these settings."""
+    settings = (max_entries, round_decimals, quantize_step)
+    with _LOCK:
+        cache = _CACHES.get(settings)
+        if cache is None:
+            cache = GeometryCache(max_entries, round_decimals, quantize_step)
+            _CACHES[settings] = cache
+        return cache
@@ -1,5 +1,8 @@
 # geomz/geometry_overrides_helper.py
 
+from override_resolver import find_overrides
+
+
 def find_geom_overrides(building_id, building_type, user_config):
     """
     Returns a list of geometry override rows that match the given building_id and/or building_type.
@@ -10,13 +13,5 @@ def find_geom_overrides(building_id, building_type, user_config):
       - for numeric: (min_val, max_val)
       - for boolean: (fixed_value)
     """
-    matches = []
-    for row in user_config:
-        if "building_id" in row:
-            if row["building_id"] != building_id:
-                continue
-        if "building_type" in row:
-            if row["building_type"] != building_type:
-                continue
-        matches.append(row)
-    return matches
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides("geometry", user_config, building_id=building_id, building_type=building_type)
@@ -4,7 +4,7 @@
 # for each floor in a building, plus optional interzone linking. 
 # --------------------------------------------------------------------------
 
-from .geometry import polygon_area, inward_offset_polygon
+from .geometry import polygon_area, polygon_signed_area, inward_offset_polygon
 
 def link_surfaces(surface_a, surface_b):
     """
@@ -168,7 +168,8 @@ def create_zones_with_perimeter_depth(
     perimeter_depth,
     floor_type,
     has_core,
-    is_top_floor
+    is_top_floor,
+    core_poly=None
 ):
     """
     Create multiple zones (4 perimeter + 1 core) or a single zone if no core.
@@ -187,6 +188,9 @@ def create_zones_with_perimeter_depth(
     each mapping to a tuple of 4 items: (zname, base_poly, top_poly, surfs_list).
     That means index [3] is the list of surfaces, so we can do zone_data[zname][3]
     in building.py.
+
+    core_poly: the inward offset of base_poly if already computed
+    (geometry_batch.py); [] means no valid core. None => computed here.
     """
     def edge_to_bc(e):
         """
@@ -216,13 +220,18 @@ def create_zones_with_perimeter_depth(
     # Try to offset the polygon inward for a core
     A, B, C, D = base_poly
     inner_poly = None
-    if has_core:
+    if has_core and core_poly is not None:
+        inner_poly = core_poly or None
+    elif has_core:
         inner_poly = inward_offset_polygon(A, B, C, D, perimeter_depth)
         if inner_poly:
             A2, B2, C2, D2 = inner_poly
-            # Check if that offset polygon is large enough
+            # Check if that offset polygon is large enough, and not turned
+            # inside out (perimeter_depth >= half the shorter side)
             if polygon_area([A2, B2, C2, D2]) < 1e-3:
                 inner_poly = None  # not valid => discard
+            elif (polygon_signed_area(inner_poly) > 0) != (polygon_signed_area(base_poly) > 0):
+                inner_poly = None
 
     # ================= Single-Zone Case =================
     if not inner_poly:
@@ -0,0 +1,134 @@
+# geomz/zoning_policy.py
+"""
+Adaptive zoning: single zone vs perimeter + core per building, from an
+accuracy budget.
+
+A perimeter + core split costs five zones (and ~30 surfaces) per floor
+instead of one. For small or narrow footprints the core is a small share of
+the floor and the split barely changes the results, so the policy predicts
+the relative error of modeling a building as one zone per floor
+
+    error = max(0, c0 + c_core * core_fraction + c_elong * elongation + c_area * log10(area))
+
+    core_fraction = core area / footprint (0 if no core fits)
+    elongation    = 1 - short side / long side
+
+and uses a single zone whenever that error is within error_budget.
+
+The coefficients are calibrated once against a reference set (buildings
+simulated both ways; see calibrate_zoning_policy) and stored as JSON. The
+DEFAULT_COEFFICIENTS are a conservative starting point, not a calibration.
+
+By default the policy only removes cores (has_core from assign_geometry_values
+stays the upper bound); with respect_lookup=False it also adds a core where
+the predicted error exceeds the budget.
+
+Usage:
+    policy = ZoningPolicy.from_config({"error_budget": 0.03, "calibration_file": "user_configs/zoning_policy.json"})
+    has_core, error = policy.decide(width, length, perimeter_depth, has_core)
+"""
+
+import json
+import math
+
+import numpy as np
+
+DEFAULT_COEFFICIENTS = {"c0": 0.0, "c_core": 0.15, "c_elong": 0.02, "c_area": 0.0}
+
+FEATURES = ["core_fraction", "elongation", "log10_area"]
+
+
+def zoning_features(width, length, perimeter_depth):
+    """(core_fraction, elongation, log10_area) for scalars or arrays."""
+    w = np.asarray(width, dtype=float)
+    l = np.asarray(length, dtype=float)
+    d = np.asarray(perimeter_depth, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        area = w * l
+        core = np.clip(w - 2 * d, 0, None) * np.clip(l - 2 * d, 0, None)
+        core_fraction = np.where(area > 0, core / area, 0.0)
+        elongation = np.where(np.maximum(w, l) > 0, 1 - np.minimum(w, l) / np.maximum(w, l), 0.0)
+        log_area = np.log10(np.where(area > 0, area, 1.0))
+    return core_fraction, elongation, log_area
+
+
+class ZoningPolicy:
+    """
+    error_budget : float
+        Accepted relative error of a single zone per floor (e.g. 0.05 = 5 %).
+    coefficients : dict or None
+        {"c0", "c_core", "c_elong", "c_area"}; None => DEFAULT_COEFFICIENTS.
+    respect_lookup : bool
+        Never add a core the geometry lookup / overrides did not ask for.
+    """
+
+    def __init__(self, error_budget=0.05, coefficients=None, respect_lookup=True):
+        self.error_budget = error_budget
+        self.coefficients = dict(DEFAULT_COEFFICIENTS, **(coefficients or {}))
+        self.respect_lookup = respect_lookup
+
+    @classmethod
+    def from_config(cls, config):
+        """{"error_budget", "calibration_file", "respect_lookup"} => ZoningPolicy."""
+        coefficients = None
+        if config.get("calibration_file"):
+            with open(config["calibration_file"], "r") as f:
+                coefficients = json.load(f).get("coefficients")
+        return cls(
+            error_budget=config.get("error_budget", 0.05),
+            coefficients=coefficients,
+            respect_lookup=config.get("respect_lookup", True)
+        )
+
+    def predicted_error(self, width, length, perimeter_depth):
+        c = self.coefficients
+        core_fraction, elongation, log_area = zoning_features(width, length, perimeter_depth)
+        error = c["c0"] + c["c_core"] * core_fraction + c["c_elong"] * elongation + c["c_area"] * log_area
+        return np.clip(error, 0, None)
+
+    def decide(self, width, length, perimeter_depth, has_core):
+        """
+        (has_core, predicted error) for one building or arrays of buildings.
+        """
+        error = self.predicted_error(width, length, perimeter_depth)
+        need_core = error > self.error_budget
+        if self.respect_lookup:
+            need_core = need_core & np.asarray(has_core, dtype=bool)
+        if np.ndim(need_core) == 0:
+            return bool(need_core), float(error)
+        return need_core, error
+
+    def save(self, path, extra=None):
+        with open(path, "w") as f:
+            json.dump(dict(extra or {}, coefficients=self.coefficients), f, indent=2)
+        return path
+
+
+def calibrate_zoning_policy(reference, error_budget=0.05, out_path=None):
+    """
+    Fits the coefficients to a reference set of buildings simulated both as
+    single zone and as perimeter + core.
+
+    reference : DataFrame
+        Columns area, perimeter, perimeter_depth, and error: the relative
+        difference of the target metric, e.g.
+        |E_single - E_core| / E_core of annual heating + cooling.
+    Returns the calibrated ZoningPolicy (saved to out_path if given, with
+    the fit's RMSE and sample count).
+    """
+    area = reference["area"].to_numpy(dtype=float)
+    perimeter = reference["perimeter"].to_numpy(dtype=float)
+    width = area / (perimeter / 4.0)
+    length = area / width
+    core_fraction, elongation, log_area = zoning_features(width, length, reference["perimeter_depth"])
+    X = np.column_stack([np.ones(len(area)), core_fraction, elongation, log_area])
+    y = reference["error"].to_numpy(dtype=float)
+    coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+    policy = ZoningPolicy(
+        error_budget=error_budget,
+        coefficients=dict(zip(["c0", "c_core", "c_elong", "c_area"], (float(c) for c in coef)))
+    )
+    rmse = math.sqrt(float(np.mean((X @ coef - y) ** 2))) if len(y) else float("nan")
+    if out_path:
+        policy.save(out_path, extra={"rmse": rmse, "samples": int(len(y)), "features": FEATURES})
+    return policy
@@ -0,0 +1,194 @@
+# other/archetypes.py
+"""
+Archetype deduplication: buildings whose rows lead to the same EnergyPlus
+model are generated (and simulated) only once.
+
+With a non-random strategy, two rows that only differ in identity /
+location columns (ogc_fid, pand_id, x, y, lat, lon, postcode, ...) produce
+identical IDFs. The model fingerprint is a hash of all other row values plus
+the picking settings.
+
+Rules that keep the fingerprint safe:
+  - A building targeted by a user override with "building_id" keeps its own
+    fingerprint (its ogc_fid is hashed in).
+  - strategy "B" draws from per-building random streams keyed by ogc_fid
+    (rng_streams.py), so nothing is deduplicated in that case.
+  - lat / lon only choose the EPW file; simulations are deduplicated on the
+    (model, EPW, output folder) triple in epw/run_epw_sims.simulate_all.
+
+Usage:
+    groups = assign_model_fingerprints(df_buildings, settings, override_configs)
+    # build only df_buildings.loc[list(groups)], then
+    fan_out_archetypes(df_buildings, groups, assigned_logs)
+"""
+
+import copy
+import json
+import math
+import hashlib
+import logging
+
+# Columns that identify or locate a building but do not enter the IDF
+DEFAULT_IGNORE_COLUMNS = [
+    "ogc_fid",
+    "pand_id",
+    "idf_name",
+    "model_fingerprint",
+    "x",
+    "y",
+    "lat",
+    "lon",
+    "postcode",
+    "desired_climate_year"
+]
+
+FINGERPRINT_COLUMN = "model_fingerprint"
+ARCHETYPE_MAP_FILE = "archetype_map.json"
+
+
+def _normalize(value, round_decimals=None):
+    """JSON-stable form of a row value (NaN => None, numpy scalars => python)."""
+    if hasattr(value, "item") and not isinstance(value, (list, dict, str)):
+        try:
+            value = value.item()
+        except (ValueError, AttributeError):
+            pass
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if round_decimals is not None:
+            return round(value, round_decimals)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def override_building_ids(*configs):
+    """
+    All "building_id" values found anywhere in the given user configs
+    (lists of override rows or nested dicts).
+    """
+    ids = set()
+
+    def _walk(obj):
+        if isinstance(obj, dict):
+            for key, val in obj.items():
+                if key == "building_id":
+                    for bid in (val if isinstance(val, list) else [val]):
+                        ids.add(str(bid))
+                else:
+                    _walk(val)
+        elif isinstance(obj, list):
+            for item in obj:
+                _walk(item)
+
+    for cfg in configs:
+        if cfg:
+            _walk(cfg)
+    return ids
+
+
+def compute_model_fingerprint(building_row, settings, pinned_ids=None,
+                              ignore_columns=None, round_decimals=None):
+    """
+    Returns the hex fingerprint of the model built from building_row.
+
+    settings : dict
+        Picking settings shared by all buildings (scenario, calibration_stage,
+        strategy, random_seed, output_format, ...).
+    pinned_ids : set of str
+        ogc_fids that have id-specific overrides => never share a model.
+    """
+    ignore = set(DEFAULT_IGNORE_COLUMNS if ignore_columns is None else ignore_columns)
+    bldg_id = building_row.get("ogc_fid")
+
+    payload = {
+        "row": {
+            str(col): _normalize(val, round_decimals)
+            for col, val in building_row.items()
+            if col not in ignore
+        },
+        "settings": {k: _normalize(v) for k, v in settings.items()}
+    }
+    if pinned_ids and str(bldg_id) in pinned_ids:
+        payload["ogc_fid"] = _normalize(bldg_id)
+    if settings.get("strategy") == "B":
+        # random picks come from per-building streams => differ per building
+        payload["ogc_fid"] = _normalize(bldg_id)
+
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def assign_model_fingerprints(df_buildings, settings, override_configs=(), archetype_config=None):
+    """
+    Adds the column "model_fingerprint" to df_buildings and groups the rows.
+
+    Returns
+    -------
+    groups : dict
+        {representative_index: [member_index, ...]} in row order; the
+        representative is the first row of each fingerprint and is listed
+        among its own members.
+    """
+    archetype_config = archetype_config or {}
+    pinned_ids = override_building_ids(*override_configs)
+
+    first_index = {}
+    groups = {}
+    fingerprints = []
+    for idx, row in df_buildings.iterrows():
+        fp = compute_model_fingerprint(
+            row,
+            settings,
+            pinned_ids=pinned_ids,
+            ignore_columns=archetype_config.get("ignore_columns"),
+            round_decimals=archetype_config.get("round_decimals")
+        )
+        fingerprints.append(fp)
+        rep_idx = first_index.setdefault(fp, idx)
+        groups.setdefault(rep_idx, []).append(idx)
+
+    df_buildings[FINGERPRINT_COLUMN] = fingerprints
+    logging.getLogger(__name__).info(
+        f"[archetypes] {len(df_buildings)} buildings => {len(groups)} distinct models "
+        f"({len(pinned_ids)} ids pinned by overrides)."
+    )
+    return groups
+
+
+def fan_out_archetypes(df_buildings, groups, assigned_logs):
+    """
+    Gives every member the representative's idf_name and copies the
+    representative's per-building log entries to each member's ogc_fid.
+    Logs that are not keyed per building (e.g. ground temperatures) are
+    left untouched.
+    """
+    for rep_idx, members in groups.items():
+        rep_name = df_buildings.loc[rep_idx, "idf_name"] if "idf_name" in df_buildings.columns else None
+        rep_id = df_buildings.loc[rep_idx].get("ogc_fid", rep_idx)
+        for idx in members:
+            if idx == rep_idx:
+                continue
+            df_buildings.loc[idx, "idf_name"] = rep_name
+            member_id = df_buildings.loc[idx].get("ogc_fid", idx)
+            for log in assigned_logs.values():
+                if rep_id in log and member_id not in log:
+                    log[member_id] = copy.deepcopy(log[rep_id])
+
+
+def archetype_rows(df_buildings, groups):
+    """
+    Flat rows (ogc_fid, building_index, representative_index, fingerprint)
+    for the assigned_archetypes.csv log.
+    """
+    rows = []
+    for rep_idx, members in groups.items():
+        for idx in members:
+            rows.append({
+                "ogc_fid": df_buildings.loc[idx].get("ogc_fid", idx),
+                "building_index": idx,
+                "representative_index": rep_idx,
+                "model_fingerprint": df_buildings.loc[idx, FINGERPRINT_COLUMN]
+            })
+    return rows
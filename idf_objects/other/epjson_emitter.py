@@ -0,0 +1,247 @@
+# other/epjson_emitter.py
+"""
+epJSON output: writes a building model as EnergyPlus epJSON with the
+standard json module, instead of serializing it with eppy's idf.save().
+
+This is an output format, not a faster build: the model is still built
+object by object with eppy / geomeppy (geometry, set_wwr and surface
+matching need the eppy objects), and idf_to_epjson walks the finished model
+once more to turn it into dicts, in place of idf.save(). Use it where
+native epJSON files are wanted, not to save time per building.
+
+EnergyPlus reads *.epJSON natively, so the file can be simulated directly
+(see epw/run_epw_sims.run_simulation). Field names, numeric types and
+extensible groups (vertices, Schedule:Compact data, ...) come from the
+Energy+.schema.epJSON file shipped next to Energy+.idd.
+
+Layout of the result:
+    {
+      "Building": {"Sample_Building_0": {"north_axis": 0.0, ...}},
+      "Zone": {...},
+      "BuildingSurface:Detailed": {
+          "Zone1_Wall_1": {..., "vertices": [{"vertex_x_coordinate": 0.0, ...}, ...]}
+      },
+      "SimulationControl": {"SimulationControl 1": {...}}   # objects without a name
+    }
+
+Equivalence with the IDF path can be checked with compare_with_idf(), which
+converts the saved IDF through EnergyPlus' own ConvertInputFormat tool and
+diffs both epJSON dicts. verify_epjson() does that for a model in memory;
+create_idf_for_building runs it on the first run_context.epjson_verify
+buildings of an epjson run, and tests/test_epjson_emitter.py covers it.
+"""
+
+import os
+import json
+import math
+import shutil
+import tempfile
+import subprocess
+import threading
+
+_SCHEMAS = {}
+_LOCK = threading.Lock()
+
+
+def default_schema_path(iddfile):
+    """EnergyPlus ships Energy+.schema.epJSON in the same folder as Energy+.idd."""
+    return os.path.join(os.path.dirname(iddfile), "Energy+.schema.epJSON")
+
+
+def load_object_specs(schema_path):
+    """
+    Returns {OBJECT_TYPE_UPPER: spec} where spec holds the canonical type name,
+    the ordered legacy field names, the extensible group names + key, and
+    which fields are numeric. Parsed once per process per schema file.
+    """
+    with _LOCK:
+        specs = _SCHEMAS.get(schema_path)
+        if specs is not None:
+            return specs
+
+    with open(schema_path, "r") as f:
+        schema = json.load(f)
+
+    specs = {}
+    for obj_type, obj_schema in schema.get("properties", {}).items():
+        legacy = obj_schema.get("legacy_idd", {})
+        field_info = legacy.get("field_info", {})
+        specs[obj_type.upper()] = {
+            "type": obj_type,
+            "fields": legacy.get("fields", []),
+            "extensibles": legacy.get("extensibles", []),
+            "extension": legacy.get("extension"),
+            "numeric": {
+                fname for fname, info in field_info.items()
+                if info.get("field_type") == "n"
+            }
+        }
+
+    with _LOCK:
+        _SCHEMAS.setdefault(schema_path, specs)
+        return _SCHEMAS[schema_path]
+
+
+def _convert_value(value, is_numeric):
+    """
+    Numeric fields => int/float (keeps 'Autosize', 'Autocalculate' as str).
+    Alpha fields => str. Blank values => None (omitted).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+    if not is_numeric:
+        return value if isinstance(value, str) else str(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        num = float(value)
+    except ValueError:
+        return value
+    if num.is_integer() and "." not in value and "e" not in value.lower():
+        return int(num)
+    return num
+
+
+def idf_to_epjson(idf, schema_path):
+    """
+    Converts an eppy / geomeppy IDF model into an epJSON dict.
+    """
+    specs = load_object_specs(schema_path)
+    out = {}
+
+    for obj_key, objs in idf.idfobjects.items():
+        if not objs:
+            continue
+        spec = specs.get(obj_key.upper())
+        if spec is None:
+            raise KeyError(f"[epJSON] Object type '{obj_key}' not found in schema {schema_path}")
+
+        fields = spec["fields"]
+        has_name = bool(fields) and fields[0] == "name"
+        extensibles = spec["extensibles"]
+        numeric = spec["numeric"]
+        type_dict = out.setdefault(spec["type"], {})
+
+        for i, obj in enumerate(objs, start=1):
+            values = list(obj.obj[1:])
+            # Trailing blanks do not change the model
+            while values and (values[-1] is None or str(values[-1]).strip() == ""):
+                values.pop()
+
+            body = {}
+            n_fixed = len(fields)
+            for fname, raw in zip(fields, values[:n_fixed]):
+                if fname == "name" and has_name:
+                    continue
+                val = _convert_value(raw, fname in numeric)
+                if val is not None:
+                    body[fname] = val
+
+            if extensibles and len(values) > n_fixed:
+                groups = []
+                ext_values = values[n_fixed:]
+                for g in range(0, len(ext_values), len(extensibles)):
+                    group = {}
+                    for fname, raw in zip(extensibles, ext_values[g:g + len(extensibles)]):
+                        val = _convert_value(raw, fname in numeric)
+                        if val is not None:
+                            group[fname] = val
+                    if group:
+                        groups.append(group)
+                if groups:
+                    body[spec["extension"]] = groups
+
+            if has_name and values and str(values[0]).strip():
+                obj_name = str(values[0]).strip()
+            else:
+                obj_name = f"{spec['type']} {i}"
+            type_dict[obj_name] = body
+
+    return out
+
+
+def save_epjson(idf, out_path, schema_path):
+    """
+    Writes the model to out_path (.epJSON) and returns out_path.
+    """
+    model = idf_to_epjson(idf, schema_path)
+    folder = os.path.dirname(out_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(model, f, indent=1)
+    return out_path
+
+
+###############################################################################
+# Equivalence check against the IDF path
+###############################################################################
+def diff_epjson(expected, actual, rel_tol=1e-6, path=""):
+    """
+    Recursively compares two epJSON dicts. Keys are compared case-insensitively
+    (EnergyPlus names are case-insensitive), numbers with rel_tol.
+    Returns a list of human-readable differences (empty => equivalent).
+    """
+    diffs = []
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        exp = {str(k).upper(): (k, v) for k, v in expected.items()}
+        act = {str(k).upper(): (k, v) for k, v in actual.items()}
+        for key in sorted(set(exp) | set(act)):
+            where = f"{path}/{exp.get(key, act.get(key))[0]}"
+            if key not in act:
+                diffs.append(f"missing in actual: {where}")
+            elif key not in exp:
+                diffs.append(f"extra in actual: {where}")
+            else:
+                diffs.extend(diff_epjson(exp[key][1], act[key][1], rel_tol, where))
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            diffs.append(f"length differs at {path}: {len(expected)} != {len(actual)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_epjson(e, a, rel_tol, f"{path}[{i}]"))
+    elif isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        if not math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=1e-9):
+            diffs.append(f"value differs at {path}: {expected} != {actual}")
+    elif str(expected).upper() != str(actual).upper():
+        diffs.append(f"value differs at {path}: {expected!r} != {actual!r}")
+    return diffs
+
+
+def compare_with_idf(idf_path, epjson_path, converter_path=None):
+    """
+    Converts idf_path to epJSON with EnergyPlus' ConvertInputFormat and diffs
+    it against epjson_path. converter_path defaults to ConvertInputFormat on
+    the PATH. Returns the list of differences (empty => equivalent).
+    """
+    converter = converter_path or shutil.which("ConvertInputFormat")
+    if not converter:
+        raise FileNotFoundError("ConvertInputFormat not found; pass converter_path.")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_idf = os.path.join(tmp_dir, os.path.basename(idf_path))
+        shutil.copyfile(idf_path, tmp_idf)
+        subprocess.run([converter, tmp_idf], cwd=tmp_dir, check=True, capture_output=True)
+        converted = os.path.splitext(tmp_idf)[0] + ".epJSON"
+        with open(converted, "r") as f:
+            expected = json.load(f)
+
+    with open(epjson_path, "r") as f:
+        actual = json.load(f)
+
+    return diff_epjson(expected, actual)
+
+
+def verify_epjson(idf, epjson_path, converter_path=None):
+    """
+    Saves idf as IDF to a temporary folder and diffs its ConvertInputFormat
+    conversion against epjson_path (see compare_with_idf). The IDF model is
+    not renamed. Returns the list of differences (empty => equivalent).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        idf_path = os.path.join(tmp_dir, os.path.splitext(os.path.basename(epjson_path))[0] + ".idf")
+        idf.save(idf_path)
+        return compare_with_idf(idf_path, epjson_path, converter_path)
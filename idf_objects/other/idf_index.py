@@ -0,0 +1,150 @@
+# other/idf_index.py
+"""
+Indexed lookups of IDF objects by type, name, zone or any other fields.
+
+eppy's idf.getobject() and the usual
+    [o for o in idf.idfobjects[TYPE] if o.Name == name]
+scan all objects of a type, so code that does one lookup per zone (HVAC,
+ventilation) or per parameter row (modification) is quadratic in the model
+size. IDFIndex keeps, per object type and key fields, a dict
+    (field values, upper-cased) -> [objects]
+built on first use, so later lookups are O(1):
+
+    index = get_idf_index(idf)
+    index.get("ZONEHVAC:IDEALLOADSAIRSYSTEM", "Zone1 Ideal Loads")
+    index.for_zone("ZONECONTROL:THERMOSTAT", "Zone1")
+    index.find("OUTPUT:VARIABLE", Variable_Name="Zone Air Temperature",
+               Reporting_Frequency="Hourly")
+
+Keeping it in sync:
+  - Objects created with idf.newidfobject(...) are registered with
+    index.add(obj) once their key fields are set.
+  - If objects of a type were added or removed without the index, the count
+    of that type no longer matches and its tables are rebuilt on the next
+    lookup (correct, only slower).
+  - Renaming an indexed object (or changing its zone) is not detected;
+    call index.refresh(obj_type) afterwards.
+
+Names are compared case-insensitively, as EnergyPlus does.
+"""
+
+# Fields that link an object to its zone, in order of preference
+ZONE_FIELDS = (
+    "Zone_Name",
+    "Zone_or_ZoneList_Name",
+    "Zone_or_ZoneList_or_Space_or_SpaceList_Name",
+    "Zone_or_Space_Name",
+)
+
+_ZONE = "<zone>"
+
+
+def _field_value(obj, field):
+    if field == _ZONE:
+        for zone_field in ZONE_FIELDS:
+            if hasattr(obj, zone_field):
+                return str(getattr(obj, zone_field)).upper()
+        return ""
+    return str(getattr(obj, field, "")).upper()
+
+
+class IDFIndex:
+    """
+    idf : eppy / geomeppy IDF
+    """
+
+    def __init__(self, idf):
+        self.idf = idf
+        self._counts = {}  # obj_type -> number of objects when indexed
+        self._tables = {}  # (obj_type, fields) -> {key: [objects]}
+
+    def _objects(self, obj_type):
+        return self.idf.idfobjects[obj_type]
+
+    def _sync(self, obj_type):
+        """Drops the tables of obj_type if objects were added / removed without the index."""
+        count = len(self._objects(obj_type))
+        if self._counts.get(obj_type) != count:
+            self.refresh(obj_type)
+            self._counts[obj_type] = count
+
+    def _table(self, obj_type, fields):
+        obj_type = obj_type.upper()
+        self._sync(obj_type)
+        table = self._tables.get((obj_type, fields))
+        if table is None:
+            table = {}
+            for obj in self._objects(obj_type):
+                key = tuple(_field_value(obj, f) for f in fields)
+                table.setdefault(key, []).append(obj)
+            self._tables[(obj_type, fields)] = table
+        return table
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def find(self, obj_type, **field_values):
+        """All objects of obj_type whose fields equal field_values (case-insensitive)."""
+        fields = tuple(sorted(field_values))
+        key = tuple(str(field_values[f]).upper() for f in fields)
+        return list(self._table(obj_type, fields).get(key, []))
+
+    def get(self, obj_type, name):
+        """The first object of obj_type named name, or None."""
+        matches = self._table(obj_type, ("Name",)).get((str(name).upper(),))
+        return matches[0] if matches else None
+
+    def for_zone(self, obj_type, zone_name):
+        """Objects of obj_type that reference zone_name (see ZONE_FIELDS)."""
+        return list(self._table(obj_type, (_ZONE,)).get((str(zone_name).upper(),), []))
+
+    def has_type(self, obj_type):
+        return obj_type.upper() in self.idf.idfobjects
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, obj):
+        """Registers an object just created with idf.newidfobject (key fields set)."""
+        obj_type = obj.key.upper()
+        count = len(self._objects(obj_type))
+        if self._counts.get(obj_type) != count - 1:
+            # not indexed yet, or other objects changed too => rebuild lazily
+            self.refresh(obj_type)
+            return obj
+        self._counts[obj_type] = count
+        for (table_type, fields), table in self._tables.items():
+            if table_type == obj_type:
+                key = tuple(_field_value(obj, f) for f in fields)
+                table.setdefault(key, []).append(obj)
+        return obj
+
+    def find_or_create(self, obj_type, name):
+        """The object of obj_type named name; created (with that Name) if missing."""
+        obj = self.get(obj_type, name)
+        if obj is None:
+            obj = self.idf.newidfobject(obj_type.upper())
+            if hasattr(obj, "Name"):
+                obj.Name = name
+            self.add(obj)
+        return obj
+
+    def refresh(self, obj_type=None):
+        """Forgets the tables of obj_type (all types if None); rebuilt on next use."""
+        if obj_type is None:
+            self._tables.clear()
+            self._counts.clear()
+            return
+        obj_type = obj_type.upper()
+        for key in [k for k in self._tables if k[0] == obj_type]:
+            del self._tables[key]
+        self._counts.pop(obj_type, None)
+
+
+def get_idf_index(idf):
+    """The IDFIndex attached to idf (created on first use)."""
+    index = getattr(idf, "_object_index", None)
+    if index is None or index.idf is not idf:
+        index = IDFIndex(idf)
+        idf._object_index = index
+    return index
@@ -0,0 +1,371 @@
+# other/idf_linter.py
+"""
+Pre-simulation checks of generated models, so broken buildings are rejected
+before they take an EnergyPlus worker slot (and leave a half-written output
+folder behind) instead of failing in the .err file.
+
+The model file (IDF text or epJSON) is read directly, without eppy, and
+checked against the field definitions of Energy+.idd (parsed once per
+process):
+
+  errors (the model is rejected)
+    - dangling_reference      : a "\\type object-list" field names an object
+                                that does not exist (e.g. a missing
+                                LightsSchedule / TreeTransSchedule, a
+                                construction "Window1C" that was never
+                                created, an Outside_Boundary_Condition_Object
+                                pointing at a surface that is not there)
+    - missing_boundary_object : Outside Boundary Condition "Surface" without
+                                a boundary object
+    - degenerate_surface      : fewer than 3 vertices, or area below
+                                min_surface_area (e.g. from a collapsed
+                                inward_offset_polygon)
+    - duplicate_name          : two objects of one type with the same name
+  warnings (reported only)
+    - boundary_not_reciprocal : surface A points at B, but B not back at A
+    - unknown_object_type     : object type not in the IDD
+
+Object-list names are matched case-insensitively, like EnergyPlus. Lists
+that no IDD object provides are not checked.
+
+Usage:
+    linter = IDFLinter(iddfile)
+    report = linter.lint("output/output_IDFs/building_0.idf")
+    if not report["ok"]: ...
+    linter.write_report("output/lint_report.json")
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+_IDD_CACHE = {}
+_LOCK = threading.Lock()
+
+MAX_ISSUES_PER_MODEL = 200
+
+
+class ClassSpec:
+    """Field definitions of one IDD object type."""
+
+    def __init__(self, name):
+        self.name = name
+        self.fields = []           # [{"name", "object_list": [...], "reference": [...]}]
+        self.extensible = 0
+        self.ext_begin = None
+        self.reference_class = []  # lists that contain this type's class name
+
+    def field(self, i):
+        if i < len(self.fields):
+            return self.fields[i]
+        if self.extensible and self.fields:
+            begin = self.ext_begin if self.ext_begin is not None else len(self.fields) - self.extensible
+            return self.fields[begin + (i - begin) % self.extensible]
+        return None
+
+    def index_of(self, prefix):
+        prefix = prefix.lower()
+        for i, f in enumerate(self.fields):
+            if f["name"].lower().startswith(prefix):
+                return i
+        return None
+
+
+def parse_idd(iddfile):
+    """{TYPE_UPPER: ClassSpec} of an Energy+.idd, cached per process."""
+    with _LOCK:
+        if iddfile in _IDD_CACHE:
+            return _IDD_CACHE[iddfile]
+
+    classes = {}
+    cur = None
+    field = None
+    field_re = re.compile(r"^([AN]\d+)\s*[,;]\s*(.*)$")
+    with open(iddfile, "r", encoding="latin-1") as f:
+        for raw in f:
+            line = raw.split("!", 1)[0].rstrip()
+            text = line.strip()
+            if not text or text.startswith("\\group"):
+                continue
+            if not raw[0].isspace() and not text.startswith("\\"):
+                # object type header, e.g. "Zone," or "Lead Input;"
+                name = text.rstrip(",;").strip()
+                cur = ClassSpec(name)
+                classes[name.upper()] = cur
+                field = None
+                continue
+            if cur is None:
+                continue
+            m = field_re.match(text)
+            if m:
+                field = {"name": "", "object_list": [], "reference": []}
+                cur.fields.append(field)
+                rest = m.group(2)
+                if rest.startswith("\\field"):
+                    field["name"] = rest[len("\\field"):].strip()
+                continue
+            if not text.startswith("\\"):
+                continue
+            key, _, value = text[1:].partition(" ")
+            value = value.strip()
+            if key.startswith("extensible:"):
+                cur.extensible = int(re.match(r"\d+", key.split(":", 1)[1]).group(0))
+            elif key == "reference-class-name":
+                cur.reference_class.append(value)
+            elif field is None:
+                continue
+            elif key == "field":
+                field["name"] = value
+            elif key == "object-list":
+                field["object_list"].append(value)
+            elif key == "reference":
+                field["reference"].append(value)
+            elif key == "begin-extensible":
+                cur.ext_begin = len(cur.fields) - 1
+
+    with _LOCK:
+        _IDD_CACHE[iddfile] = classes
+    return classes
+
+
+###############################################################################
+# Model readers => [(object_type, [field values])]
+###############################################################################
+def read_idf_objects(path):
+    with open(path, "r", encoding="latin-1") as f:
+        text = "\n".join(line.split("!", 1)[0] for line in f)
+    objects = []
+    for chunk in text.split(";"):
+        values = [v.strip() for v in chunk.split(",")]
+        if values and values[0]:
+            objects.append((values[0], values[1:]))
+    return objects
+
+
+def _json_key(field_name, extensible=False):
+    if extensible:
+        field_name = re.sub(r"\b\d+\b", " ", field_name)
+    return re.sub(r"[^a-z0-9]+", "_", field_name.lower()).strip("_")
+
+
+def read_epjson_objects(path, classes):
+    with open(path, "r") as f:
+        model = json.load(f)
+    objects = []
+    for obj_type, instances in model.items():
+        spec = classes.get(obj_type.upper())
+        if spec is None or not isinstance(instances, dict):
+            objects.append((obj_type, []))
+            continue
+        ext_begin = None
+        if spec.extensible:
+            ext_begin = spec.ext_begin if spec.ext_begin is not None else len(spec.fields) - spec.extensible
+        fixed = spec.fields[:ext_begin] if ext_begin is not None else spec.fields
+        for name, props in instances.items():
+            values = []
+            for i, f in enumerate(fixed):
+                if i == 0 and f["name"].lower() == "name":
+                    values.append(name)
+                else:
+                    values.append(props.get(_json_key(f["name"]), ""))
+            if ext_begin is not None:
+                groups = next((v for v in props.values() if isinstance(v, list)), [])
+                ext_keys = [_json_key(f["name"], extensible=True)
+                            for f in spec.fields[ext_begin:ext_begin + spec.extensible]]
+                for group in groups:
+                    values += [group.get(k, "") for k in ext_keys]
+            objects.append((obj_type, ["" if v is None else str(v) for v in values]))
+    return objects
+
+
+###############################################################################
+# Geometry
+###############################################################################
+def polygon_area(coords):
+    """Area of a planar 3D polygon [(x, y, z), ...] (Newell's method)."""
+    nx = ny = nz = 0.0
+    n = len(coords)
+    for i in range(n):
+        x1, y1, z1 = coords[i]
+        x2, y2, z2 = coords[(i + 1) % n]
+        nx += (y1 - y2) * (z1 + z2)
+        ny += (z1 - z2) * (x1 + x2)
+        nz += (x1 - x2) * (y1 + y2)
+    return 0.5 * (nx * nx + ny * ny + nz * nz) ** 0.5
+
+
+def _vertices(values, start):
+    numbers = []
+    for v in values[start:]:
+        try:
+            numbers.append(float(v))
+        except (TypeError, ValueError):
+            break
+    return [tuple(numbers[i:i + 3]) for i in range(0, len(numbers) - 2, 3)]
+
+
+###############################################################################
+# Linter
+###############################################################################
+class IDFLinter:
+    """
+    iddfile : str
+        Energy+.idd of the EnergyPlus version the models are simulated with.
+    min_surface_area : float
+        Surfaces smaller than this (m2) are degenerate.
+    """
+
+    def __init__(self, iddfile, min_surface_area=1e-4):
+        self.iddfile = iddfile
+        self.classes = parse_idd(iddfile)
+        self.min_surface_area = min_surface_area
+        self.reports = []
+
+        # lists of class names (\reference-class-name), e.g. validBranchEquipmentTypes
+        self._class_lists = {}
+        for spec in self.classes.values():
+            for list_name in spec.reference_class:
+                self._class_lists.setdefault(list_name.upper(), set()).add(spec.name.upper())
+        self._provided = set(self._class_lists)
+        for spec in self.classes.values():
+            for f in spec.fields:
+                self._provided.update(r.upper() for r in f["reference"])
+
+    def lint(self, model_path):
+        """
+        Checks one model file. Returns
+        {"model", "ok", "errors": [...], "warnings": [...], "objects", "seconds"}.
+        """
+        t0 = time.perf_counter()
+        errors = []
+        warnings = []
+
+        def _issue(target, code, obj_type, obj_name, message, field="", value=""):
+            if len(target) < MAX_ISSUES_PER_MODEL:
+                target.append({
+                    "code": code, "object_type": obj_type, "object_name": obj_name,
+                    "field": field, "value": value, "message": message
+                })
+
+        try:
+            if model_path.lower().endswith(".epjson"):
+                objects = read_epjson_objects(model_path, self.classes)
+            else:
+                objects = read_idf_objects(model_path)
+        except Exception as e:
+            _issue(errors, "unreadable_model", "", "", f"Cannot read model: {e}")
+            return self._finish(model_path, errors, warnings, 0, t0)
+
+        # 1) Names each object-list can refer to, duplicate names
+        names = {}
+        seen = {}
+        surfaces = {}
+        for obj_type, values in objects:
+            spec = self.classes.get(obj_type.upper())
+            if spec is None:
+                _issue(warnings, "unknown_object_type", obj_type, "", f"Object type '{obj_type}' is not in the IDD")
+                continue
+            for i, value in enumerate(values):
+                f = spec.field(i)
+                if f is None or not f["reference"] or not value:
+                    continue
+                for list_name in f["reference"]:
+                    names.setdefault(list_name.upper(), set()).add(value.upper())
+            if spec.fields and spec.fields[0]["name"].lower() == "name" and values and spec.fields[0]["reference"]:
+                key = (spec.name.upper(), values[0].upper())
+                if key in seen:
+                    _issue(errors, "duplicate_name", spec.name, values[0], "Duplicate object name")
+                seen[key] = True
+
+        # 2) References, surface boundaries, geometry
+        for obj_type, values in objects:
+            spec = self.classes.get(obj_type.upper())
+            if spec is None:
+                continue
+            obj_name = values[0] if values else ""
+            for i, value in enumerate(values):
+                f = spec.field(i)
+                if f is None or not f["object_list"] or not value:
+                    continue
+                lists = [l.upper() for l in f["object_list"]]
+                if not any(l in self._provided for l in lists):
+                    continue
+                upper = value.upper()
+                if not any(upper in names.get(l, ()) or upper in self._class_lists.get(l, ()) for l in lists):
+                    _issue(errors, "dangling_reference", spec.name, obj_name,
+                           f"{f['name']} '{value}' does not exist ({'/'.join(f['object_list'])})",
+                           field=f["name"], value=value)
+
+            cond_idx = spec.index_of("outside boundary condition")
+            if cond_idx is not None and spec.fields[cond_idx]["name"].lower() == "outside boundary condition":
+                cond = values[cond_idx] if cond_idx < len(values) else ""
+                other = values[cond_idx + 1] if cond_idx + 1 < len(values) else ""
+                surfaces[obj_name.upper()] = (cond.lower(), other.upper())
+                if cond.lower() == "surface" and not other:
+                    _issue(errors, "missing_boundary_object", spec.name, obj_name,
+                           "Outside Boundary Condition 'Surface' without a boundary object")
+
+            vtx_idx = spec.index_of("vertex 1 x")
+            if vtx_idx is not None:
+                coords = _vertices(values, vtx_idx)
+                if len(coords) < 3:
+                    _issue(errors, "degenerate_surface", spec.name, obj_name,
+                           f"Surface has {len(coords)} vertices")
+                else:
+                    area = polygon_area(coords)
+                    if area < self.min_surface_area:
+                        _issue(errors, "degenerate_surface", spec.name, obj_name,
+                               f"Surface area {area:.3g} m2 < {self.min_surface_area} m2", value=area)
+
+        for name, (cond, other) in surfaces.items():
+            if cond == "surface" and other in surfaces and surfaces[other][1] != name:
+                _issue(warnings, "boundary_not_reciprocal", "", name,
+                       f"Boundary surface '{other}' does not point back at this surface")
+
+        return self._finish(model_path, errors, warnings, len(objects), t0)
+
+    def _finish(self, model_path, errors, warnings, n_objects, t0):
+        report = {
+            "model": model_path,
+            "ok": not errors,
+            "errors": errors,
+            "warnings": warnings,
+            "objects": n_objects,
+            "seconds": round(time.perf_counter() - t0, 4)
+        }
+        self.reports.append(report)
+        return report
+
+    def check_task(self, task):
+        """
+        True if the model of a simulation task
+        (idf_path, epw, idd, output_dir, building_index) passes; logs why not.
+        """
+        report = self.lint(task[0])
+        report["building_index"] = task[4]
+        if not report["ok"]:
+            first = report["errors"][0]
+            logging.error(
+                f"[idf_linter] Building {task[4]} rejected ({len(report['errors'])} errors), "
+                f"e.g. {first['code']}: {first['object_type']} '{first['object_name']}' - {first['message']}"
+            )
+        return report["ok"]
+
+    def summary(self):
+        return {
+            "checked": len(self.reports),
+            "rejected": sum(1 for r in self.reports if not r["ok"]),
+            "warnings": sum(len(r["warnings"]) for r in self.reports)
+        }
+
+    def write_report(self, path):
+        """Writes {"summary": {...}, "models": [per-model reports]} as JSON."""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "models": self.reports}, f, indent=2, default=str)
+        return path
@@ -0,0 +1,144 @@
+# other/idf_template.py
+"""
+Per-process snapshots of the base (minimal) IDF template.
+
+Reading the template from disk and parsing it for every building (or every
+scenario in the modification step) is wasted work: the template never
+changes during a run. This module parses it once per process and keeps the
+parsed IDF; each building gets a clone of it.
+
+Cloning copies the field lists of the model and rebuilds the EpBunch lists
+(geomeppy's makebunches), sharing the read-only IDD data with the snapshot.
+Re-reading the text instead would pay eppy's per-IDF IDD indexing
+(ref2names2commdct, a few tens of ms) for every building, however small the
+template is.
+
+For IDF creation the snapshot can also be "prepared" with the objects every
+building gets regardless of its row:
+  - SCHEDULETYPELIMITS Temperature / ControlType + ZONE CONTROL TYPE SCHEDULE
+  - DSOA_Global / DSZAD_Global (define_global_design_specs)
+  - SITE:GROUNDTEMPERATURE:BUILDINGSURFACE, when the ground temperatures are
+    deterministic (strategy != "B", or a fixed random_seed)
+
+Snapshots are keyed by (IDD, template path + mtime, picking settings), so an
+edited template file is picked up automatically.
+"""
+
+import copy
+import os
+import threading
+
+from geomeppy import IDF
+from geomeppy.patches import makebunches
+
+from idf_objects.HVAC.custom_hvac import add_hvac_schedule_type_limits
+from idf_objects.setzone.define_global_design_specs import define_global_design_specs
+from idf_objects.tempground.add_ground_temperatures import add_ground_temperatures
+
+_SNAPSHOTS = {}
+_LOCK = threading.Lock()
+
+
+class TemplateSnapshot:
+    """
+    idf : geomeppy.IDF
+        The parsed (optionally prepared) template. Never handed out itself;
+        new_idf() returns clones.
+    ground_temps : dict or None
+        Monthly ground temperatures baked into the template, or None if they
+        must still be picked per building.
+    """
+
+    def __init__(self, iddfile, idf, ground_temps=None):
+        self.iddfile = iddfile
+        self.idf = idf
+        self.ground_temps = ground_temps
+
+    @property
+    def idf_text(self):
+        return self.idf.idfstr()
+
+    def new_idf(self):
+        """Returns a fresh, independent clone of the snapshot IDF."""
+        IDF.setiddname(self.iddfile)
+        src = self.idf
+        clone = copy.copy(src)
+        model = copy.copy(src.model)
+        # field values are str/int/float, so copying each object's list is enough
+        model.dt = {key: [list(obj) for obj in objs] for key, objs in src.model.dt.items()}
+        model.dtls = list(src.model.dtls)
+        clone.model = model
+        # a bare save() must not overwrite the template file
+        clone.idfname = clone.idfabsname = None
+        clone.idfobjects = makebunches(model, src.idd_info, clone)
+        return clone
+
+
+def groundtemps_are_deterministic(strategy, random_seed):
+    """
+    assign_ground_temperatures draws from a site-level stream of random_seed,
+    so its picks only vary between buildings for strategy "B" without a seed.
+    """
+    return strategy != "B" or random_seed is not None
+
+
+def _template_key(iddfile, idf_file_path, *extra):
+    return (iddfile, os.path.abspath(idf_file_path), os.path.getmtime(idf_file_path)) + extra
+
+
+def get_base_snapshot(iddfile, idf_file_path):
+    """
+    The template exactly as on disk, parsed once per process.
+    """
+    key = _template_key(iddfile, idf_file_path, "base")
+    with _LOCK:
+        snap = _SNAPSHOTS.get(key)
+        if snap is None:
+            IDF.setiddname(iddfile)
+            snap = TemplateSnapshot(iddfile, IDF(idf_file_path))
+            _SNAPSHOTS[key] = snap
+    return snap
+
+
+def get_building_snapshot(iddfile, idf_file_path, calibration_stage="pre_calibration",
+                          strategy="A", random_seed=None):
+    """
+    The template plus all building-independent objects (see module docstring),
+    prepared once per process and picking settings.
+    """
+    deterministic = groundtemps_are_deterministic(strategy, random_seed)
+    key = _template_key(
+        iddfile, idf_file_path, "building",
+        calibration_stage, strategy, random_seed if deterministic else None
+    )
+    with _LOCK:
+        snap = _SNAPSHOTS.get(key)
+        if snap is not None:
+            return snap
+
+    idf = get_base_snapshot(iddfile, idf_file_path).new_idf()
+    add_hvac_schedule_type_limits(idf)
+    define_global_design_specs(idf)
+
+    ground_temps = None
+    if deterministic:
+        groundtemp_log = {}
+        add_ground_temperatures(
+            idf=idf,
+            calibration_stage=calibration_stage,
+            strategy=strategy,
+            random_seed=random_seed,
+            assigned_groundtemp_log=groundtemp_log
+        )
+        ground_temps = groundtemp_log["ground_temperatures"]
+
+    snap = TemplateSnapshot(iddfile, idf, ground_temps)
+    with _LOCK:
+        _SNAPSHOTS.setdefault(key, snap)
+        return _SNAPSHOTS[key]
+
+
+def clear_snapshots():
+    """Drops all cached snapshots of this process."""
+    with _LOCK:
+        _SNAPSHOTS.clear()
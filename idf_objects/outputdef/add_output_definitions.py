@@ -1,11 +1,15 @@
 # outputdef/add_output_definitions.py
 
+from idf_objects.other.idf_index import get_idf_index
+
 def add_output_definitions(idf, output_settings, assigned_output_log=None):
     """
     :param idf: EnergyPlus IDF object
     :param output_settings: dict with keys "variables", "meters", "tables", "summary_reports"
     :param assigned_output_log: optional dict for logging
     """
+    index = get_idf_index(idf)
+
     # 1) Variables
     added_vars = []
     skipped_vars = []
@@ -13,15 +17,13 @@ def add_output_definitions(idf, output_settings, assigned_output_log=None):
         var_name = var["variable_name"]
         freq = var["reporting_frequency"]
 
-        existing_vars = [
-            ov for ov in idf.idfobjects["OUTPUT:VARIABLE"]
-            if ov.Variable_Name == var_name and ov.Reporting_Frequency.upper() == freq.upper()
-        ]
+        existing_vars = index.find("OUTPUT:VARIABLE", Variable_Name=var_name, Reporting_Frequency=freq)
         if not existing_vars:
             new_var = idf.newidfobject("OUTPUT:VARIABLE")
             new_var.Key_Value = "*"
             new_var.Variable_Name = var_name
             new_var.Reporting_Frequency = freq
+            index.add(new_var)
             added_vars.append((var_name, freq))
         else:
             skipped_vars.append((var_name, freq))
@@ -32,14 +34,12 @@ def add_output_definitions(idf, output_settings, assigned_output_log=None):
     for meter in output_settings["meters"]:
         key_name = meter["key_name"]
         freq = meter["reporting_frequency"]
-        existing_meters = [
-            om for om in idf.idfobjects["OUTPUT:METER"]
-            if om.Key_Name == key_name and om.Reporting_Frequency.upper() == freq.upper()
-        ]
+        existing_meters = index.find("OUTPUT:METER", Key_Name=key_name, Reporting_Frequency=freq)
         if not existing_meters:
             new_meter = idf.newidfobject("OUTPUT:METER")
             new_meter.Key_Name = key_name
             new_meter.Reporting_Frequency = freq
+            index.add(new_meter)
             added_meters.append((key_name, freq))
         else:
             skipped_meters.append((key_name, freq))
@@ -51,12 +51,12 @@ def add_output_definitions(idf, output_settings, assigned_output_log=None):
         obj_type = tbl["object_type"]  # e.g. "OUTPUT:TABLE:MONTHLY"
         name = tbl["name"]
 
-        existing_tables = [ot for ot in idf.idfobjects[obj_type] if getattr(ot, "Name", "") == name]
-        if not existing_tables:
+        if index.get(obj_type, name) is None:
             new_tbl = idf.newidfobject(obj_type)
             new_tbl.Name = name
             for field_name, field_val in tbl["fields"].items():
                 setattr(new_tbl, field_name, field_val)
+            index.add(new_tbl)
             added_tables.append(name)
         else:
             skipped_tables.append(name)
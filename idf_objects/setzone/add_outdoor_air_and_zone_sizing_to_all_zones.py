@@ -48,7 +48,8 @@ def add_outdoor_air_and_zone_sizing_to_all_zones(
         building_function=bldg_func,
         calibration_stage=calibration_stage,
         strategy=strategy,
-        random_seed=random_seed
+        random_seed=random_seed,
+        building_id=building_row.get("ogc_fid")
     )
     # assigned => dict of { 
     #   "cooling_supply_air_temp", 
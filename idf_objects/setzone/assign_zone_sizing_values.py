@@ -1,13 +1,14 @@
 # setzone/assign_zone_sizing_values.py
 
-import random
+from rng_streams import BuildingRandom
 from .zone_sizing_lookup import zone_sizing_lookup
 
 def assign_zone_sizing_params(
     building_function: str,
     calibration_stage="pre_calibration",
     strategy="A",
-    random_seed=None
+    random_seed=None,
+    building_id=None
 ):
     """
     Returns a dict of final zone sizing parameters 
@@ -16,9 +17,9 @@ def assign_zone_sizing_params(
       - "A" => midpoint 
       - "B" => random uniform 
       - (others) => min
+    building_id: keys the random stream (rng_streams) for strategy "B".
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    stream = BuildingRandom(random_seed, building_id, "setzone")
 
     # Fallback if not found
     if calibration_stage not in zone_sizing_lookup:
@@ -28,7 +29,7 @@ def assign_zone_sizing_params(
 
     data = zone_sizing_lookup[calibration_stage][building_function]
 
-    def pick_val(rng):
+    def pick_val(rng, param_name):
         if rng[0] == rng[1]:
             return rng[0]  # fixed
         if strategy == "A":
@@ -36,16 +37,16 @@ def assign_zone_sizing_params(
             return (rng[0] + rng[1]) / 2.0
         elif strategy == "B":
             # random
-            return random.uniform(rng[0], rng[1])
+            return stream.uniform(rng[0], rng[1], param_name)
         else:
             # fallback => pick min
             return rng[0]
 
     assigned = {}
-    assigned["cooling_supply_air_temp"] = pick_val(data["cooling_supply_air_temp_range"])
-    assigned["heating_supply_air_temp"] = pick_val(data["heating_supply_air_temp_range"])
-    assigned["cooling_supply_air_hr"]   = pick_val(data["cooling_supply_air_hr_range"])
-    assigned["heating_supply_air_hr"]   = pick_val(data["heating_supply_air_hr_range"])
+    assigned["cooling_supply_air_temp"] = pick_val(data["cooling_supply_air_temp_range"], "cooling_supply_air_temp")
+    assigned["heating_supply_air_temp"] = pick_val(data["heating_supply_air_temp_range"], "heating_supply_air_temp")
+    assigned["cooling_supply_air_hr"]   = pick_val(data["cooling_supply_air_hr_range"], "cooling_supply_air_hr")
+    assigned["heating_supply_air_hr"]   = pick_val(data["heating_supply_air_hr_range"], "heating_supply_air_hr")
 
     # for design air flow method, no range => just a string
     assigned["cooling_design_air_flow_method"] = data["cooling_design_air_flow_method"]
@@ -9,6 +9,7 @@ from idf_objects.ventilation.schedules import (
     create_workhours_schedule
 )
 from idf_objects.ventilation.create_ventilation_systems import create_ventilation_system
+from rng_streams import BuildingRandom
 from idf_objects.ventilation.calc_functions import (
     calc_infiltration,
     calc_required_ventilation_flow
@@ -20,6 +21,15 @@ from idf_objects.ventilation.mappings import (
     map_usage_key
 )
 
+
+def zone_multiplier(zone_obj):
+    """The zone's EnergyPlus Multiplier (blank / invalid => 1)."""
+    try:
+        return max(int(float(zone_obj.Multiplier or 1)), 1)
+    except (TypeError, ValueError, AttributeError):
+        return 1
+
+
 def add_ventilation_to_idf(
     idf,
     building_row,
@@ -83,7 +93,7 @@ def add_ventilation_to_idf(
         user_config_vent=user_config_vent,
         assigned_vent_log=None,        # We'll do the logging here instead
         infiltration_key=infiltration_key,
-        year_key=map_age_range_to_year_key(age_range_str),
+        year_key=map_age_range_to_year_key(age_range_str, building_row.get("bouwjaar")),
         is_residential=is_res,
         default_flow_exponent=0.67
     )
@@ -133,7 +143,9 @@ def add_ventilation_to_idf(
         print("[VENT] No zones found, skipping creation of infiltration/ventilation objects.")
         return
 
-    n_zones = len(zones)
+    # Zones with a Multiplier (floor-multiplier geometry) stand for several
+    # identical zones; EnergyPlus multiplies their Flow/Zone by it
+    n_zones = sum(zone_multiplier(z) for z in zones)
     infiltration_per_zone = infiltration_m3_s_total / n_zones
     vent_per_zone = vent_flow_m3_s_total / n_zones
 
@@ -173,6 +185,7 @@ def add_ventilation_to_idf(
     )
 
     # 9) For each zone => create infiltration + ventilation objects
+    system_rng = BuildingRandom(random_seed, bldg_id, "ventilation_system")
     for zone_obj in zones:
         zone_name = zone_obj.Name
 
@@ -185,7 +198,8 @@ def add_ventilation_to_idf(
             vent_flow_m3_s=vent_per_zone,
             infiltration_sched_name=infiltration_sched,
             ventilation_sched_name=ventilation_sched,
-            pick_strategy="random" if strategy == "B" else "midpoint"
+            pick_strategy="random" if strategy == "B" else "midpoint",
+            rng=system_rng
         )
 
         print(
@@ -2,7 +2,8 @@
 
 # ventilation/assign_ventilation_params_with_overrides.py
 
-import random
+from rng_streams import BuildingRandom, draw_uniform
+from override_resolver import find_overrides
 from .ventilation_lookup import ventilation_lookup
 
 def find_vent_overrides(
@@ -21,39 +22,30 @@ def find_vent_overrides(
       - scenario
       - calibration_stage
     """
-    matches = []
-    if user_config:
-        for row in user_config:
-            # building_id match if present
-            if "building_id" in row and row["building_id"] != building_id:
-                continue
-            # building_function match if present
-            if "building_function" in row and row["building_function"] != building_function:
-                continue
-            # age_range match if present
-            if "age_range" in row and row["age_range"] != age_range:
-                continue
-            # scenario match if present
-            if "scenario" in row and row["scenario"] != scenario:
-                continue
-            # calibration_stage match if present
-            if "calibration_stage" in row and row["calibration_stage"] != calibration_stage:
-                continue
-            matches.append(row)
-    return matches
+    # compiled once per user_config list (override_resolver.py)
+    return find_overrides(
+        "vent", user_config,
+        building_id=building_id,
+        building_function=building_function,
+        age_range=age_range,
+        scenario=scenario,
+        calibration_stage=calibration_stage
+    )
 
 
 def pick_val_with_range(
     rng_tuple,
     strategy="A",
     log_dict=None,
-    param_name=None
+    param_name=None,
+    rng=None
 ):
     """
     rng_tuple = (min_val, max_val) or None.
     strategy  = "A"=>midpoint, "B"=>random, "C"=>pick min, etc.
     log_dict  => optional dictionary for storing final picks.
     param_name=> e.g. "infiltration_base", "fan_pressure", etc.
+    rng       => BuildingRandom of the building (rng_streams.py) for strategy "B".
 
     Returns the chosen numeric value.
     Also logs (param_name + param_name_range) if log_dict is provided.
@@ -67,7 +59,7 @@ def pick_val_with_range(
     if strategy == "A":
         chosen = (min_v + max_v) / 2.0
     elif strategy == "B":
-        chosen = random.uniform(min_v, max_v)
+        chosen = draw_uniform(rng, min_v, max_v, param_name)
     elif strategy == "C":
         chosen = min_v  # pick min
     else:
@@ -123,8 +115,8 @@ def assign_ventilation_params_with_overrides(
       4) Return the final assigned dictionary, which includes both final picks & range info.
       5) Optionally log them to assigned_vent_log if provided.
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Per-building random stream => reproducible regardless of order / process
+    rng = BuildingRandom(random_seed, building_id, "ventilation")
 
     # 1) Fallback checks
     if scenario not in ventilation_lookup:
@@ -256,14 +248,14 @@ def assign_ventilation_params_with_overrides(
     # 9) pick final infiltration_base, year_factor, fan_pressure, f_ctrl, hrv_eff
     #    storing into a local dictionary
     local_log = {}
-    infiltration_base_val = pick_val_with_range(infiltration_base_rng, strategy, local_log, "infiltration_base")
-    year_factor_val       = pick_val_with_range(year_factor_rng,       strategy, local_log, "year_factor")
-    fan_pressure_val      = pick_val_with_range(fan_pressure_rng,      strategy, local_log, "fan_pressure")
-    f_ctrl_val            = pick_val_with_range(f_ctrl_rng,            strategy, local_log, "f_ctrl")
+    infiltration_base_val = pick_val_with_range(infiltration_base_rng, strategy, local_log, "infiltration_base", rng)
+    year_factor_val       = pick_val_with_range(year_factor_rng,       strategy, local_log, "year_factor", rng)
+    fan_pressure_val      = pick_val_with_range(fan_pressure_rng,      strategy, local_log, "fan_pressure", rng)
+    f_ctrl_val            = pick_val_with_range(f_ctrl_rng,            strategy, local_log, "f_ctrl", rng)
 
     hrv_eff_val = 0.0
     if system_type_final == "D":
-        hrv_eff_val = pick_val_with_range(hrv_eff_rng, strategy, local_log, "hrv_eff")
+        hrv_eff_val = pick_val_with_range(hrv_eff_rng, strategy, local_log, "hrv_eff", rng)
     else:
         # store hrv_eff=0, but also store range if we like
         local_log["hrv_eff_range"] = (0.0, 0.0)
@@ -1,6 +1,6 @@
 # ventilation/create_ventilation_systems.py
 
-import random
+from rng_streams import draw_uniform, draw_choice
 from idf_objects.ventilation.config_systems import SYSTEMS_CONFIG
 
 def create_ventilation_system(
@@ -12,7 +12,8 @@ def create_ventilation_system(
     vent_flow_m3_s,
     infiltration_sched_name="AlwaysOnSched",
     ventilation_sched_name="VentSched_DayNight",
-    pick_strategy="midpoint"  # or "random"
+    pick_strategy="midpoint",  # or "random"
+    rng=None                   # BuildingRandom of the building (rng_streams)
 ):
     """
     Creates two objects for the zone:
@@ -38,17 +39,17 @@ def create_ventilation_system(
     # -------------------------------------------------------
     # 2) Helper to pick a single value from a (min, max) range
     # -------------------------------------------------------
-    def pick_val(rng):
+    def pick_val(val_range, param_name):
         """
-        rng is (min_val, max_val).
+        val_range is (min_val, max_val).
         pick_strategy == 'midpoint' => return average
-        pick_strategy == 'random'   => return random.uniform(...)
+        pick_strategy == 'random'   => return a uniform draw from rng
         """
         if pick_strategy == "random":
-            return random.uniform(rng[0], rng[1])
+            return draw_uniform(rng, val_range[0], val_range[1], f"{zone_name}.{param_name}")
         else:
             # default => midpoint
-            return (rng[0] + rng[1]) / 2.0
+            return (val_range[0] + val_range[1]) / 2.0
 
     # -------------------------------------------------------
     # 3) Create infiltration object (ZONEINFILTRATION:DESIGNFLOWRATE)
@@ -74,14 +75,14 @@ def create_ventilation_system(
     # -------------------------------------------------------
     chosen_params = {}
     range_dict = config.get("range_params", {})
-    for param_name, rng in range_dict.items():
-        chosen_val = pick_val(rng)
+    for param_name, val_range in range_dict.items():
+        chosen_val = pick_val(val_range, param_name)
         chosen_params[param_name] = chosen_val
 
     # Choose from the ventilation_type_options if present
     ventilation_type_list = config.get("ventilation_type_options", [])
     if ventilation_type_list:
-        chosen_vent_type = random.choice(ventilation_type_list)
+        chosen_vent_type = draw_choice(rng, ventilation_type_list, f"{zone_name}.ventilation_type")
     else:
         chosen_vent_type = "Natural"  # fallback if none provided
 
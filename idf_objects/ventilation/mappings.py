@@ -1,12 +1,18 @@
 # ventilation/mappings.py
 
+from override_resolver import age_range_for_year
+
+# Non-overlapping year keys of the lookups' year_factor_range, for matching
+# construction years
+YEAR_KEYS = ("<1970", "1970-1992", "1992-2005", "2005-2015", ">2015")
+
 def safe_lower(val):
     """Helper to safely lowercase a string."""
     if isinstance(val, str):
         return val.lower()
     return ""
 
-def map_age_range_to_year_key(age_range_str):
+def map_age_range_to_year_key(age_range_str, construction_year=None):
     """
     Convert your main DataFrame's age_range
     into the short keys used in your infiltration/vent lookup or NTA data.
@@ -15,6 +21,10 @@ def map_age_range_to_year_key(age_range_str):
       - "1900-2000" => "1900-2000"
       - "2000-2024" => "2000-2024"
       - plus older ones like "<1970", "1970-1992", etc.
+
+    An age_range not in the mapping is matched by construction_year (e.g.
+    building_row["bouwjaar"]) to the key whose interval contains it, as for
+    HVAC (override_resolver.age_range_for_year); else ">2015".
     """
     # You can expand as needed.
     mapping = {
@@ -26,7 +36,13 @@ def map_age_range_to_year_key(age_range_str):
         "1900-2000": "1900-2000",
         "2000-2024": "2000-2024"
     }
-    return mapping.get(age_range_str, ">2015")  # fallback => >2015
+    if age_range_str in mapping:
+        return mapping[age_range_str]
+    if construction_year is not None:
+        year_key = age_range_for_year(construction_year, YEAR_KEYS)
+        if year_key is not None:
+            return year_key
+    return ">2015"  # fallback => >2015
 
 def map_infiltration_key(building_row):
     """
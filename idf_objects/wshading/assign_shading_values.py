@@ -6,14 +6,15 @@ this module picks the final shading parameters from shading_lookup.py
 and optionally user overrides or Excel-based rules.
 """
 
-import random
+from rng_streams import draw_uniform
 from .shading_lookup import shading_lookup
 
-def pick_val_from_range(rng_tuple, strategy="A"):
+def pick_val_from_range(rng_tuple, strategy="A", rng=None, param_name=""):
     """
     Helper function to pick a numeric value from (min_val, max_val).
     - If strategy="A", picks the midpoint.
-    - If strategy="B", picks a random value in [min_val, max_val].
+    - If strategy="B", picks a random value in [min_val, max_val]
+      (from the optional BuildingRandom stream `rng`).
     - Otherwise, picks min_val.
     """
     if not rng_tuple or len(rng_tuple) < 2:
@@ -26,7 +27,7 @@ def pick_val_from_range(rng_tuple, strategy="A"):
     if strategy == "A":
         return 0.5 * (min_val + max_val)
     elif strategy == "B":
-        return random.uniform(min_val, max_val)
+        return draw_uniform(rng, min_val, max_val, param_name)
     else:
         return min_val
 
@@ -35,7 +36,8 @@ def pick_shading_params(
     shading_type_key="my_external_louvers",
     strategy="A",
     user_config=None,
-    assigned_shading_log=None
+    assigned_shading_log=None,
+    rng=None
 ):
     """
     1) Looks up default shading parameters from shading_lookup[shading_type_key].
@@ -57,6 +59,8 @@ def pick_shading_params(
         to override certain ranges for all windows or certain IDs.
     assigned_shading_log : dict or None
         If provided, store final picks under assigned_shading_log[window_id].
+    rng : BuildingRandom or None
+        Random stream of the building (rng_streams); None => global random.
 
     Returns
     -------
@@ -101,7 +105,8 @@ def pick_shading_params(
             # e.g. "slat_width_range"
             # strip off "_range" => "slat_width"
             param_name = field_key[:-6]  # everything except "_range"
-            chosen_val = pick_val_from_range(field_val, strategy=strategy)
+            chosen_val = pick_val_from_range(field_val, strategy=strategy, rng=rng,
+                                             param_name=f"{window_id}.{param_name}")
             final_params[param_name] = chosen_val
             fields_to_remove.append(field_key)
 
@@ -0,0 +1,208 @@
+"""
+idf_patching.py
+
+Per-module patching of generated IDFs for incremental re-runs.
+
+create_idf_for_building applies its modules in a fixed order (IDF_MODULES).
+While it builds, a ModuleTracker records which objects each module added, and
+the list is saved next to the model (building_<idx>.idf.modules.json).
+
+When only the inputs of some modules change (e.g. lighting.json or
+hvac.json was edited), change_detection.BuildingFingerprints reports them per
+building, and the existing IDF is patched instead of rebuilt:
+  1) the IDF is loaded (modification.common_utils.load_idf),
+  2) the objects the affected modules created are removed,
+  3) only those modules are applied again (same builders, same picks),
+  4) the IDF is saved and the manifest updated.
+
+A module's dependents are re-applied with it (MODULE_DEPENDS). Geometry has
+every other module as dependent, so a geometry change is a full rebuild.
+A module that edits objects another module created depends on that module:
+ventilation (system D) sets heat recovery / outdoor air fields on the HVAC
+module's ZONEHVAC:IDEALLOADSAIRSYSTEM objects, so an HVAC change re-applies
+ventilation too. fenez sets the constructions of the geometry surfaces, and
+re-sets all of them whenever it runs.
+
+Modules that replace their objects wholesale themselves (materials /
+constructions in update_construction_materials, windows in add_fenestration,
+ground temperatures) are safe to re-apply even for objects that are not in
+the manifest, e.g. the ground temperatures of the template.
+
+Usage:
+    tracker = ModuleTracker(idf)
+    with tracker.module("lighting"):
+        add_lights_and_parasitics(idf, ...)
+    tracker.save(manifest_path(out_path))
+"""
+
+import os
+import json
+from contextlib import contextmanager
+
+# Modules of create_idf_for_building, in the order they are applied
+IDF_MODULES = [
+    "geometry", "fenez", "lighting", "dhw", "hvac", "vent", "setzone", "groundtemp", "outputdef"
+]
+
+# module => modules whose objects it builds on
+MODULE_DEPENDS = {
+    "geometry": [],
+    "fenez": ["geometry"],
+    "lighting": ["geometry"],
+    "dhw": ["geometry"],
+    "hvac": ["geometry"],
+    "vent": ["geometry", "hvac"],  # edits the hvac IdealLoads (system D)
+    "setzone": ["geometry"],
+    "groundtemp": [],
+    "outputdef": []
+}
+
+# module => sources that define it (change_detection.code_version)
+MODULE_CODE_PATHS = {
+    "geometry": ["idf_objects/geomz"],
+    "fenez": ["idf_objects/fenez", "Lookups"],
+    "lighting": ["idf_objects/Elec"],
+    "dhw": ["idf_objects/DHW"],
+    "hvac": ["idf_objects/HVAC"],
+    "vent": ["idf_objects/ventilation"],
+    "setzone": ["idf_objects/setzone"],
+    "groundtemp": ["idf_objects/tempground"],
+    "outputdef": ["idf_objects/outputdef"]
+}
+
+# Sources every module depends on
+CORE_CODE_PATHS = ["idf_creation.py", "idf_patching.py", "rng_streams.py", "override_resolver.py", "idf_objects/other"]
+
+# module => assigned_*_log kwarg of create_idf_for_building
+MODULE_LOGS = {
+    "geometry": "assigned_geom_log",
+    "fenez": "assigned_fenez_log",
+    "lighting": "assigned_lighting_log",
+    "dhw": "assigned_dhw_log",
+    "hvac": "assigned_hvac_log",
+    "vent": "assigned_vent_log",
+    "setzone": "assigned_setzone_log",
+    "groundtemp": "assigned_groundtemp_log"
+}
+
+
+def affected_modules(changed):
+    """
+    The modules to re-apply when the inputs of changed modules changed:
+    the changed ones plus everything that depends on them, in build order.
+    """
+    affected = set(changed)
+    grew = True
+    while grew:
+        grew = False
+        for module, depends in MODULE_DEPENDS.items():
+            if module not in affected and affected.intersection(depends):
+                affected.add(module)
+                grew = True
+    return [m for m in IDF_MODULES if m in affected]
+
+
+def manifest_path(model_path):
+    """Where the module manifest of a model is stored."""
+    return model_path + ".modules.json"
+
+
+def load_manifest(model_path):
+    """{module: [[OBJECT_TYPE, [normalised field values]], ...]}, or None if missing / unreadable."""
+    path = manifest_path(model_path)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["modules"]
+    except Exception:
+        return None
+
+
+def _norm(value):
+    """Field value as compared between the in-memory IDF and the one re-read from disk."""
+    try:
+        return repr(round(float(value), 6))
+    except (TypeError, ValueError):
+        return str(value).strip().upper()
+
+
+def object_key(obj):
+    values = [_norm(v) for v in obj.fieldvalues[1:]]
+    while values and values[-1] == "":
+        values.pop()
+    return [obj.key.upper(), values]
+
+
+def _all_objects(idf):
+    for objs in idf.idfobjects.values():
+        for obj in objs:
+            yield obj
+
+
+def remove_module_objects(idf, manifest, modules):
+    """
+    Removes the objects the given modules created (per the manifest).
+    Returns the number of objects removed.
+    """
+    removed = 0
+    for module in modules:
+        wanted = {}
+        for obj_type, values in manifest.get(module, []):
+            wanted.setdefault(obj_type, []).append(values)
+        for obj_type, value_lists in wanted.items():
+            for obj in list(idf.idfobjects[obj_type]):
+                values = object_key(obj)[1]
+                if values in value_lists:
+                    value_lists.remove(values)
+                    idf.removeidfobject(obj)
+                    removed += 1
+    return removed
+
+
+class ModuleTracker:
+    """
+    Records which objects each module adds to an IDF. Geometry is not
+    tracked (it is never patched, only rebuilt).
+
+    idf : eppy / geomeppy IDF
+    manifest : dict or None
+        Manifest of the model being patched; the modules applied again
+        replace their entries.
+    run_modules : list or None
+        Modules to apply (None => all, i.e. a full build).
+    """
+
+    def __init__(self, idf, manifest=None, run_modules=None):
+        self.idf = idf
+        self.run_modules = run_modules
+        self._owned = {}  # module => [objects]
+        self._previous = dict(manifest or {})
+
+    def should_run(self, module):
+        return self.run_modules is None or module in self.run_modules
+
+    @contextmanager
+    def module(self, name):
+        existing = list(_all_objects(self.idf))  # (kept alive, so their ids are not reused)
+        before = {id(obj) for obj in existing}
+        yield
+        self._owned.setdefault(name, []).extend(
+            obj for obj in _all_objects(self.idf) if id(obj) not in before
+        )
+
+    def manifest(self):
+        """Manifest of the model in its current (final) state."""
+        result = dict(self._previous)
+        present = {id(obj) for obj in _all_objects(self.idf)}
+        for name, objs in self._owned.items():
+            result[name] = [object_key(obj) for obj in objs if id(obj) in present]
+        return result
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"modules": self.manifest()}, f)
+        return path
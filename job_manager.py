@@ -0,0 +1,239 @@
+"""
+job_manager.py
+
+Background job queue for the FastAPI service in main.py.
+
+A POST /run_workflow no longer blocks the HTTP worker for the whole run.
+Instead, the workflow is submitted to a bounded background executor and the
+caller immediately receives a job_id. The job table is persisted to a JSON
+file so that GET /jobs/{job_id} keeps working across restarts.
+
+Job record layout:
+    {
+      "job_id": "3f2a...",
+      "status": "queued" | "running" | "done" | "failed",
+      "submitted_at": "2025-01-01T10:00:00",
+      "started_at": "...",
+      "finished_at": "...",
+      "current_stage": "idf_creation",
+      "stages": {
+          "idf_creation": {"status": "done", "started_at": "...", "finished_at": "..."},
+          "structuring":  {"status": "skipped", ...},
+          ...
+      },
+      "result": {...},   # return value of the workflow function
+      "error": None      # error message if status == "failed"
+    }
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+import traceback
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED  = "queued"
+JOB_RUNNING = "running"
+JOB_DONE    = "done"
+JOB_FAILED  = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when the number of queued + running jobs reached the configured limit."""
+    pass
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class JobStore:
+    """
+    A small JSON-file backed job table. All access is guarded by a lock so
+    that the executor threads and the HTTP threads can update it safely.
+    """
+
+    def __init__(self, store_path="output/jobs/jobs.json"):
+        self.store_path = store_path
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.isfile(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r") as f:
+                self._jobs = json.load(f)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"[JobStore] Could not read {self.store_path}: {e}")
+            self._jobs = {}
+
+        # Jobs that were queued or running when the previous process died
+        # can never finish => mark them as failed.
+        for job in self._jobs.values():
+            if job.get("status") in (JOB_QUEUED, JOB_RUNNING):
+                job["status"] = JOB_FAILED
+                job["finished_at"] = _now()
+                job["error"] = "Interrupted: service restarted before the job finished."
+        self._save()
+
+    def _save(self):
+        folder = os.path.dirname(self.store_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.store_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._jobs, f, indent=2, default=str)
+        os.replace(tmp_path, self.store_path)
+
+    def create(self, job_id):
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": JOB_QUEUED,
+                "submitted_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "current_stage": None,
+                "stages": {},
+                "result": None,
+                "error": None
+            }
+            self._save()
+            return dict(self._jobs[job_id])
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            self._jobs[job_id].update(fields)
+            self._save()
+
+    def update_stage(self, job_id, stage_name, stage_status):
+        """
+        stage_status => "running", "done", "skipped" or "failed".
+        Records started_at when a stage starts running and finished_at otherwise.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            stage = job["stages"].setdefault(stage_name, {
+                "status": None,
+                "started_at": None,
+                "finished_at": None
+            })
+            stage["status"] = stage_status
+            if stage_status == JOB_RUNNING:
+                stage["started_at"] = _now()
+                job["current_stage"] = stage_name
+            else:
+                if stage["started_at"] is None:
+                    stage["started_at"] = _now()
+                stage["finished_at"] = _now()
+            self._save()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job, default=str)) if job else None
+
+    def list(self):
+        with self._lock:
+            return [
+                {
+                    "job_id": j["job_id"],
+                    "status": j["status"],
+                    "submitted_at": j["submitted_at"],
+                    "current_stage": j["current_stage"]
+                }
+                for j in self._jobs.values()
+            ]
+
+
+class JobManager:
+    """
+    Runs workflow jobs on a bounded ThreadPoolExecutor.
+
+    max_workers : int
+        How many workflows run at the same time. Keep this at 1 unless the
+        workflow is safe to run concurrently within one process.
+    max_queued : int
+        How many jobs may wait in the queue on top of the running ones.
+        submit() raises JobQueueFullError beyond that.
+    """
+
+    def __init__(self, store_path="output/jobs/jobs.json", max_workers=1, max_queued=10):
+        self.store = JobStore(store_path)
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow_job")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+
+    def submit(self, func, **kwargs):
+        """
+        Queue func(**kwargs, progress_callback=...) and return the new job_id.
+        func should return a dict; {"status": "error", ...} marks the job failed.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFullError(
+                f"Job queue is full ({self.max_workers} running + {self.max_queued} queued)."
+            )
+
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id)
+        try:
+            self._executor.submit(self._run_job, job_id, func, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        logging.getLogger(__name__).info(f"[JobManager] Queued job {job_id}")
+        return job_id
+
+    def _run_job(self, job_id, func, kwargs):
+        logger = logging.getLogger(__name__)
+
+        def progress_callback(stage_name, stage_status):
+            self.store.update_stage(job_id, stage_name, stage_status)
+
+        self.store.update(job_id, status=JOB_RUNNING, started_at=_now())
+        try:
+            result = func(progress_callback=progress_callback, **kwargs)
+            if isinstance(result, dict) and result.get("status") == "error":
+                self.store.update(
+                    job_id,
+                    status=JOB_FAILED,
+                    finished_at=_now(),
+                    result=result,
+                    error=result.get("detail")
+                )
+            else:
+                self.store.update(job_id, status=JOB_DONE, finished_at=_now(), result=result)
+            logger.info(f"[JobManager] Job {job_id} finished.")
+        except Exception as e:
+            logger.error(f"[JobManager] Job {job_id} failed: {e}", exc_info=True)
+            job = self.store.get(job_id) or {}
+            stage = job.get("current_stage")
+            if stage and job["stages"].get(stage, {}).get("status") == JOB_RUNNING:
+                self.store.update_stage(job_id, stage, JOB_FAILED)
+            self.store.update(
+                job_id,
+                status=JOB_FAILED,
+                finished_at=_now(),
+                error=f"{e}\n{traceback.format_exc()}"
+            )
+        finally:
+            self._slots.release()
+
+    def get_job(self, job_id):
+        return self.store.get(job_id)
+
+    def list_jobs(self):
+        return self.store.list()
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
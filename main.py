@@ -6,18 +6,30 @@ that was previously done by the command-line main() function.
 
 Endpoints:
   - GET /health => returns a simple JSON for health check
-  - POST /run_workflow => triggers the entire orchestration process
+  - POST /run_workflow => queues the entire orchestration process, returns a job_id
+  - GET /jobs => lists all known jobs
+  - GET /jobs/{job_id} => status + per-stage progress of a single job
+  - GET /metrics => Prometheus-style timing / throughput metrics
 """
 
 import os
 import json
+import uuid
 import logging
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Optional
 
 import pandas as pd
-from fastapi import FastAPI, Body
+from fastapi import FastAPI, Body, HTTPException
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
+from job_manager import JobManager, JobQueueFullError
+from stage_cache import StageCache
+from metrics import METRICS, track, write_run_report
+from run_context import RunContext, DEFAULT_OUTPUT_ROOT
+
 # --------------------------------------------------------------------------
 # A) Overriding modules (Excel + JSON partial overrides)
 # --------------------------------------------------------------------------
@@ -31,36 +43,16 @@ from excel_overrides import (
 from idf_objects.fenez.fenez_config_manager import build_fenez_config
 
 # --------------------------------------------------------------------------
-# B) IDF creation & scenario modules
-# --------------------------------------------------------------------------
-import idf_creation
-from idf_creation import create_idfs_for_all_buildings
-from main_modifi import run_modification_workflow
-
-# --------------------------------------------------------------------------
-# C) Validation
+# B) Heavy stage modules are imported lazily, inside the stage that uses them:
+#    - idf_creation (geomeppy + Lookups materials dicts)   => F) IDF creation
+#    - main_modifi (eppy + modification/* + matplotlib)    => H) modification
+#    - validation.main_validation (matplotlib)             => I) validation
+#    - cal.unified_sensitivity (SALib)                     => J) sensitivity
+#    - cal.unified_surrogate (scikit-learn)                => K) surrogate
+#    - cal.unified_calibration (scikit-optimize)           => L) calibration
+#    - database_handler (sqlalchemy)                       => use_database=true
+#    Run benchmark_startup.py to see the import cost of each of them.
 # --------------------------------------------------------------------------
-from validation.main_validation import run_validation_process
-
-# --------------------------------------------------------------------------
-# D) Calibration, Sensitivity, Surrogate modules
-# --------------------------------------------------------------------------
-from cal.unified_sensitivity import run_sensitivity_analysis
-from cal.unified_surrogate import (
-    load_scenario_params as sur_load_scenario_params,
-    pivot_scenario_params,
-    filter_top_parameters,
-    load_sim_results,
-    aggregate_results,
-    merge_params_with_results,
-    build_and_save_surrogate
-)
-from cal.unified_calibration import run_unified_calibration
-
-# --------------------------------------------------------------------------
-# DB loader (if "use_database": true in main_config)
-# --------------------------------------------------------------------------
-from database_handler import load_buildings_from_db
 
 
 ###############################################################################
@@ -88,13 +80,36 @@ def load_json(filepath):
 ###############################################################################
 # 3) Orchestration function (previously 'main')
 ###############################################################################
-def orchestrate_workflow():
+def orchestrate_workflow(progress_callback=None, run_context=None,
+                         building_filter=None, config_overrides=None, run_id=None):
     """
     This function encapsulates the entire workflow that was previously run
     in the old 'main()' function. Now it can be invoked by a FastAPI endpoint.
+
+    progress_callback : callable or None
+        Optional callback(stage_name, stage_status) used by the job queue to
+        record per-stage progress. stage_status is "running", "done", "skipped" or "cached".
+    run_context : RunContext or None
+        IDD / base IDF / output folders + per-run caches of this run. If None,
+        a new one is built from the defaults and the IDD_PATH, BASE_IDF_PATH
+        and OUTPUT_DIR environment variables.
+    building_filter : callable or None
+        df_buildings => df_buildings subset to create / simulate
+        (e.g. one shard of the portfolio, see shard_batch.py).
+    config_overrides : dict or None
+        {section: {key: value}} applied on top of the sections of main_config.json.
+    run_id : str or None
+        Id of the run when run_context is None; with runs.isolate_outputs
+        its outputs go to <runs.root>/<run_id> (see build_run_context).
     """
     logger = setup_logging()
     logger.info("=== Starting orchestrate_workflow ===")
+    run_started_at = datetime.now()
+    metrics_before = METRICS.snapshot()
+
+    def report_stage(stage_name, stage_status):
+        if progress_callback is not None:
+            progress_callback(stage_name, stage_status)
 
     # --------------------------------------------------------------------------
     # A) Load main_config.json
@@ -109,22 +124,19 @@ def orchestrate_workflow():
         return {"status": "error", "detail": msg}
 
     main_config = load_json(main_config_path)
+    for section, values in (config_overrides or {}).items():
+        main_config[section] = dict(main_config.get(section) or {}, **values)
 
     # --------------------------------------------------------------------------
-    # B) Override idf_creation config with environment variables (if present)
+    # B) Run context: IDD / base IDF / output folders of this run,
+    #    overridden with environment variables (if present)
     # --------------------------------------------------------------------------
-    env_idd_path = os.environ.get("IDD_PATH")
-    if env_idd_path:
-        idf_creation.idf_config["iddfile"] = env_idd_path
+    if run_context is None:
+        run_context = build_run_context(main_config, run_id=run_id)
+    logger.info(f"[INFO] Run context => {run_context.as_dict()}")
 
-    env_base_idf = os.environ.get("BASE_IDF_PATH")
-    if env_base_idf:
-        idf_creation.idf_config["idf_file_path"] = env_base_idf
-
-    env_out_dir = os.environ.get("OUTPUT_DIR")
-    if env_out_dir:
-        out_idf_dir = os.path.join(env_out_dir, "output_IDFs")
-        idf_creation.idf_config["output_dir"] = out_idf_dir
+    # Stage paths this run writes (and reads back) => into its output root
+    main_config = route_stage_paths(main_config, run_context)
 
     # --------------------------------------------------------------------------
     # Extract top-level sections
@@ -312,186 +324,556 @@ def orchestrate_workflow():
             except Exception as e:
                 logger.error(f"[ERROR] loading shading.json => {e}")
 
+    # --------------------------------------------------------------------------
+    # Stage cache: skip stages whose inputs did not change since the last run
+    # --------------------------------------------------------------------------
+    cache_cfg = main_config.get("stage_cache", {})
+    stage_cache = StageCache(
+        cache_path=run_context.rebase(cache_cfg.get("cache_file", "output/stage_cache.json")),
+        enabled=cache_cfg.get("enabled", False),
+        force_stages=cache_cfg.get("force_stages", [])
+    )
+
+    def stage_is_cached(stage_name, stage_key):
+        if stage_cache.is_fresh(stage_name, stage_key):
+            logger.info(f"[CACHE] Inputs of '{stage_name}' unchanged => reusing recorded outputs.")
+            report_stage(stage_name, "cached")
+            return True
+        return False
+
+    @contextmanager
+    def run_stage(stage_name, items=None):
+        report_stage(stage_name, "running")
+        with track(f"stage.{stage_name}", items=items):
+            yield
+        report_stage(stage_name, "done")
+
     # --------------------------------------------------------------------------
     # F) IDF Creation (if enabled)
     # --------------------------------------------------------------------------
     if idf_cfg.get("perform_idf_creation", False):
         logger.info("[INFO] IDF creation is ENABLED.")
-
-        use_database = main_config.get("use_database", False)
-        db_filter = main_config.get("db_filter", {})
-
-        if use_database:
-            logger.info("[INFO] Loading building data from PostgreSQL using filter criteria.")
-            df_buildings = load_buildings_from_db(db_filter)
-            if df_buildings.empty:
-                logger.warning("[WARN] No buildings returned from the DB based on filters; using empty DataFrame.")
-        else:
-            bldg_data_path = paths_dict.get("building_data", "")
-            if os.path.isfile(bldg_data_path):
-                df_buildings = pd.read_csv(bldg_data_path)
-            else:
-                logger.warning(f"[WARN] Building data CSV not found at {bldg_data_path}. Using empty DF.")
-                df_buildings = pd.DataFrame()
-
-        create_idfs_for_all_buildings(
-            df_buildings=df_buildings,
-            scenario=idf_cfg.get("scenario", "scenario1"),
-            calibration_stage=idf_cfg.get("calibration_stage", "pre_calibration"),
-            strategy=idf_cfg.get("strategy", "B"),
-            random_seed=idf_cfg.get("random_seed", 42),
-            user_config_geom=geom_data.get("geometry", []) if override_geometry_json else None,
-            user_config_lighting=user_config_lighting,
-            user_config_dhw=user_config_dhw,
-            res_data=updated_res_data,
-            nonres_data=updated_nonres_data,
-            user_config_hvac=user_config_hvac,
-            user_config_vent=user_config_vent,
-            user_config_epw=user_config_epw,
-            run_simulations=idf_cfg.get("run_simulations", True),
-            simulate_config={"num_workers": idf_cfg.get("num_workers", 4)},
-            post_process=idf_cfg.get("post_process", True)
+        from idf_creation import create_idfs_for_all_buildings
+
+        df_buildings = _load_building_data(main_config, paths_dict, logger)
+        if building_filter is not None:
+            df_buildings = building_filter(df_buildings)
+
+        idf_key = stage_cache.stage_key(
+            "idf_creation",
+            config={
+                "sections": {k: main_config.get(k) for k in IDF_CREATION_CONFIG_SECTIONS},
+                "run_context": {k: v for k, v in run_context.as_dict().items() if k != "run_id"}
+            },
+            input_paths=_user_config_json_files(user_configs_folder)
+                        + list(paths_dict.values())
+                        + [run_context.idf_file_path],
+            extra=pd.util.hash_pandas_object(df_buildings, index=True).values.tobytes()
         )
+        if not stage_is_cached("idf_creation", idf_key):
+            with run_stage("idf_creation", items=len(df_buildings)):
+                create_idfs_for_all_buildings(
+                    df_buildings=df_buildings,
+                    scenario=idf_cfg.get("scenario", "scenario1"),
+                    calibration_stage=idf_cfg.get("calibration_stage", "pre_calibration"),
+                    strategy=idf_cfg.get("strategy", "B"),
+                    random_seed=idf_cfg.get("random_seed", 42),
+                    user_config_geom=geom_data.get("geometry", []) if override_geometry_json else None,
+                    user_config_lighting=user_config_lighting,
+                    user_config_dhw=user_config_dhw,
+                    res_data=updated_res_data,
+                    nonres_data=updated_nonres_data,
+                    user_config_hvac=user_config_hvac,
+                    user_config_vent=user_config_vent,
+                    user_config_epw=user_config_epw,
+                    run_simulations=idf_cfg.get("run_simulations", True),
+                    simulate_config={"num_workers": idf_cfg.get("num_workers", 4)},
+                    post_process=idf_cfg.get("post_process", True),
+                    run_context=run_context,
+                    idf_workers=idf_cfg.get("idf_workers", 1),
+                    idf_chunk_size=idf_cfg.get("idf_chunk_size"),
+                    archetype_config=idf_cfg.get("archetypes"),
+                    pipeline_config=idf_cfg.get("pipeline"),
+                    param_log_config=idf_cfg.get("param_log"),
+                    journal_config=idf_cfg.get("journal"),
+                    resume=idf_cfg.get("resume", False),
+                    incremental_config=dict(
+                        idf_cfg.get("incremental") or {},
+                        extra_input_paths=[p for k, p in paths_dict.items() if k != "building_data"]
+                                          + [run_context.idf_file_path, run_context.iddfile]
+                    ),
+                    presample_config=idf_cfg.get("presample"),
+                    lint_config=idf_cfg.get("lint"),
+                    geometry_config=idf_cfg.get("geometry"),
+                    fenestration_config=idf_cfg.get("fenestration")
+                )
+                idf_outputs = [run_context.idf_output_dir, run_context.path("param_log")]
+                if idf_cfg.get("post_process", True):
+                    idf_outputs += [os.path.join(run_context.assigned_dir, f) for f in ASSIGNED_LOG_FILES]
+                    idf_outputs.append(os.path.join(run_context.results_dir, "merged_as_is.csv"))
+                stage_cache.record("idf_creation", idf_key, idf_outputs)
     else:
         logger.info("[INFO] Skipping IDF creation per user config.")
+        report_stage("idf_creation", "skipped")
 
     # --------------------------------------------------------------------------
     # G) Structuring Step
     # --------------------------------------------------------------------------
     if structuring_cfg.get("perform_structuring", False):
-        logger.info("[INFO] Performing log structuring (fenestration, dhw, hvac, vent).")
-
-        from idf_objects.structuring.fenestration_structuring import transform_fenez_log_to_structured_with_ranges
-        fenez_conf = structuring_cfg.get("fenestration", {})
-        fenez_in   = fenez_conf.get("csv_in",  "output/assigned/assigned_fenez_params.csv")
-        fenez_out  = fenez_conf.get("csv_out", "output/assigned/structured_fenez_params.csv")
-        transform_fenez_log_to_structured_with_ranges(csv_input=fenez_in, csv_output=fenez_out)
-
-        from idf_objects.structuring.dhw_structuring import transform_dhw_log_to_structured
-        dhw_conf = structuring_cfg.get("dhw", {})
-        dhw_in   = dhw_conf.get("csv_in",  "output/assigned/assigned_dhw_params.csv")
-        dhw_out  = dhw_conf.get("csv_out", "output/assigned/structured_dhw_params.csv")
-        transform_dhw_log_to_structured(csv_input=dhw_in, csv_output=dhw_out)
-
-        from idf_objects.structuring.flatten_hvac import flatten_hvac_data, parse_assigned_value
-        hvac_conf = structuring_cfg.get("hvac", {})
-        hvac_in   = hvac_conf.get("csv_in",    "output/assigned/assigned_hvac_params.csv")
-        hvac_bld  = hvac_conf.get("build_out", "output/assigned/assigned_hvac_building.csv")
-        hvac_zone = hvac_conf.get("zone_out",  "output/assigned/assigned_hvac_zones.csv")
-
-        if os.path.isfile(hvac_in):
-            df_hvac = pd.read_csv(hvac_in)
-            df_hvac["assigned_value"] = df_hvac["assigned_value"].apply(parse_assigned_value)
-            flatten_hvac_data(df_input=df_hvac, out_build_csv=hvac_bld, out_zone_csv=hvac_zone)
-        else:
-            logger.warning(f"[WARN] HVAC input CSV not found at {hvac_in}; skipping.")
-
-        from idf_objects.structuring.flatten_assigned_vent import flatten_ventilation_data, parse_assigned_value
-        vent_conf = structuring_cfg.get("vent", {})
-        vent_in   = vent_conf.get("csv_in",    "output/assigned/assigned_ventilation.csv")
-        vent_bld  = vent_conf.get("build_out", "output/assigned/assigned_vent_building.csv")
-        vent_zone = vent_conf.get("zone_out",  "output/assigned/assigned_vent_zones.csv")
-
-        if os.path.isfile(vent_in):
-            df_vent = pd.read_csv(vent_in)
-            df_vent["assigned_value"] = df_vent["assigned_value"].apply(parse_assigned_value)
-            flatten_ventilation_data(df_input=df_vent, out_build_csv=vent_bld, out_zone_csv=vent_zone)
-        else:
-            logger.warning(f"[WARN] Vent input CSV not found at {vent_in}; skipping.")
+        struct_inputs, struct_outputs = _structuring_paths(structuring_cfg)
+        struct_key = stage_cache.stage_key("structuring", config=structuring_cfg, input_paths=struct_inputs)
+        if not stage_is_cached("structuring", struct_key):
+            with run_stage("structuring"):
+                _run_structuring(structuring_cfg, logger)
+                stage_cache.record("structuring", struct_key, struct_outputs)
     else:
         logger.info("[INFO] Skipping structuring step (perform_structuring=false).")
+        report_stage("structuring", "skipped")
 
     # --------------------------------------------------------------------------
     # H) Scenario Modification / Generation
     # --------------------------------------------------------------------------
     if modification_cfg.get("perform_modification", False):
         logger.info("[INFO] Scenario modification is ENABLED.")
-        run_modification_workflow(modification_cfg["modify_config"])
+        modify_config = modification_cfg["modify_config"]
+        mod_inputs, mod_outputs = _modification_paths(modify_config)
+        mod_key = stage_cache.stage_key("modification", config=modify_config, input_paths=mod_inputs)
+        if not stage_is_cached("modification", mod_key):
+            with run_stage("modification"):
+                from main_modifi import run_modification_workflow
+                run_modification_workflow(modify_config)
+                stage_cache.record("modification", mod_key, mod_outputs)
     else:
         logger.info("[INFO] Skipping scenario modification.")
+        report_stage("modification", "skipped")
 
     # --------------------------------------------------------------------------
     # I) Global Validation
     # --------------------------------------------------------------------------
     if validation_cfg.get("perform_validation", False):
         logger.info("[INFO] Global Validation is ENABLED.")
-        run_validation_process(validation_cfg["config"])
+        val_config = validation_cfg["config"]
+        val_key = stage_cache.stage_key(
+            "validation",
+            config=val_config,
+            input_paths=[val_config.get("real_data_csv"), val_config.get("sim_data_csv")]
+        )
+        if not stage_is_cached("validation", val_key):
+            with run_stage("validation"):
+                from validation.main_validation import run_validation_process
+                run_validation_process(val_config)
+                stage_cache.record("validation", val_key, [val_config.get("output_csv")])
     else:
         logger.info("[INFO] Skipping global validation.")
+        report_stage("validation", "skipped")
 
     # --------------------------------------------------------------------------
     # J) Sensitivity Analysis
     # --------------------------------------------------------------------------
     if sens_cfg.get("perform_sensitivity", False):
         logger.info("[INFO] Sensitivity Analysis is ENABLED.")
-        run_sensitivity_analysis(
-            scenario_folder=sens_cfg["scenario_folder"],
-            method=sens_cfg["method"],
-            results_csv=sens_cfg.get("results_csv", ""),
-            target_variable=sens_cfg.get("target_variable", ""),
-            output_csv=sens_cfg.get("output_csv", "sensitivity_output.csv"),
-            n_morris_trajectories=sens_cfg.get("n_morris_trajectories", 10),
-            num_levels=sens_cfg.get("num_levels", 4),
-            n_sobol_samples=sens_cfg.get("n_sobol_samples", 128)
+        sens_key = stage_cache.stage_key(
+            "sensitivity",
+            config=sens_cfg,
+            input_paths=[sens_cfg["scenario_folder"], sens_cfg.get("results_csv")]
         )
+        if not stage_is_cached("sensitivity", sens_key):
+            with run_stage("sensitivity"):
+                from cal.unified_sensitivity import run_sensitivity_analysis
+                run_sensitivity_analysis(
+                    scenario_folder=sens_cfg["scenario_folder"],
+                    method=sens_cfg["method"],
+                    results_csv=sens_cfg.get("results_csv", ""),
+                    target_variable=sens_cfg.get("target_variable", ""),
+                    output_csv=sens_cfg.get("output_csv", "sensitivity_output.csv"),
+                    n_morris_trajectories=sens_cfg.get("n_morris_trajectories", 10),
+                    num_levels=sens_cfg.get("num_levels", 4),
+                    n_sobol_samples=sens_cfg.get("n_sobol_samples", 128)
+                )
+                stage_cache.record("sensitivity", sens_key, [sens_cfg.get("output_csv", "sensitivity_output.csv")])
     else:
         logger.info("[INFO] Skipping sensitivity analysis.")
+        report_stage("sensitivity", "skipped")
 
     # --------------------------------------------------------------------------
     # K) Surrogate Modeling
     # --------------------------------------------------------------------------
     if sur_cfg.get("perform_surrogate", False):
         logger.info("[INFO] Surrogate Modeling is ENABLED.")
-
-        scenario_folder = sur_cfg["scenario_folder"]
-        results_csv     = sur_cfg["results_csv"]
-        target_var      = sur_cfg["target_variable"]
-        model_out       = sur_cfg["model_out"]
-        cols_out        = sur_cfg["cols_out"]
-        test_size       = sur_cfg["test_size"]
-
-        # 1) Load & pivot scenario params
-        df_scen = sur_load_scenario_params(scenario_folder)
-        pivot_df = pivot_scenario_params(df_scen)
-
-        # 2) Optionally filter top parameters
-        # pivot_df = filter_top_parameters(pivot_df, "morris_sensitivity.csv", top_n=5)
-
-        # 3) Load & aggregate sim results
-        df_sim = load_sim_results(results_csv)
-        df_agg = aggregate_results(df_sim)
-
-        # 4) Merge
-        merged_df = merge_params_with_results(pivot_df, df_agg, target_var)
-
-        # 5) Build & save surrogate
-        rf_model, trained_cols = build_and_save_surrogate(
-            df_data=merged_df,
-            target_col=target_var,
-            model_out_path=model_out,
-            columns_out_path=cols_out,
-            test_size=test_size,
-            random_state=42
+        sur_key = stage_cache.stage_key(
+            "surrogate",
+            config=sur_cfg,
+            input_paths=[sur_cfg["scenario_folder"], sur_cfg["results_csv"]]
         )
-        if rf_model:
-            logger.info("[INFO] Surrogate model built & saved.")
-        else:
-            logger.warning("[WARN] Surrogate modeling failed or insufficient data.")
+        if not stage_is_cached("surrogate", sur_key):
+            with run_stage("surrogate"):
+                _run_surrogate(sur_cfg, logger)
+                stage_cache.record("surrogate", sur_key, [sur_cfg["model_out"], sur_cfg["cols_out"]])
     else:
         logger.info("[INFO] Skipping surrogate modeling.")
+        report_stage("surrogate", "skipped")
 
     # --------------------------------------------------------------------------
     # L) Calibration
     # --------------------------------------------------------------------------
     if cal_cfg.get("perform_calibration", False):
         logger.info("[INFO] Calibration steps are ENABLED.")
-        run_unified_calibration(cal_cfg)
+        cal_inputs, cal_outputs = _calibration_paths(cal_cfg)
+        cal_key = stage_cache.stage_key("calibration", config=cal_cfg, input_paths=cal_inputs)
+        if not stage_is_cached("calibration", cal_key):
+            with run_stage("calibration"):
+                from cal.unified_calibration import run_unified_calibration
+                run_unified_calibration(cal_cfg, run_context=run_context)
+                stage_cache.record("calibration", cal_key, cal_outputs)
     else:
         logger.info("[INFO] Skipping calibration steps.")
+        report_stage("calibration", "skipped")
+
+    # --------------------------------------------------------------------------
+    # M) Run report (per-stage timings / throughput of this run)
+    # --------------------------------------------------------------------------
+    report_dir = run_context.rebase(main_config.get("metrics", {}).get("report_dir", "output/metrics"))
+    report_path = write_run_report(report_dir, metrics_before, run_started_at)
+    logger.info(f"[INFO] Run metrics report => {report_path}")
 
     logger.info("=== End of orchestrate_workflow ===")
 
-    return {"status": "ok", "detail": "Workflow completed successfully."}
+    return {
+        "status": "ok",
+        "detail": "Workflow completed successfully.",
+        "run_id": run_context.run_id,
+        "output_root": run_context.output_root,
+        "run_report": report_path
+    }
+
+
+def build_run_context(main_config, output_root=None, run_id=None):
+    """
+    RunContext from the defaults, overridden with the IDD_PATH, BASE_IDF_PATH
+    and OUTPUT_DIR environment variables (OUTPUT_DIR only when the run writes
+    to the shared "output" root).
+
+    Without an explicit output_root, a run with a run_id gets its own folder
+    <runs.root>/<run_id> (default output/runs/<run_id>) when
+    main_config["runs"]["isolate_outputs"] is true; otherwise "output".
+    """
+    runs_cfg = main_config.get("runs", {})
+    if output_root is None and run_id and runs_cfg.get("isolate_outputs", False):
+        output_root = os.path.join(runs_cfg.get("root", "output/runs"), run_id)
+    run_context = RunContext(run_id=run_id, output_root=output_root or DEFAULT_OUTPUT_ROOT)
+
+    env_idd_path = os.environ.get("IDD_PATH")
+    if env_idd_path:
+        run_context.iddfile = env_idd_path
+
+    env_base_idf = os.environ.get("BASE_IDF_PATH")
+    if env_base_idf:
+        run_context.idf_file_path = env_base_idf
+
+    env_out_dir = os.environ.get("OUTPUT_DIR")
+    if env_out_dir and not run_context.isolated:
+        run_context.idf_output_dir = os.path.join(env_out_dir, "output_IDFs")
+
+    # "idf" (eppy) or "epjson" (json emitter) model files
+    run_context.output_format = main_config.get("idf_creation", {}).get("output_format", "idf")
+    # epjson runs: buildings checked against their IDF (ConvertInputFormat)
+    run_context.epjson_verify = main_config.get("idf_creation", {}).get("epjson_verify", 0)
+    return run_context
+
+
+# main_config sections whose paths route_stage_paths moves into the run's output root
+STAGE_PATH_SECTIONS = ["structuring", "modification", "validation", "sensitivity", "surrogate", "calibration"]
+
+
+def _written_paths(main_config):
+    """
+    Files / folders the enabled stages write, as configured in main_config
+    (i.e. relative to the shared "output" root).
+    """
+    shared = RunContext(output_root=DEFAULT_OUTPUT_ROOT)
+    written = []
+    if main_config.get("idf_creation", {}).get("perform_idf_creation", False):
+        written += [shared.idf_output_dir, shared.sim_results_dir, shared.path("param_log")]
+        written += [os.path.join(shared.assigned_dir, f) for f in ASSIGNED_LOG_FILES]
+        written.append(os.path.join(shared.results_dir, "merged_as_is.csv"))
+
+    structuring_cfg = main_config.get("structuring", {})
+    if structuring_cfg.get("perform_structuring", False):
+        written += _structuring_paths(structuring_cfg)[1]
+
+    modification_cfg = main_config.get("modification", {})
+    if modification_cfg.get("perform_modification", False):
+        written += _modification_paths(modification_cfg.get("modify_config", {}))[1]
+
+    validation_cfg = main_config.get("validation", {})
+    if validation_cfg.get("perform_validation", False):
+        written.append(validation_cfg.get("config", {}).get("output_csv"))
+
+    sens_cfg = main_config.get("sensitivity", {})
+    if sens_cfg.get("perform_sensitivity", False):
+        written.append(sens_cfg.get("output_csv", "sensitivity_output.csv"))
+
+    sur_cfg = main_config.get("surrogate", {})
+    if sur_cfg.get("perform_surrogate", False):
+        written += [sur_cfg.get("model_out"), sur_cfg.get("cols_out")]
+
+    cal_cfg = main_config.get("calibration", {})
+    if cal_cfg.get("perform_calibration", False):
+        written += [cal_cfg.get("best_params_folder"), cal_cfg.get("history_folder")]
+    return [os.path.normpath(p) for p in written if p]
+
+
+def route_stage_paths(main_config, run_context):
+    """
+    Copy of main_config in which every path of the stage sections that an
+    enabled stage of this run writes - a written file, a file inside a
+    written folder, or a folder holding written files - is moved into the
+    run's output root (RunContext.rebase). Later stages therefore read what
+    this run produced, and concurrent runs do not share any output file.
+    Inputs no stage writes (real data, the IDD, ...) stay as configured.
+    Runs writing to the shared "output" root get main_config unchanged.
+    """
+    if not run_context.isolated:
+        return main_config
+    written = _written_paths(main_config)
+
+    def is_written(value):
+        norm = os.path.normpath(value)
+        return any(
+            norm == p or norm.startswith(p + os.sep) or p.startswith(norm + os.sep)
+            for p in written
+        )
+
+    def route(value):
+        if isinstance(value, dict):
+            return {k: route(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [route(v) for v in value]
+        if isinstance(value, str) and value and is_written(value):
+            return run_context.rebase(value)
+        return value
+
+    routed = dict(main_config)
+    for section in STAGE_PATH_SECTIONS:
+        if section in routed:
+            routed[section] = route(routed[section])
+    return routed
+
+
+###############################################################################
+# 3b) Stage helpers (inputs/outputs for the stage cache + stage bodies)
+###############################################################################
+# main_config sections that influence IDF creation
+IDF_CREATION_CONFIG_SECTIONS = [
+    "paths",
+    "use_database",
+    "db_filter",
+    "excel_overrides",
+    "user_config_overrides",
+    "default_dicts",
+    "idf_creation"
+]
+
+# CSV logs written by create_idfs_for_all_buildings into run_context.assigned_dir
+# (see idf_creation._write_*_csv)
+ASSIGNED_LOG_FILES = [
+    "assigned_geometry.csv",
+    "assigned_lighting.csv",
+    "assigned_fenez_params.csv",
+    "assigned_dhw_params.csv",
+    "assigned_hvac_params.csv",
+    "assigned_ventilation.csv"
+]
+
+
+def _user_config_json_files(user_configs_folder):
+    """
+    All user_configs/*.json files except main_config.json itself
+    (its relevant sections are hashed separately per stage).
+    """
+    if not os.path.isdir(user_configs_folder):
+        return []
+    return [
+        os.path.join(user_configs_folder, f)
+        for f in sorted(os.listdir(user_configs_folder))
+        if f.lower().endswith(".json") and f != "main_config.json"
+    ]
+
+
+def _load_building_data(main_config, paths_dict, logger):
+    """
+    Loads df_buildings either from PostgreSQL (use_database=true) or from the
+    building_data CSV path.
+    """
+    use_database = main_config.get("use_database", False)
+    db_filter = main_config.get("db_filter", {})
+
+    if use_database:
+        logger.info("[INFO] Loading building data from PostgreSQL using filter criteria.")
+        from database_handler import load_buildings_from_db
+        df_buildings = load_buildings_from_db(db_filter)
+        if df_buildings.empty:
+            logger.warning("[WARN] No buildings returned from the DB based on filters; using empty DataFrame.")
+    else:
+        bldg_data_path = paths_dict.get("building_data", "")
+        if os.path.isfile(bldg_data_path):
+            df_buildings = pd.read_csv(bldg_data_path)
+        else:
+            logger.warning(f"[WARN] Building data CSV not found at {bldg_data_path}. Using empty DF.")
+            df_buildings = pd.DataFrame()
+    return df_buildings
+
+
+def _structuring_paths(structuring_cfg):
+    """
+    Returns (input_paths, output_paths) of the structuring step.
+    """
+    fenez_conf = structuring_cfg.get("fenestration", {})
+    dhw_conf   = structuring_cfg.get("dhw", {})
+    hvac_conf  = structuring_cfg.get("hvac", {})
+    vent_conf  = structuring_cfg.get("vent", {})
+
+    inputs = [
+        fenez_conf.get("csv_in", "output/assigned/assigned_fenez_params.csv"),
+        dhw_conf.get("csv_in",   "output/assigned/assigned_dhw_params.csv"),
+        hvac_conf.get("csv_in",  "output/assigned/assigned_hvac_params.csv"),
+        vent_conf.get("csv_in",  "output/assigned/assigned_ventilation.csv")
+    ]
+    outputs = [
+        fenez_conf.get("csv_out",  "output/assigned/structured_fenez_params.csv"),
+        dhw_conf.get("csv_out",    "output/assigned/structured_dhw_params.csv"),
+        hvac_conf.get("build_out", "output/assigned/assigned_hvac_building.csv"),
+        hvac_conf.get("zone_out",  "output/assigned/assigned_hvac_zones.csv"),
+        vent_conf.get("build_out", "output/assigned/assigned_vent_building.csv"),
+        vent_conf.get("zone_out",  "output/assigned/assigned_vent_zones.csv")
+    ]
+    return inputs, outputs
+
+
+def _run_structuring(structuring_cfg, logger):
+    logger.info("[INFO] Performing log structuring (fenestration, dhw, hvac, vent).")
+
+    from idf_objects.structuring.fenestration_structuring import transform_fenez_log_to_structured_with_ranges
+    fenez_conf = structuring_cfg.get("fenestration", {})
+    fenez_in   = fenez_conf.get("csv_in",  "output/assigned/assigned_fenez_params.csv")
+    fenez_out  = fenez_conf.get("csv_out", "output/assigned/structured_fenez_params.csv")
+    transform_fenez_log_to_structured_with_ranges(csv_input=fenez_in, csv_output=fenez_out)
+
+    from idf_objects.structuring.dhw_structuring import transform_dhw_log_to_structured
+    dhw_conf = structuring_cfg.get("dhw", {})
+    dhw_in   = dhw_conf.get("csv_in",  "output/assigned/assigned_dhw_params.csv")
+    dhw_out  = dhw_conf.get("csv_out", "output/assigned/structured_dhw_params.csv")
+    transform_dhw_log_to_structured(csv_input=dhw_in, csv_output=dhw_out)
+
+    from idf_objects.structuring.flatten_hvac import flatten_hvac_data, parse_assigned_value
+    hvac_conf = structuring_cfg.get("hvac", {})
+    hvac_in   = hvac_conf.get("csv_in",    "output/assigned/assigned_hvac_params.csv")
+    hvac_bld  = hvac_conf.get("build_out", "output/assigned/assigned_hvac_building.csv")
+    hvac_zone = hvac_conf.get("zone_out",  "output/assigned/assigned_hvac_zones.csv")
+
+    if os.path.isfile(hvac_in):
+        df_hvac = pd.read_csv(hvac_in)
+        df_hvac["assigned_value"] = df_hvac["assigned_value"].apply(parse_assigned_value)
+        flatten_hvac_data(df_input=df_hvac, out_build_csv=hvac_bld, out_zone_csv=hvac_zone)
+    else:
+        logger.warning(f"[WARN] HVAC input CSV not found at {hvac_in}; skipping.")
+
+    from idf_objects.structuring.flatten_assigned_vent import flatten_ventilation_data, parse_assigned_value
+    vent_conf = structuring_cfg.get("vent", {})
+    vent_in   = vent_conf.get("csv_in",    "output/assigned/assigned_ventilation.csv")
+    vent_bld  = vent_conf.get("build_out", "output/assigned/assigned_vent_building.csv")
+    vent_zone = vent_conf.get("zone_out",  "output/assigned/assigned_vent_zones.csv")
+
+    if os.path.isfile(vent_in):
+        df_vent = pd.read_csv(vent_in)
+        df_vent["assigned_value"] = df_vent["assigned_value"].apply(parse_assigned_value)
+        flatten_ventilation_data(df_input=df_vent, out_build_csv=vent_bld, out_zone_csv=vent_zone)
+    else:
+        logger.warning(f"[WARN] Vent input CSV not found at {vent_in}; skipping.")
+
+
+def _modification_paths(modify_config):
+    """
+    Returns (input_paths, output_paths) of the scenario modification step.
+    """
+    inputs = [modify_config.get("base_idf_path")]
+    inputs += list(modify_config.get("assigned_csv", {}).values())
+
+    outputs = [modify_config.get("output_idf_dir")]
+    outputs += list(modify_config.get("scenario_csv", {}).values())
+    if modify_config.get("run_simulations", False):
+        outputs.append(modify_config.get("simulation_config", {}).get("output_dir", "output/Sim_Results/Scenarios"))
+    if modify_config.get("perform_post_process", False):
+        outputs += list(modify_config.get("post_process_config", {}).values())
+    if modify_config.get("perform_validation", False):
+        outputs.append(modify_config.get("validation_config", {}).get("output_csv"))
+    return inputs, outputs
+
+
+def _run_surrogate(sur_cfg, logger):
+    from cal.unified_surrogate import (
+        load_scenario_params as sur_load_scenario_params,
+        pivot_scenario_params,
+        filter_top_parameters,
+        load_sim_results,
+        aggregate_results,
+        merge_params_with_results,
+        build_and_save_surrogate
+    )
+
+    scenario_folder = sur_cfg["scenario_folder"]
+    results_csv     = sur_cfg["results_csv"]
+    target_var      = sur_cfg["target_variable"]
+    model_out       = sur_cfg["model_out"]
+    cols_out        = sur_cfg["cols_out"]
+    test_size       = sur_cfg["test_size"]
+
+    # 1) Load & pivot scenario params
+    df_scen = sur_load_scenario_params(scenario_folder)
+    pivot_df = pivot_scenario_params(df_scen)
+
+    # 2) Optionally filter top parameters
+    # pivot_df = filter_top_parameters(pivot_df, "morris_sensitivity.csv", top_n=5)
+
+    # 3) Load & aggregate sim results
+    df_sim = load_sim_results(results_csv)
+    df_agg = aggregate_results(df_sim)
+
+    # 4) Merge
+    merged_df = merge_params_with_results(pivot_df, df_agg, target_var)
+
+    # 5) Build & save surrogate
+    rf_model, trained_cols = build_and_save_surrogate(
+        df_data=merged_df,
+        target_col=target_var,
+        model_out_path=model_out,
+        columns_out_path=cols_out,
+        test_size=test_size,
+        random_state=42
+    )
+    if rf_model:
+        logger.info("[INFO] Surrogate model built & saved.")
+    else:
+        logger.warning("[WARN] Surrogate modeling failed or insufficient data.")
+
+
+def _calibration_paths(cal_cfg):
+    """
+    Returns (input_paths, output_paths) of the calibration step.
+    """
+    scenario_folder = cal_cfg["scenario_folder"]
+    scenario_files  = cal_cfg.get("scenario_files", [])
+
+    inputs = [os.path.join(scenario_folder, f) for f in scenario_files]
+    inputs += [cal_cfg.get("subset_sensitivity_csv"), cal_cfg.get("real_data_csv")]
+    if cal_cfg.get("use_surrogate", False):
+        inputs += [cal_cfg.get("surrogate_model_path"), cal_cfg.get("surrogate_columns_path")]
+
+    best_dir = cal_cfg.get("best_params_folder", "./")
+    hist_dir = cal_cfg.get("history_folder", "./")
+    outputs = [os.path.join(hist_dir, cal_cfg.get("output_history_csv", "calibration_history.csv"))]
+    outputs += [os.path.join(best_dir, "calibrated_params_" + f) for f in scenario_files]
+    return inputs, outputs
 
 
 ###############################################################################
@@ -500,6 +882,33 @@ def orchestrate_workflow():
 
 app = FastAPI()
 
+def _job_max_workers():
+    """
+    JOB_MAX_WORKERS, or 1 unless main_config["runs"]["isolate_outputs"] gives
+    every run its own output root (concurrent runs would otherwise write the
+    same files under "output").
+    """
+    requested = int(os.environ.get("JOB_MAX_WORKERS", "1"))
+    if requested > 1:
+        config_path = os.path.join(os.path.dirname(__file__), "user_configs", "main_config.json")
+        isolated = os.path.isfile(config_path) and load_json(config_path).get("runs", {}).get("isolate_outputs", False)
+        if not isolated:
+            logging.getLogger(__name__).warning(
+                "[WARN] JOB_MAX_WORKERS > 1 needs runs.isolate_outputs=true in main_config.json; using 1 worker."
+            )
+            return 1
+    return requested
+
+
+# Bounded background queue for workflow runs. Each run gets its own RunContext
+# and, with runs.isolate_outputs, its own output root (output/runs/<run_id>)
+# that every stage writes into, so several runs can execute side by side.
+job_manager = JobManager(
+    store_path=os.environ.get("JOB_STORE_PATH", "output/jobs/jobs.json"),
+    max_workers=_job_max_workers(),
+    max_queued=int(os.environ.get("JOB_MAX_QUEUED", "10"))
+)
+
 @app.get("/health")
 def health_check():
     """
@@ -507,14 +916,45 @@ def health_check():
     """
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Per-stage / per-loop timing, CPU, items and throughput counters
+    in the Prometheus text format.
+    """
+    return METRICS.to_prometheus()
+
 @app.post("/run_workflow")
 def run_workflow():
     """
-    Endpoint to run the entire orchestration workflow.
-    Returns a JSON status with success or error info.
+    Endpoint to queue the entire orchestration workflow.
+    Returns immediately with a job_id (and the run_id naming the run's output
+    folder); poll GET /jobs/{job_id} for progress.
+    """
+    run_id = uuid.uuid4().hex
+    try:
+        job_id = job_manager.submit(orchestrate_workflow, run_id=run_id)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"status": "queued", "job_id": job_id, "run_id": run_id}
+
+@app.get("/jobs")
+def list_jobs():
+    """
+    Lists all known jobs with their status and current stage.
+    """
+    return {"jobs": job_manager.list_jobs()}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Returns the full job record: status, timestamps, per-stage progress,
+    and the workflow result or error once finished.
     """
-    result = orchestrate_workflow()
-    return result
+    job = job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    return job
 
 
 ###############################################################################
@@ -0,0 +1,243 @@
+"""
+metrics.py
+
+Lightweight timing / throughput / resource instrumentation for the workflow.
+
+Usage:
+    from metrics import track, add_items
+
+    with track("epw.simulate_all") as t:
+        ...
+        t.items = len(tasks)          # or add_items(n) from nested code
+
+    @timed("postproc.merge_all_results")
+    def merge_all_results(...):
+        ...
+        add_items(1)                  # per CSV file merged
+
+Every tracked section accumulates, per name:
+    - calls, errors
+    - wall seconds (time.perf_counter)
+    - CPU seconds (os.times: user + system, including reaped child
+      processes such as the multiprocessing Pool / EnergyPlus runs)
+    - items processed, and items/second of the last call
+    - peak RSS of the process seen when the section finished
+
+The numbers are exposed via METRICS.to_prometheus() (GET /metrics in main.py)
+and written per workflow run as a JSON report via write_run_report().
+"""
+
+import os
+import sys
+import json
+import time
+import copy
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+METRIC_PREFIX = "eplus"
+
+
+def _cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process (bytes), or None if unknown.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _Timer:
+    """
+    Handle returned by track(); set .items (or call add_items) to report
+    how many buildings / files / evaluations the section processed.
+    """
+
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items or 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+
+class MetricsRegistry:
+    """
+    Thread-safe accumulator of section timings, keyed by section name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._local = threading.local()
+
+    def _active_stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def track(self, name, items=None):
+        timer = _Timer(name, items)
+        stack = self._active_stack()
+        stack.append(timer)
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        failed = False
+        try:
+            yield timer
+        except Exception:
+            failed = True
+            raise
+        finally:
+            timer.wall_seconds = time.perf_counter() - wall_start
+            timer.cpu_seconds = _cpu_seconds() - cpu_start
+            stack.pop()
+            self._record(timer, failed)
+
+    def add_items(self, n=1):
+        """
+        Adds n processed items to the innermost active section of this thread.
+        No-op outside any tracked section.
+        """
+        stack = self._active_stack()
+        if stack:
+            stack[-1].items += n
+
+    def _record(self, timer, failed):
+        rss = peak_rss_bytes()
+        with self._lock:
+            sec = self._sections.setdefault(timer.name, {
+                "calls": 0,
+                "errors": 0,
+                "wall_seconds_total": 0.0,
+                "cpu_seconds_total": 0.0,
+                "items_total": 0,
+                "last_wall_seconds": 0.0,
+                "last_items_per_second": 0.0,
+                "peak_rss_bytes": None
+            })
+            sec["calls"] += 1
+            if failed:
+                sec["errors"] += 1
+            sec["wall_seconds_total"] += timer.wall_seconds
+            sec["cpu_seconds_total"] += timer.cpu_seconds
+            sec["items_total"] += timer.items
+            sec["last_wall_seconds"] = timer.wall_seconds
+            sec["last_items_per_second"] = (
+                timer.items / timer.wall_seconds if timer.wall_seconds > 0 else 0.0
+            )
+            if rss is not None:
+                sec["peak_rss_bytes"] = max(sec["peak_rss_bytes"] or 0, rss)
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._sections)
+
+    def to_prometheus(self):
+        """
+        Renders all sections in the Prometheus text exposition format.
+        """
+        sections = self.snapshot()
+        families = [
+            ("calls_total",            "counter", "calls",                 "Number of times the section ran."),
+            ("errors_total",           "counter", "errors",                "Number of runs that raised an exception."),
+            ("wall_seconds_total",     "counter", "wall_seconds_total",    "Total wall-clock seconds spent in the section."),
+            ("cpu_seconds_total",      "counter", "cpu_seconds_total",     "Total CPU seconds (incl. child processes) spent in the section."),
+            ("items_total",            "counter", "items_total",           "Total items (buildings, files, evaluations) processed."),
+            ("last_wall_seconds",      "gauge",   "last_wall_seconds",     "Wall-clock seconds of the most recent run."),
+            ("last_items_per_second",  "gauge",   "last_items_per_second", "Throughput of the most recent run.")
+        ]
+        lines = []
+        for suffix, mtype, key, help_text in families:
+            metric = f"{METRIC_PREFIX}_section_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {mtype}")
+            for name in sorted(sections):
+                lines.append(f'{metric}{{section="{name}"}} {sections[name][key]}')
+
+        rss = peak_rss_bytes()
+        if rss is not None:
+            metric = f"{METRIC_PREFIX}_process_peak_rss_bytes"
+            lines.append(f"# HELP {metric} Peak resident set size of the service process.")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {rss}")
+        return "\n".join(lines) + "\n"
+
+
+def diff_snapshots(before, after):
+    """
+    Per-section totals accumulated between two snapshots (e.g. one workflow run).
+    """
+    out = {}
+    for name, sec in after.items():
+        prev = before.get(name, {})
+        calls = sec["calls"] - prev.get("calls", 0)
+        if calls <= 0:
+            continue
+        wall = sec["wall_seconds_total"] - prev.get("wall_seconds_total", 0.0)
+        items = sec["items_total"] - prev.get("items_total", 0)
+        out[name] = {
+            "calls": calls,
+            "errors": sec["errors"] - prev.get("errors", 0),
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(sec["cpu_seconds_total"] - prev.get("cpu_seconds_total", 0.0), 6),
+            "items": items,
+            "items_per_second": round(items / wall, 6) if wall > 0 else 0.0,
+            "peak_rss_bytes": sec["peak_rss_bytes"]
+        }
+    return out
+
+
+def write_run_report(report_dir, before, started_at, extra=None):
+    """
+    Writes <report_dir>/run_report_<timestamp>.json with the sections that
+    ran since the `before` snapshot. Returns the report path.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    finished_at = datetime.now()
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": finished_at.isoformat(timespec="seconds"),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "sections": diff_snapshots(before, METRICS.snapshot())
+    }
+    if extra:
+        report.update(extra)
+
+    report_path = os.path.join(report_dir, f"run_report_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report_path
+
+
+# Process-wide registry used by the workflow modules
+METRICS = MetricsRegistry()
+track = METRICS.track
+add_items = METRICS.add_items
+
+
+def timed(name):
+    """
+    Decorator form of track(name) for whole functions.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.track(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -12,6 +12,7 @@ import pandas as pd
 
 # If using Geomeppy (to allow set_wwr, getsurfaces, etc.), uncomment these:
 from geomeppy import IDF as GeomIDF
+from idf_objects.other.idf_template import get_base_snapshot
 
 # =============================================================================
 # 2) "Assigned" CSV Loading
@@ -209,20 +210,25 @@ def save_param_scenarios_to_csv(all_scenarios, building_id,
 # =============================================================================
 # 4) IDF Load/Save with Geomeppy
 # -----------------------------------------------------------------------------
-def load_idf(base_idf_path, idd_path):
+def load_idf(base_idf_path, idd_path, cache=True):
     """
     Loads an existing IDF file from disk using Geomeppy (or Eppy, if desired).
-    Adjust path as needed.
+    The file is parsed once per process; every call returns an independent
+    copy of that parsed snapshot (re-read automatically if the file changes).
+    With cache=False the file is parsed directly and not kept (e.g. for
+    per-building IDFs that are loaded only once).
     """
     if not os.path.isfile(idd_path):
         raise FileNotFoundError(f"IDD file not found at: {idd_path}")
     if not os.path.isfile(base_idf_path):
         raise FileNotFoundError(f"IDF file not found at: {base_idf_path}")
 
+    if not cache:
+        GeomIDF.setiddname(idd_path)
+        return GeomIDF(base_idf_path)
+
     # With Geomeppy:
-    GeomIDF.setiddname(idd_path)
-    idf = GeomIDF(base_idf_path)
-    return idf
+    return get_base_snapshot(idd_path, base_idf_path).new_idf()
 
 
 def save_idf(idf, out_path):
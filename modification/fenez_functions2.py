@@ -26,6 +26,7 @@ from idf_objects.fenez.materials import (
     assign_constructions_to_surfaces
 )
 from idf_objects.fenez.fenestration import add_fenestration
+from idf_objects.other.idf_index import get_idf_index
 
 
 ##############################################################################
@@ -148,23 +149,21 @@ def apply_object_level_fenez(idf, df_fenez):
     group_cols = ["eplus_object_type", "eplus_object_name"]
     grouped = df_fenez.groupby(group_cols)
 
+    # type -> name lookups in O(1) instead of a scan per group
+    index = get_idf_index(idf)
+
     for (obj_type, obj_name), group_df in grouped:
         print(f"[FENEZ] Handling {obj_type} => '{obj_name}' with {len(group_df)} rows.")
 
         # 1) Attempt to find or create the object in IDF
         obj_type_upper = obj_type.upper() if isinstance(obj_type, str) else None
-        if not obj_type_upper or obj_type_upper not in idf.idfobjects:
+        if not obj_type_upper or not index.has_type(obj_type_upper):
             print(f"[FENEZ WARNING] IDF has no object type '{obj_type_upper}', skipping.")
             continue
 
         # search by Name
-        existing_obj = [
-            o for o in idf.idfobjects[obj_type_upper]
-            if hasattr(o, "Name") and str(o.Name).upper() == str(obj_name).upper()
-        ]
-        if existing_obj:
-            eplus_obj = existing_obj[0]
-        else:
+        eplus_obj = index.get(obj_type_upper, obj_name)
+        if eplus_obj is None:
             # create new
             eplus_obj = idf.newidfobject(obj_type_upper)
             if hasattr(eplus_obj, "Name"):
@@ -172,6 +171,7 @@ def apply_object_level_fenez(idf, df_fenez):
             else:
                 print(f"[FENEZ WARNING] {obj_type_upper} has no 'Name' field? object creation is partial.")
                 # might continue or skip
+            index.add(eplus_obj)
 
         # 2) row by row => param_name => param_value
         for row in group_df.itertuples():
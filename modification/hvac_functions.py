@@ -23,6 +23,8 @@ import pandas as pd
 
 from eppy.modeleditor import IDF  # or adapt as needed
 
+from idf_objects.other.idf_index import get_idf_index
+
 
 ##############################################################################
 # 1) CREATE HVAC SCENARIOS
@@ -478,20 +480,7 @@ def find_or_create_object(idf, obj_type_upper, obj_name):
     Utility to find an existing object in IDF by type & name, or create a new one.
     E.g.: find_or_create_object(idf, "ZONEHVAC:IDEALLOADSAIRSYSTEM", "Zone1_Core Ideal Loads")
     """
-    obj_type_upper = obj_type_upper.upper()
-    if obj_type_upper not in idf.idfobjects:
-        # If IDF doesn't have that object class, attempt creation
-        new_obj = idf.newidfobject(obj_type_upper)
-        new_obj.Name = obj_name
-        return new_obj
-
-    existing = [
-        o for o in idf.idfobjects[obj_type_upper]
-        if hasattr(o, "Name") and str(o.Name) == str(obj_name)
-    ]
-    if existing:
-        return existing[0]
-    else:
-        new_obj = idf.newidfobject(obj_type_upper)
-        new_obj.Name = obj_name
-        return new_obj
+    if not obj_type_upper:
+        return None
+    # indexed by type + name (idf_objects/other/idf_index.py) => O(1) per row
+    return get_idf_index(idf).find_or_create(obj_type_upper, obj_name)
@@ -19,6 +19,8 @@ import os
 import random
 import pandas as pd
 
+from idf_objects.other.idf_index import get_idf_index
+
 
 # ---------------------------------------------------------------------------
 # 1) CREATE VENTILATION SCENARIOS
@@ -382,19 +384,5 @@ def find_or_create_object(idf, obj_type_upper, obj_name):
     """
     if not obj_type_upper:
         return None
-    if obj_type_upper not in idf.idfobjects:
-        # If IDF doesn't have that object class, attempt creation
-        new_obj = idf.newidfobject(obj_type_upper)
-        return new_obj
-
-    # try to find by name
-    existing = [
-        o for o in idf.idfobjects[obj_type_upper]
-        if hasattr(o, "Name") and str(o.Name) == str(obj_name)
-    ]
-    if existing:
-        return existing[0]
-    else:
-        # create new
-        new_obj = idf.newidfobject(obj_type_upper)
-        return new_obj
+    # indexed by type + name (idf_objects/other/idf_index.py) => O(1) per row
+    return get_idf_index(idf).find_or_create(obj_type_upper, obj_name)
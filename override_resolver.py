@@ -0,0 +1,273 @@
+"""
+override_resolver.py
+
+Compiled resolution of user override rows and nested lookups, shared by the
+assign_* modules.
+
+Each module used to scan its whole user_config list for every building
+(find_hvac_overrides, find_dhw_overrides, find_vent_overrides,
+find_geom_overrides, find_epw_overrides, the Elec / eequip
+find_applicable_overrides). Here a list is compiled once per run into hashed
+buckets: rows are grouped by the set of fields they constrain, and within a
+group keyed by the (normalised) values of those fields. Matching a building
+is then one dict lookup per group, i.e. O(1) in the number of rows, and
+returns the same rows in the same order as the scan.
+
+Each module keeps its own matching rules (OVERRIDE_SPECS), e.g. HVAC rows
+constrain every field they contain, DHW rows only fields that are not None,
+and Elec compares building_type case-insensitively.
+
+Nested lookups with "first key" fallbacks (hvac_lookup[stage][scenario]...)
+are resolved with resolve_nested(); at an age-range level a building whose
+age_range is missing from the lookup can fall into the age-range interval
+that contains its construction year (AgeRanges).
+
+Usage:
+    matches = find_overrides("hvac", user_config_hvac, building_id=..., age_range=...)
+    keys, block = resolve_nested(sub_block, [age_range], year=1987, age_level=0)
+"""
+
+import re
+import bisect
+import threading
+from functools import lru_cache
+
+# field -> (mode, casefold)
+#   mode "present"  : a row constrains the field if it has the key
+#        "not_none" : ... if the key's value is not None
+#        "truthy"   : ... if the value is truthy
+OVERRIDE_SPECS = {
+    "hvac": {
+        "building_id": ("present", False),
+        "building_function": ("present", False),
+        "residential_type": ("present", False),
+        "non_residential_type": ("present", False),
+        "age_range": ("present", False),
+        "scenario": ("present", False),
+        "calibration_stage": ("present", False),
+    },
+    "vent": {
+        "building_id": ("present", False),
+        "building_function": ("present", False),
+        "age_range": ("present", False),
+        "scenario": ("present", False),
+        "calibration_stage": ("present", False),
+    },
+    "dhw": {
+        "building_id": ("not_none", False),
+        "dhw_key": ("not_none", False),
+        "building_function": ("not_none", True),
+        "age_range": ("not_none", False),
+    },
+    "geometry": {
+        "building_id": ("present", False),
+        "building_type": ("present", False),
+    },
+    "epw": {
+        "building_id": ("present", False),
+        "desired_year": ("present", False),
+    },
+    "lighting": {
+        "building_id": ("not_none", False),
+        "building_type": ("truthy", True),
+        "age_range": ("truthy", False),
+    },
+    "equip": {
+        "building_id": ("not_none", False),
+        "building_type": ("not_none", False),
+        "age_range": ("not_none", False),
+    },
+}
+
+
+# spec name => fields where a building whose value is "" matches every row
+# (the Elec scan only compared age_range when the building's was set, and
+# skipped rows only for a building age_range of None)
+BLANK_MATCHES_ANY = {
+    "lighting": ("age_range",),
+}
+
+
+def _constrains(row, field, mode):
+    if field not in row:
+        return False
+    if mode == "not_none":
+        return row[field] is not None
+    if mode == "truthy":
+        return bool(row[field])
+    return True
+
+
+def _norm(value, casefold):
+    if casefold and isinstance(value, str):
+        return value.lower()
+    return value
+
+
+class OverrideIndex:
+    """
+    rows : list of dict
+        User override rows, in priority order (later rows win).
+    spec : dict
+        {field: (mode, casefold)}, see OVERRIDE_SPECS.
+    blank_matches_any : tuple
+        Fields where a building value of "" matches any row value
+        (see BLANK_MATCHES_ANY).
+    """
+
+    def __init__(self, rows, spec, blank_matches_any=()):
+        self.spec = spec
+        self.blank_matches_any = tuple(blank_matches_any)
+        self._groups = {}    # constrained fields -> {values: [(position, row)]}
+        self._residual = []  # rows with unhashable values, matched by comparison
+        for pos, row in enumerate(rows or []):
+            fields = tuple(f for f, (mode, _) in spec.items() if _constrains(row, f, mode))
+            key = tuple(_norm(row[f], spec[f][1]) for f in fields)
+            try:
+                hash(key)
+            except TypeError:
+                self._residual.append((pos, row, fields))
+                continue
+            self._groups.setdefault(fields, {}).setdefault(key, []).append((pos, row))
+
+    def match(self, **building):
+        """Rows that apply to a building with these field values, in row order."""
+        hits = []
+        blank = {f for f in self.blank_matches_any if building.get(f) == ""}
+        for fields, table in self._groups.items():
+            key = tuple(_norm(building.get(f), self.spec[f][1]) for f in fields)
+            wild = [i for i, f in enumerate(fields) if f in blank]
+            if wild:
+                # (rare) blank building value => compare the other fields only
+                for row_key, entries in table.items():
+                    if all(row_key[i] == key[i] for i in range(len(fields)) if i not in wild):
+                        hits.extend(entries)
+                continue
+            try:
+                hits.extend(table.get(key, ()))
+            except TypeError:
+                continue
+        for pos, row, fields in self._residual:
+            if all(
+                f in blank or _norm(row[f], self.spec[f][1]) == _norm(building.get(f), self.spec[f][1])
+                for f in fields
+            ):
+                hits.append((pos, row))
+        if len(self._groups) > 1 or self._residual or blank:
+            hits.sort(key=lambda hit: hit[0])
+        return [row for _, row in hits]
+
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+def get_override_index(spec_name, rows):
+    """
+    The OverrideIndex of rows, compiled on first use and reused for as long
+    as the same list object (with the same length) is passed in.
+    """
+    key = (spec_name, id(rows))
+    with _LOCK:
+        cached = _INDEXES.get(key)
+        if cached is not None and cached[0] is rows and cached[1] == len(rows):
+            return cached[2]
+    index = OverrideIndex(rows, OVERRIDE_SPECS[spec_name], BLANK_MATCHES_ANY.get(spec_name, ()))
+    with _LOCK:
+        if len(_INDEXES) > 256:
+            _INDEXES.clear()
+        _INDEXES[key] = (rows, len(rows), index)
+    return index
+
+
+def find_overrides(spec_name, rows, **building):
+    """User override rows of rows that apply to the building (see OVERRIDE_SPECS)."""
+    if not rows:
+        return []
+    return get_override_index(spec_name, rows).match(**building)
+
+
+###############################################################################
+# Age ranges / construction years
+###############################################################################
+def parse_age_range(label):
+    """
+    (first_year, last_year) of an age-range label, e.g.
+      "1992 - 2005" / "1992-2005" => (1992, 2005)
+      "pre-1970" / "<1970"        => (-inf, 1969)
+      "2015 and later" / ">2015"  => (2015, inf)
+    None if the label has no year in it.
+    """
+    text = str(label).strip().lower()
+    years = [int(y) for y in re.findall(r"\d{4}", text)]
+    if not years:
+        return None
+    if len(years) >= 2:
+        return (min(years[:2]), max(years[:2]))
+    year = years[0]
+    if text.startswith(("pre", "<", "before", "until", "tot")):
+        return (float("-inf"), year - 1)
+    if text.startswith(">") or "later" in text or "after" in text or text.endswith("+"):
+        return (year, float("inf"))
+    return (year, year)
+
+
+class AgeRanges:
+    """Interval lookup of construction years over a set of age-range labels."""
+
+    def __init__(self, labels):
+        intervals = []
+        for label in labels:
+            bounds = parse_age_range(label)
+            if bounds is not None:
+                intervals.append((bounds[0], bounds[1], label))
+        intervals.sort(key=lambda item: (item[0], item[1]))
+        self._starts = [item[0] for item in intervals]
+        self._intervals = intervals
+
+    def label_for_year(self, year):
+        """The label whose interval contains year (latest start wins), or None."""
+        try:
+            year = float(year)
+        except (TypeError, ValueError):
+            return None
+        if year != year:  # NaN
+            return None
+        pos = bisect.bisect_right(self._starts, year) - 1
+        while pos >= 0:
+            start, end, label = self._intervals[pos]
+            if start <= year <= end:
+                return label
+            pos -= 1
+        return None
+
+
+@lru_cache(maxsize=256)
+def _age_ranges(labels):
+    return AgeRanges(labels)
+
+
+def age_range_for_year(year, labels):
+    """The label of labels whose interval contains the construction year, or None."""
+    return _age_ranges(tuple(labels)).label_for_year(year)
+
+
+def resolve_nested(lookup, keys, year=None, age_level=None):
+    """
+    Walks lookup[keys[0]][keys[1]]... Where a key is missing (or None), the
+    level's first key is used, as the assign_* modules always did; at
+    age_level, a missing age range is first looked up by construction year.
+
+    Returns (resolved_keys, block).
+    """
+    resolved = []
+    block = lookup
+    for level, key in enumerate(keys):
+        if key is None or key not in block:
+            fallback = None
+            if level == age_level and year is not None:
+                fallback = age_range_for_year(year, block.keys())
+            key = fallback if fallback is not None else next(iter(block.keys()))
+        resolved.append(key)
+        block = block[key]
+    return resolved, block
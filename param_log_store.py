@@ -0,0 +1,289 @@
+"""
+param_log_store.py
+
+Columnar, append-only store for the parameters picked per building
+(geometry, lighting, DHW, fenestration, HVAC, ventilation, zone sizing).
+
+Instead of keeping the assigned_*_log dicts of every building in memory until
+the end of a run, each building's entries are flattened into rows
+
+    ogc_fid | module | object | param | value | min | max
+
+and appended to disk in batches as soon as the building is finished.
+Memory stays flat regardless of portfolio size.
+
+Layout (one folder per run, e.g. output/param_log):
+    shard-main.csv                       # serial run, appended per batch
+    shard-c00000.csv, shard-c00001.csv   # one shard per parallel chunk
+    shard-main-00000.parquet, ...        # format="parquet": one file per batch
+    shard-kept.csv                       # rows reused by an incremental run
+
+Column types:
+    ogc_fid, module, object, param, value : str
+        (value holds the repr of nested dicts / lists, like the old CSVs)
+    min, max : float or empty
+
+The per-module CSVs the downstream steps read (assigned_geometry.csv,
+assigned_hvac_params.csv, ...) are exported from the shards at the end by
+export_legacy_csvs(), streaming row by row.
+
+Parquet requires pyarrow; without it the store falls back to chunked CSV.
+"""
+
+import os
+import csv
+import glob
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except ImportError:
+    pa = None
+    pq = None
+    HAVE_PYARROW = False
+
+LOG_COLUMNS = ["ogc_fid", "module", "object", "param", "value", "min", "max"]
+
+# assigned_*_log kwarg of create_idf_for_building => module name in the store
+STORED_LOGS = {
+    "assigned_geom_log": "geometry",
+    "assigned_lighting_log": "lighting",
+    "assigned_dhw_log": "dhw",
+    "assigned_fenez_log": "fenestration",
+    "assigned_hvac_log": "hvac",
+    "assigned_vent_log": "ventilation",
+    "assigned_setzone_log": "setzone"
+}
+
+# module => (legacy CSV file, detailed columns?)
+LEGACY_CSVS = {
+    "geometry": ("assigned_geometry.csv", False),
+    "lighting": ("assigned_lighting.csv", True),
+    "fenestration": ("assigned_fenez_params.csv", False),
+    "dhw": ("assigned_dhw_params.csv", False),
+    "hvac": ("assigned_hvac_params.csv", False),
+    "ventilation": ("assigned_ventilation.csv", False)
+}
+
+
+def _to_float(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value != value:  # NaN
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def flatten_entry(module, ogc_fid, entry):
+    """
+    Rows of one building's log entry ({param: value}).
+    Values shaped like {"assigned_value", "min_val", "max_val", "object_name"}
+    (lighting) fill the object / min / max columns.
+    """
+    rows = []
+    if not isinstance(entry, dict):
+        return [[_to_text(ogc_fid), module, "", "", _to_text(entry), None, None]]
+    for param, val in entry.items():
+        if isinstance(val, dict) and "assigned_value" in val:
+            rows.append([
+                _to_text(ogc_fid), module,
+                _to_text(val.get("object_name", "")), _to_text(param),
+                _to_text(val.get("assigned_value")),
+                _to_float(val.get("min_val")), _to_float(val.get("max_val"))
+            ])
+        else:
+            rows.append([_to_text(ogc_fid), module, "", _to_text(param), _to_text(val), None, None])
+    return rows
+
+
+class ParamLogStore:
+    """
+    root_dir : str
+        Folder of the shards.
+    shard_id : str
+        Name of this writer's shard; parallel workers use their own.
+    batch_size : int
+        Rows buffered before they are appended to disk.
+    fmt : str
+        "csv" (default) or "parquet".
+    """
+
+    def __init__(self, root_dir, shard_id="main", batch_size=5000, fmt="csv"):
+        if fmt == "parquet" and not HAVE_PYARROW:
+            logging.warning("[param_log_store] pyarrow not installed => writing chunked CSV instead of Parquet.")
+            fmt = "csv"
+        self.root_dir = root_dir
+        self.shard_id = shard_id
+        self.batch_size = batch_size
+        self.fmt = fmt
+        self._buffer = []
+        self._batch_no = 0
+        os.makedirs(root_dir, exist_ok=True)
+
+    @staticmethod
+    def reset(root_dir, keep_ids=None, drop_modules=None):
+        """
+        Removes the shards of an earlier run. The rows of keep_ids (ogc_fids
+        reused by an incremental run) are first copied to shard-kept.csv, as
+        are those of the ogc_fids in drop_modules ({ogc_fid: [modules]},
+        IDFs patched per module) except for the listed modules.
+        """
+        drop = {_to_text(k): set(v) for k, v in (drop_modules or {}).items()}
+        keep = {_to_text(k) for k in keep_ids or []} | set(drop)
+        if not keep:
+            for path in glob.glob(os.path.join(root_dir, "shard-*")):
+                os.remove(path)
+            return
+        _rewrite_shards(
+            root_dir,
+            lambda row: row["ogc_fid"] in keep and row["module"] not in drop.get(row["ogc_fid"], ())
+        )
+
+    @staticmethod
+    def supersede(root_dir, ogc_fids):
+        """
+        Drops the rows of ogc_fids from the existing shards (buildings a
+        resumed run builds again, so their new rows replace the old ones);
+        all other rows are kept in shard-kept.csv.
+        """
+        drop = {_to_text(k) for k in ogc_fids}
+        if drop:
+            _rewrite_shards(root_dir, lambda row: row["ogc_fid"] not in drop)
+
+    def settings(self):
+        """Constructor kwargs, e.g. to open a sibling shard in a worker process."""
+        return {"root_dir": self.root_dir, "batch_size": self.batch_size, "fmt": self.fmt}
+
+    def append(self, module, ogc_fid, entry):
+        self._buffer.extend(flatten_entry(module, ogc_fid, entry))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def append_building_logs(self, assigned_logs, bldg_id, member_ids=None):
+        """
+        Moves the entries of bldg_id out of the in-memory log dicts into the
+        store. member_ids (archetype members) get a copy of the same rows.
+        Logs not listed in STORED_LOGS (ground temperatures, EPW) stay in memory.
+        """
+        for log_name, module in STORED_LOGS.items():
+            log = assigned_logs.get(log_name)
+            if log is None or bldg_id not in log:
+                continue
+            entry = log.pop(bldg_id)
+            for target_id in [bldg_id] + [m for m in (member_ids or []) if m != bldg_id]:
+                self.append(module, target_id, entry)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.fmt == "parquet":
+            path = os.path.join(self.root_dir, f"shard-{self.shard_id}-{self._batch_no:05d}.parquet")
+            columns = list(zip(*self._buffer))
+            table = pa.table(
+                {
+                    name: pa.array(list(col), type=pa.float64() if name in ("min", "max") else pa.string())
+                    for name, col in zip(LOG_COLUMNS, columns)
+                }
+            )
+            pq.write_table(table, path)
+        else:
+            path = os.path.join(self.root_dir, f"shard-{self.shard_id}.csv")
+            new_file = not os.path.isfile(path)
+            with open(path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(LOG_COLUMNS)
+                writer.writerows(self._buffer)
+        self._batch_no += 1
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+
+def _rewrite_shards(root_dir, keep_row):
+    """Replaces all shards with shard-kept.csv holding the rows keep_row(row) accepts."""
+    old_shards = glob.glob(os.path.join(root_dir, "shard-*"))
+    if not old_shards:
+        return
+    tmp_path = os.path.join(root_dir, "kept.csv.tmp")
+    kept = 0
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_COLUMNS)
+        for row in iter_rows(root_dir):
+            if keep_row(row):
+                writer.writerow([row[c] for c in LOG_COLUMNS])
+                kept += 1
+    for path in old_shards:
+        os.remove(path)
+    if kept:
+        os.replace(tmp_path, os.path.join(root_dir, "shard-kept.csv"))
+    else:
+        os.remove(tmp_path)
+
+
+def iter_rows(root_dir):
+    """
+    Streams all rows of all shards (sorted by shard name) as dicts.
+    """
+    for path in sorted(glob.glob(os.path.join(root_dir, "shard-*"))):
+        if path.endswith(".parquet"):
+            if not HAVE_PYARROW:
+                raise ImportError(f"pyarrow is needed to read {path}")
+            for batch in pq.ParquetFile(path).iter_batches():
+                for row in batch.to_pylist():
+                    yield row
+        else:
+            with open(path, "r", newline="") as f:
+                for row in csv.DictReader(f):
+                    yield row
+
+
+def export_legacy_csvs(root_dir, assigned_dir):
+    """
+    Writes the per-module assigned_*.csv files from the shards in one pass:
+      - lighting: ogc_fid, object_name, param_name, assigned_value, min_val, max_val
+      - others:   ogc_fid, param_name, assigned_value
+    Returns the written paths.
+    """
+    os.makedirs(assigned_dir, exist_ok=True)
+    handles = {}
+    writers = {}
+    try:
+        for module, (file_name, detailed) in LEGACY_CSVS.items():
+            f = open(os.path.join(assigned_dir, file_name), "w", newline="")
+            handles[module] = f
+            writers[module] = csv.writer(f)
+            if detailed:
+                writers[module].writerow(["ogc_fid", "object_name", "param_name", "assigned_value", "min_val", "max_val"])
+            else:
+                writers[module].writerow(["ogc_fid", "param_name", "assigned_value"])
+
+        for row in iter_rows(root_dir):
+            module = row["module"]
+            if module not in writers:
+                continue
+            if LEGACY_CSVS[module][1]:
+                writers[module].writerow([
+                    row["ogc_fid"], row["object"], row["param"], row["value"],
+                    _to_text(row["min"]), _to_text(row["max"])
+                ])
+            else:
+                writers[module].writerow([row["ogc_fid"], row["param"], row["value"]])
+    finally:
+        for f in handles.values():
+            f.close()
+
+    return [os.path.join(assigned_dir, LEGACY_CSVS[m][0]) for m in handles]
@@ -0,0 +1,346 @@
+"""
+presample.py
+
+Portfolio-wide parameter pre-sampling: one (buildings x parameters) matrix
+with every value the IDF modules pick for df_buildings.
+
+Two passes:
+  1) Ranges: each module's picker (assign_geometry_values,
+     get_extended_materials_data, assign_fenestration_parameters,
+     assign_lighting_parameters, assign_dhw_parameters,
+     assign_hvac_ideal_parameters, assign_ventilation_params_with_overrides,
+     assign_zone_sizing_params, assign_ground_temperatures) is run per
+     building with the same arguments as in create_idf_for_building, inside
+     rng_streams.capture_ranges(). It resolves lookups and overrides as usual
+     but only records the (min, max) of each draw.
+  2) Values: all draws of one parameter are computed in one NumPy call
+     (rng_streams.uniform01_array) from the same counter-based streams the
+     builders use, so with strategy "B" and a random_seed the matrix holds
+     exactly the values written into the IDFs.
+
+The matrix is written to param_matrix.csv (e.g. for sensitivity analysis or
+surrogate training) and the IDF builders then take their uniform draws from
+it read-only (ParameterMatrix.picks, installed with
+rng_streams.use_presampled), so the IDFs always hold the matrix values, also
+without a random_seed. This is not a speed-up: the builders still run their
+pickers (lookups, overrides) to know the ranges, and the ranges pass above
+is one extra run of every picker per building. It is off by default
+(idf_creation.presample.enabled).
+
+Columns are "<module>:<param>" (e.g. "hvac:heating_day_setpoint",
+"fenez:exterior_wall.R_value"), with "#<n>" appended for the n-th repeated
+draw of a parameter. Parameters a building does not draw (fixed values,
+constant ranges, other building types) are NaN.
+
+Usage:
+    matrix = presample_parameters(df_buildings, strategy="B", random_seed=42, ...)
+    matrix.to_csv(run_context.path("param_matrix.csv"))
+    X = matrix.values     # DataFrame indexed by ogc_fid
+    with use_presampled(matrix.picks):   # builders draw the matrix values
+        create_idf_for_building(...)
+"""
+
+import os
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from rng_streams import capture_ranges, uniform01_array, fid_key
+
+from idf_objects.geomz.assign_geometry_values import assign_geometry_values
+from idf_objects.fenez.materials_config import get_extended_materials_data
+from idf_objects.fenez.assign_fenestration_values import assign_fenestration_parameters
+from idf_objects.Elec.lighting import get_building_category_and_subtype
+from idf_objects.Elec.assign_lighting_values import assign_lighting_parameters
+from idf_objects.DHW.assign_dhw_values import assign_dhw_parameters
+from idf_objects.HVAC.assign_hvac_values import assign_hvac_ideal_parameters
+from idf_objects.ventilation.assign_ventilation_values import assign_ventilation_params_with_overrides
+from idf_objects.ventilation.mappings import map_age_range_to_year_key, map_infiltration_key
+from idf_objects.setzone.assign_zone_sizing_values import assign_zone_sizing_params
+from idf_objects.tempground.assign_groundtemp_values import assign_ground_temperatures
+
+logger = logging.getLogger(__name__)
+
+
+class ParameterMatrix:
+    """
+    values : DataFrame (index ogc_fid, one column per parameter)
+    min_val, max_val : DataFrame, same shape: the range each value was drawn from
+    picks : dict
+        {fid_key(ogc_fid): {(module, param, counter): value}}, the same values
+        keyed the way BuildingRandom draws them (rng_streams.use_presampled).
+    """
+
+    def __init__(self, values, min_val, max_val, picks=None):
+        self.values = values
+        self.min_val = min_val
+        self.max_val = max_val
+        self.picks = picks or {}
+
+    def picks_for(self, fids):
+        """The part of picks the buildings fids (and the site streams) draw."""
+        keys = {fid_key(f) for f in fids} | {fid_key(None)}
+        return {k: self.picks[k] for k in keys if k in self.picks}
+
+    @property
+    def columns(self):
+        return list(self.values.columns)
+
+    def ranges(self):
+        """Long format: ogc_fid, parameter, min_val, max_val, value."""
+        if self.values.empty:
+            return pd.DataFrame(columns=["ogc_fid", "parameter", "min_val", "max_val", "value"])
+        stacked = pd.DataFrame({
+            "value": self.values.stack(),
+            "min_val": self.min_val.stack(),
+            "max_val": self.max_val.stack()
+        })
+        stacked.index.names = ["ogc_fid", "parameter"]
+        return stacked.reset_index()[["ogc_fid", "parameter", "min_val", "max_val", "value"]]
+
+    def to_csv(self, path):
+        """
+        Writes the matrix to path and the per-building ranges next to it
+        (<name>_ranges.csv). Returns both paths.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.values.to_csv(path)
+        ranges_path = path[:-4] + "_ranges.csv" if path.endswith(".csv") else path + "_ranges.csv"
+        self.ranges().to_csv(ranges_path, index=False)
+        return [path, ranges_path]
+
+
+def capture_building_ranges(
+    building_row,
+    building_index,
+    scenario="scenario1",
+    calibration_stage="pre_calibration",
+    user_config_geom=None,
+    user_config_lighting=None,
+    user_config_dhw=None,
+    res_data=None,
+    nonres_data=None,
+    user_config_hvac=None,
+    user_config_vent=None
+):
+    """
+    Runs the building-level pickers of every module for one building and
+    returns {(module, param, counter): (ogc_fid, min_val, max_val)}.
+    A module that fails for this building is skipped (logged).
+    """
+    bldg_id = building_row.get("ogc_fid", 0)
+    bldg_func = building_row.get("building_function", "residential")
+    age_range = building_row.get("age_range", "2015 and later")
+    common = {"calibration_stage": calibration_stage, "strategy": "B"}
+
+    def _geometry(seed):
+        assign_geometry_values(building_row, random_seed=seed, user_config=user_config_geom, **common)
+
+    def _materials(seed):
+        building_id = building_row.get("ogc_fid", None)
+        get_extended_materials_data(
+            building_function=bldg_func,
+            building_type=(building_row.get("residential_type", "")
+                           if str(bldg_func).lower() == "residential"
+                           else building_row.get("non_residential_type", "")),
+            age_range=age_range,
+            scenario=scenario,
+            random_seed=seed,
+            user_config_fenez=None,
+            building_id=building_index if building_id is None else building_id,
+            **common
+        )
+
+    def _fenestration(seed):
+        assign_fenestration_parameters(
+            building_row=building_row, scenario=scenario, random_seed=seed,
+            res_data=res_data, nonres_data=nonres_data, **common
+        )
+
+    def _lighting(seed):
+        _, sub_type = get_building_category_and_subtype(building_row)
+        assign_lighting_parameters(
+            building_id=int(bldg_id), building_type=sub_type, random_seed=seed,
+            user_config=user_config_lighting, **common
+        )
+
+    def _dhw(seed):
+        assign_dhw_parameters(
+            building_id=bldg_id,
+            dhw_key=building_row.get("dhw_key", "Detached House"),
+            random_seed=seed,
+            user_config_dhw=user_config_dhw,
+            building_row=building_row,
+            use_nta=True,
+            building_function=building_row.get("building_function", ""),
+            age_range=building_row.get("age_range", None),
+            **common
+        )
+
+    def _hvac(seed):
+        assign_hvac_ideal_parameters(
+            building_id=bldg_id,
+            building_function=bldg_func,
+            residential_type=building_row.get("residential_type", "Two-and-a-half-story House"),
+            non_residential_type=building_row.get("non_residential_type", "Meeting Function"),
+            age_range=building_row.get("age_range", "1900-2000"),
+            scenario=building_row.get("scenario", "scenario1"),
+            random_seed=seed,
+            user_config_hvac=user_config_hvac,
+            construction_year=building_row.get("bouwjaar"),
+            **common
+        )
+
+    def _ventilation(seed):
+        vent_func = str(bldg_func).lower()
+        if vent_func not in ("residential", "non_residential"):
+            vent_func = "residential"
+        assign_ventilation_params_with_overrides(
+            building_id=bldg_id,
+            building_function=vent_func,
+            age_range=age_range,
+            scenario=building_row.get("scenario", "scenario1"),
+            random_seed=seed,
+            user_config_vent=user_config_vent,
+            infiltration_key=map_infiltration_key(building_row),
+            year_key=map_age_range_to_year_key(age_range, building_row.get("bouwjaar")),
+            is_residential=(vent_func == "residential"),
+            default_flow_exponent=0.67,
+            **common
+        )
+
+    def _setzone(seed):
+        setzone_func = bldg_func if bldg_func in ("residential", "non_residential") else "residential"
+        assign_zone_sizing_params(
+            building_function=setzone_func, random_seed=seed,
+            building_id=building_row.get("ogc_fid"), **common
+        )
+
+    pickers = [
+        ("geometry", _geometry), ("fenez", _materials), ("fenez", _fenestration),
+        ("lighting", _lighting), ("dhw", _dhw), ("hvac", _hvac),
+        ("ventilation", _ventilation), ("setzone", _setzone)
+    ]
+
+    captured = OrderedDict()
+    for name, picker in pickers:
+        with capture_ranges() as draws:
+            try:
+                # any seed: capture_ranges only records, it never draws
+                picker(0)
+            except Exception as e:
+                logger.warning(f"[presample] {name} ranges failed for building {bldg_id}: {e}")
+                continue
+        # (a later picker of the same stream, e.g. the fenestration WWR
+        #  after the materials WWR, is the one the builder applies)
+        for ogc_fid, module, param, counter, a, b in draws:
+            captured[(module, param, counter)] = (ogc_fid, a, b)
+    return captured
+
+
+def _column_name(module, param, counter):
+    return f"{module}:{param}" + (f"#{counter}" if counter else "")
+
+
+def presample_parameters(
+    df_buildings,
+    scenario="scenario1",
+    calibration_stage="pre_calibration",
+    strategy="B",
+    random_seed=42,
+    user_config_geom=None,
+    user_config_lighting=None,
+    user_config_dhw=None,
+    res_data=None,
+    nonres_data=None,
+    user_config_hvac=None,
+    user_config_vent=None
+):
+    """
+    Builds the ParameterMatrix of df_buildings.
+
+    strategy "B" => values drawn from the building streams (the same values
+    the builders pick when random_seed is set), "A" => midpoints, else => min.
+    """
+    if strategy == "B" and random_seed is None:
+        logger.info(
+            "[presample] random_seed is None: the matrix is a fresh sample; the "
+            "builders take its values instead of the global random module."
+        )
+
+    # 1) Resolve ranges building by building
+    fids = []
+    columns = OrderedDict()  # column => {"key": (module, param, counter), "rows": [], "fids": [], "lo": [], "hi": []}
+    for row_pos, (idx, row) in enumerate(df_buildings.iterrows()):
+        fids.append(row.get("ogc_fid", idx))
+        captured = capture_building_ranges(
+            row, idx,
+            scenario=scenario,
+            calibration_stage=calibration_stage,
+            user_config_geom=user_config_geom,
+            user_config_lighting=user_config_lighting,
+            user_config_dhw=user_config_dhw,
+            res_data=res_data,
+            nonres_data=nonres_data,
+            user_config_hvac=user_config_hvac,
+            user_config_vent=user_config_vent
+        )
+        for key, (ogc_fid, a, b) in captured.items():
+            col = columns.setdefault(
+                _column_name(*key), {"key": key, "rows": [], "fids": [], "lo": [], "hi": []}
+            )
+            col["rows"].append(row_pos)
+            col["fids"].append(ogc_fid)
+            col["lo"].append(a)
+            col["hi"].append(b)
+
+    # Site-level streams (one value for the whole run)
+    with capture_ranges() as site_draws:
+        assign_ground_temperatures(calibration_stage=calibration_stage, strategy="B", random_seed=0)
+    for ogc_fid, module, param, counter, a, b in site_draws:
+        columns[_column_name(module, param, counter)] = {
+            "key": (module, param, counter),
+            "rows": list(range(len(fids))),
+            "fids": [ogc_fid] * len(fids),
+            "lo": [a] * len(fids),
+            "hi": [b] * len(fids)
+        }
+
+    # 2) Draw every column in one vectorized call
+    n = len(fids)
+    values = {}
+    lows = {}
+    highs = {}
+    picks = {}
+    for name, col in columns.items():
+        module, param, counter = col["key"]
+        rows = np.asarray(col["rows"], dtype=int)
+        lo = np.asarray(col["lo"], dtype=float)
+        hi = np.asarray(col["hi"], dtype=float)
+        if strategy == "B":
+            u = uniform01_array(random_seed, col["fids"], module, param, counter)
+            drawn = lo + (hi - lo) * u
+        elif strategy == "A":
+            drawn = (lo + hi) / 2.0
+        else:
+            drawn = lo
+        for ogc_fid, value in zip(col["fids"], drawn.tolist()):
+            picks.setdefault(fid_key(ogc_fid), {})[(module, param, counter)] = value
+        for target, data in ((values, drawn), (lows, lo), (highs, hi)):
+            full = np.full(n, np.nan)
+            full[rows] = data
+            target[name] = full
+
+    index = pd.Index(fids, name="ogc_fid")
+    matrix = ParameterMatrix(
+        pd.DataFrame(values, index=index, columns=list(columns)),
+        pd.DataFrame(lows, index=index, columns=list(columns)),
+        pd.DataFrame(highs, index=index, columns=list(columns)),
+        picks
+    )
+    logger.info(f"[presample] {n} buildings x {len(columns)} parameters pre-sampled.")
+    return matrix
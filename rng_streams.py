@@ -0,0 +1,208 @@
+"""
+rng_streams.py
+
+Deterministic, counter-based random streams for the parameter pickers.
+
+Before, every assign_* module called random.seed(random_seed) and drew from
+the global `random` module. The picks then depended on call order and
+process, and every building reseeded with 42 got the same values.
+
+Here each draw is a pure function of
+
+    (run seed, ogc_fid, module, parameter name, counter)
+
+The (run seed, module, parameter) triple is hashed once with BLAKE2b into a
+64-bit stream key; ogc_fid and counter are mixed into it with the splitmix64
+finalizer and the top 53 bits are scaled to [0, 1). As the mixing is plain
+64-bit integer arithmetic, uniform01_array() computes the same draws for a
+whole column of buildings at once with NumPy (see presample.py). The counter
+counts the draws of one parameter within one building, so repeated picks of
+the same parameter (e.g. per zone) still differ. Nothing depends on global
+state, so serial, multi-process and multi-node runs produce bit-identical
+parameters, and a building's picks do not change when other buildings are
+added, removed or processed in another order.
+
+Usage:
+    from rng_streams import BuildingRandom
+
+    rng = BuildingRandom(random_seed, bldg_id, "hvac")
+    value = rng.uniform(19.0, 21.0, "heating_day_setpoint")
+
+If run_seed is None, draws come from the global `random` module as before
+(non-reproducible runs).
+
+Inside `with capture_ranges() as draws:`, BuildingRandom.uniform() does not
+draw: it records (ogc_fid, module, param, counter, a, b) in draws and returns
+the midpoint, so a picker can be run only to find out which ranges it would
+draw from.
+
+Inside `with use_presampled(picks):`, BuildingRandom.uniform() returns the
+value pre-sampled for (ogc_fid, module, param, counter) by presample.py, so
+the builders take their picks from the parameter matrix. Draws the matrix
+does not hold (or holds outside the requested range) are drawn as usual.
+"""
+
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_SCALE = 1.0 / float(1 << 53)
+
+_capture = threading.local()
+_presampled = threading.local()
+
+
+@lru_cache(maxsize=4096)
+def stream_key(run_seed, module, param):
+    """64-bit key of the stream (run_seed, module, param)."""
+    digest = hashlib.blake2b(f"{run_seed}|{module}|{param}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def fid_key(ogc_fid):
+    """
+    64-bit key of a building id. Integral ids (also 17.0, as iterrows() may
+    return them) map to themselves, anything else is hashed.
+    """
+    if isinstance(ogc_fid, (int, np.integer)) and not isinstance(ogc_fid, bool):
+        return int(ogc_fid) & _MASK
+    if isinstance(ogc_fid, (float, np.floating)) and float(ogc_fid).is_integer():
+        return int(ogc_fid) & _MASK
+    digest = hashlib.blake2b(f"fid|{ogc_fid}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _mix64(z):
+    """splitmix64 finalizer on a Python int."""
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & _MASK
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & _MASK
+    return z ^ (z >> 31)
+
+
+def counter_uniform01(run_seed, ogc_fid, module, param, counter):
+    """
+    The counter-th draw in [0, 1) of the stream (run_seed, ogc_fid, module, param).
+    """
+    base = _mix64(stream_key(run_seed, module, param) ^ _mix64((fid_key(ogc_fid) + _GOLDEN) & _MASK))
+    return (_mix64((base + counter * _GOLDEN) & _MASK) >> 11) * _SCALE
+
+
+def _mix64_array(z):
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def uniform01_array(run_seed, ogc_fids, module, param, counter=0):
+    """
+    counter_uniform01 for many buildings at once: returns a float64 array with
+    one draw per entry of ogc_fids. counter may be a scalar or an array of the
+    same length.
+    """
+    fkeys = np.array([fid_key(f) for f in ogc_fids], dtype=np.uint64)
+    counters = np.asarray(counter, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        z = _mix64_array(fkeys + np.uint64(_GOLDEN))
+        base = _mix64_array(np.uint64(stream_key(run_seed, module, param)) ^ z)
+        z = _mix64_array(base + counters * np.uint64(_GOLDEN))
+    return (z >> np.uint64(11)).astype(np.float64) * _SCALE
+
+
+@contextmanager
+def capture_ranges():
+    """
+    Records the uniform draws requested in this thread instead of drawing
+    them; yields the list of (ogc_fid, module, param, counter, a, b).
+    """
+    previous = getattr(_capture, "draws", None)
+    _capture.draws = []
+    try:
+        yield _capture.draws
+    finally:
+        _capture.draws = previous
+
+
+@contextmanager
+def use_presampled(picks):
+    """
+    Makes BuildingRandom.uniform() in this thread return pre-sampled values:
+    picks is {fid_key(ogc_fid): {(module, param, counter): value}}
+    (presample.ParameterMatrix.picks), or None to draw as usual.
+    """
+    previous = getattr(_presampled, "picks", None)
+    _presampled.picks = picks
+    try:
+        yield
+    finally:
+        _presampled.picks = previous
+
+
+class BuildingRandom:
+    """
+    Random draws of one building in one module. Each parameter name is an
+    independent stream with its own draw counter.
+
+    run_seed : int or None
+    ogc_fid : building id (None => a site-level stream shared by all buildings)
+    module : str, e.g. "hvac", "dhw", "fenez"
+    """
+
+    def __init__(self, run_seed, ogc_fid, module):
+        self.run_seed = run_seed
+        self.ogc_fid = ogc_fid
+        self.module = module
+        self._counters = {}
+        picks = getattr(_presampled, "picks", None)
+        self._picks = picks.get(fid_key(ogc_fid)) if picks else None
+
+    def _next_counter(self, param):
+        n = self._counters.get(param, 0)
+        self._counters[param] = n + 1
+        return n
+
+    def _uniform01(self, param, counter):
+        if self.run_seed is None:
+            return random.random()
+        return counter_uniform01(self.run_seed, self.ogc_fid, self.module, param, counter)
+
+    def random(self, param=""):
+        return self._uniform01(param, self._next_counter(param))
+
+    def uniform(self, a, b, param=""):
+        draws = getattr(_capture, "draws", None)
+        if draws is not None:
+            draws.append((self.ogc_fid, self.module, param, self._next_counter(param), a, b))
+            return (a + b) / 2.0
+        counter = self._next_counter(param)
+        if self._picks is not None:
+            value = self._picks.get((self.module, param, counter))
+            if value is not None and min(a, b) - 1e-9 <= value <= max(a, b) + 1e-9:
+                return value
+        return a + (b - a) * self._uniform01(param, counter)
+
+    def choice(self, seq, param=""):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[min(int(self.random(param) * len(seq)), len(seq) - 1)]
+
+
+def draw_uniform(rng, a, b, param=""):
+    """
+    rng.uniform(a, b, param), or the global random.uniform when no stream is
+    given (callers outside IDF creation, e.g. the modification step).
+    """
+    if rng is None:
+        return random.uniform(a, b)
+    return rng.uniform(a, b, param)
+
+
+def draw_choice(rng, seq, param=""):
+    if rng is None:
+        return random.choice(seq)
+    return rng.choice(seq, param)
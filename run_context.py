@@ -0,0 +1,155 @@
+"""
+run_context.py
+
+Per-run settings and caches, so that several workflows can run in the same
+process without overwriting each other's module-level state.
+
+A RunContext carries:
+  - the EnergyPlus IDD path and base (minimal) IDF template,
+  - the output root and the folders derived from it
+    (output_IDFs, assigned logs, Sim_Results, merged results),
+  - a `cache` dict for per-run objects (e.g. the calibration surrogate
+    model and real data), instead of module-level globals.
+
+Usage:
+    from run_context import RunContext
+    ctx = RunContext(iddfile="...", idf_file_path="...", output_root="output/run_42")
+    create_idfs_for_all_buildings(df_buildings, ..., run_context=ctx)
+
+Runs of the job service get their own output root (output/runs/<run_id>,
+see main.build_run_context); rebase() moves the "output/..." paths of the
+stage configs into it, so concurrent runs never write to the same files.
+
+Note: eppy keeps the IDD as a class attribute (IDF.setiddname), so runs
+sharing one process must use the same IDD file; everything else is per run.
+"""
+
+import os
+import uuid
+
+# Output root of runs without an own folder; the paths in main_config.json are relative to it
+DEFAULT_OUTPUT_ROOT = "output"
+
+
+class RunContext:
+    """
+    run_id : str
+        Identifier of the run (random if not given).
+    iddfile : str
+        Path to the EnergyPlus Energy+.idd.
+    idf_file_path : str
+        Path to the minimal base IDF used as template for every building.
+    output_root : str
+        Root folder of all outputs of this run.
+    idf_output_dir : str or None
+        Folder for the generated IDFs (default: <output_root>/output_IDFs).
+    output_format : str
+        "idf" => models saved by eppy (idf.save), "epjson" => models written
+        as EnergyPlus epJSON (idf_objects/other/epjson_emitter.py).
+    epjson_schema : str or None
+        Path to Energy+.schema.epJSON (default: next to the IDD file).
+    epjson_verify : int
+        Number of buildings (by index) of an epjson run whose epJSON is
+        checked against their IDF with ConvertInputFormat (0 => none).
+    """
+
+    def __init__(
+        self,
+        run_id=None,
+        iddfile="D:/EnergyPlus/Energy+.idd",
+        idf_file_path="D:/Minimal.idf",
+        output_root="output",
+        idf_output_dir=None,
+        output_format="idf",
+        epjson_schema=None,
+        epjson_verify=0
+    ):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.iddfile = iddfile
+        self.idf_file_path = idf_file_path
+        self.output_root = output_root
+        self.idf_output_dir = idf_output_dir or os.path.join(output_root, "output_IDFs")
+        self.output_format = output_format
+        self._epjson_schema = epjson_schema
+        self.epjson_verify = epjson_verify
+        self.cache = {}
+
+    @classmethod
+    def from_idf_config(cls, idf_config, output_root="output", run_id=None):
+        """
+        Builds a context from an idf_creation.idf_config-style dict
+        ({"iddfile", "idf_file_path", "output_dir"}).
+        """
+        return cls(
+            run_id=run_id,
+            iddfile=idf_config.get("iddfile"),
+            idf_file_path=idf_config.get("idf_file_path"),
+            output_root=output_root,
+            idf_output_dir=idf_config.get("output_dir"),
+            output_format=idf_config.get("output_format", "idf"),
+            epjson_verify=idf_config.get("epjson_verify", 0)
+        )
+
+    def path(self, *parts):
+        """Path relative to the output root of this run."""
+        return os.path.join(self.output_root, *parts)
+
+    @property
+    def isolated(self):
+        """True if this run writes into its own folder instead of the shared "output"."""
+        return os.path.normpath(self.output_root) != DEFAULT_OUTPUT_ROOT
+
+    def rebase(self, path):
+        """
+        Moves a path this run writes (or reads back from an earlier stage of
+        the run) into its output root:
+          "output/<rest>" => <output_root>/<rest>
+          other relative paths => <output_root>/<path>
+        Absolute paths, paths already under the output root, and every path
+        of a run that writes to "output" itself are returned unchanged.
+        """
+        if not path or not self.isolated or os.path.isabs(path):
+            return path
+        norm = os.path.normpath(path)
+        root = os.path.normpath(self.output_root)
+        if norm == root or norm.startswith(root + os.sep):
+            return path
+        if norm == DEFAULT_OUTPUT_ROOT:
+            return self.output_root
+        if norm.startswith(DEFAULT_OUTPUT_ROOT + os.sep):
+            norm = norm[len(DEFAULT_OUTPUT_ROOT) + 1:]
+        return os.path.join(self.output_root, norm)
+
+    @property
+    def epjson_schema(self):
+        if self._epjson_schema:
+            return self._epjson_schema
+        return os.path.join(os.path.dirname(self.iddfile), "Energy+.schema.epJSON")
+
+    @epjson_schema.setter
+    def epjson_schema(self, value):
+        self._epjson_schema = value
+
+    @property
+    def assigned_dir(self):
+        return self.path("assigned")
+
+    @property
+    def sim_results_dir(self):
+        return self.path("Sim_Results")
+
+    @property
+    def results_dir(self):
+        return self.path("results")
+
+    def as_dict(self):
+        return {
+            "run_id": self.run_id,
+            "iddfile": self.iddfile,
+            "idf_file_path": self.idf_file_path,
+            "output_root": self.output_root,
+            "idf_output_dir": self.idf_output_dir,
+            "output_format": self.output_format,
+            "epjson_schema": self.epjson_schema,
+            "epjson_verify": self.epjson_verify
+        }
@@ -0,0 +1,183 @@
+"""
+run_journal.py
+
+Crash-safe journal of per-building progress, so an interrupted batch can be
+resumed without redoing finished work.
+
+The journal is an append-only JSON-lines file (one record per event, flushed
+and fsync'ed as it is written). A run killed half-way leaves at most one
+truncated last line, which is ignored when the journal is read back.
+
+Records:
+    {"event": "start", "attempt": 2, "ts": ...}
+    {"event": "idf",  "bldg": 17, "path": ".../building_17.idf", "sha256": "..."}
+    {"event": "sim",  "bldg": 17, "idf_sha256": "...", "epw": "...",
+     "output_dir": ".../2020", "exit_code": 0}
+    {"event": "post", "bldgs": [17, 18, ...]}
+
+With resume=True, a building is skipped only if its artifacts on disk still
+match the journal:
+  - IDF: the file exists and its SHA-256 equals the recorded one.
+  - simulation: exit code 0, the IDF is unchanged since it was simulated,
+    and simulation_bldg<idx>.csv exists in the recorded output folder.
+
+Usage:
+    journal = RunJournal("output/run_journal.jsonl", resume=True)
+    if not journal.idf_done(idx, idf_path):
+        ...create IDF...
+        journal.record_idf(idx, idf_path)
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RunJournal:
+    """
+    path : str
+        JSON-lines journal file.
+    resume : bool
+        False => start a fresh journal (the old file is discarded).
+        True  => replay the existing journal and keep appending to it.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._idf = {}
+        self._sim = {}
+        self._post = set()
+        self.attempt = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if resume and os.path.isfile(path):
+            self._replay()
+        elif os.path.isfile(path):
+            os.remove(path)
+
+        self.attempt += 1
+        self._append({"event": "start", "attempt": self.attempt})
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _replay(self):
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # truncated last line of a crashed run
+                self._apply(rec)
+
+        # Terminate a truncated last line so new records start on their own line
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def _apply(self, rec):
+        event = rec.get("event")
+        bldg = str(rec.get("bldg"))
+        if event == "start":
+            self.attempt = max(self.attempt, rec.get("attempt", 0))
+        elif event == "idf":
+            # (a changed IDF invalidates its simulation via the hash check in sim_done)
+            self._idf[bldg] = rec
+        elif event == "sim":
+            self._sim[bldg] = rec
+            self._post.discard(bldg)
+        elif event == "post":
+            self._post.update(str(b) for b in rec.get("bldgs", []))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _append(self, rec):
+        rec = dict(rec, ts=datetime.now().isoformat(timespec="seconds"))
+        line = json.dumps(rec, default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(rec)
+
+    def record_idf(self, bldg_idx, idf_path):
+        self._append({
+            "event": "idf",
+            "bldg": bldg_idx,
+            "path": idf_path,
+            "sha256": file_sha256(idf_path)
+        })
+
+    def record_sim(self, bldg_idx, idf_path, epw_path, output_dir, exit_code):
+        self._append({
+            "event": "sim",
+            "bldg": bldg_idx,
+            "idf_sha256": file_sha256(idf_path) if os.path.isfile(idf_path) else None,
+            "epw": epw_path,
+            "output_dir": output_dir,
+            "exit_code": exit_code
+        })
+
+    def record_post(self, bldg_indices):
+        """One record for all buildings merged in one go."""
+        self._append({"event": "post", "bldgs": list(bldg_indices)})
+
+    # ------------------------------------------------------------------
+    # Resume checks
+    # ------------------------------------------------------------------
+    def idf_done(self, bldg_idx, idf_path):
+        """True if the journal has this IDF and the file on disk is unchanged."""
+        if not self.resume:
+            return False
+        rec = self._idf.get(str(bldg_idx))
+        if rec is None or not os.path.isfile(idf_path):
+            return False
+        if os.path.abspath(rec.get("path", "")) != os.path.abspath(idf_path):
+            return False
+        return file_sha256(idf_path) == rec.get("sha256")
+
+    def sim_done(self, bldg_idx, idf_path, epw_path, output_dir):
+        """True if this building was simulated successfully with the same inputs."""
+        if not self.resume:
+            return False
+        rec = self._sim.get(str(bldg_idx))
+        if rec is None or rec.get("exit_code") != 0:
+            return False
+        if os.path.abspath(rec.get("output_dir", "")) != os.path.abspath(output_dir):
+            return False
+        if os.path.abspath(rec.get("epw") or "") != os.path.abspath(epw_path):
+            return False
+        if not os.path.isfile(idf_path) or file_sha256(idf_path) != rec.get("idf_sha256"):
+            return False
+        return os.path.isfile(os.path.join(output_dir, f"simulation_bldg{bldg_idx}.csv"))
+
+    def post_done(self, bldg_idx):
+        return self.resume and str(bldg_idx) in self._post
+
+    def summary(self):
+        return {
+            "attempt": self.attempt,
+            "idf": len(self._idf),
+            "sim_ok": sum(1 for r in self._sim.values() if r.get("exit_code") == 0),
+            "sim_failed": sum(1 for r in self._sim.values() if r.get("exit_code") != 0),
+            "post": len(self._post)
+        }
@@ -0,0 +1,304 @@
+"""
+shard_batch.py
+
+Splits a portfolio across machines: each machine runs shard k of N of
+df_buildings through IDF creation, simulation and post-processing into its
+own output root, and a merge step combines the shards afterwards.
+
+Buildings are assigned to shards by a stable hash (SHA-1, not Python's salted
+hash()) of one key per building:
+  - "ogc_fid"  : spreads buildings evenly (default)
+  - "epw"      : the EPW file the building will be simulated with, so one
+                 shard reads only a few weather files
+  - "postcode" : keeps neighbourhoods together
+
+The DataFrame index is kept, so building_<idx>.idf / simulation_bldg<idx>.csv
+names stay unique across shards and the merged outputs match a single run.
+
+Layout:
+    <shards_root>/shard-003-of-008/   # output root of shard 3 (output_IDFs,
+                                      # Sim_Results, results, param_log, assigned)
+
+Usage:
+    python shard_batch.py run --shard 3 --num-shards 8 --partition-by epw --workers 64
+    python shard_batch.py merge --num-shards 8 --output-root output
+
+The merge writes the same artifacts as a single run: results/<merged>.csv
+(merge_all_results format), assigned/assigned_*.csv (re-exported from the
+combined parameter logs), assigned/assigned_archetypes.csv and, if the
+shards pre-sampled their parameters, param_matrix.csv.
+"""
+
+import os
+import csv
+import glob
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+
+from param_log_store import export_legacy_csvs
+
+PARTITION_KEYS = ["ogc_fid", "epw", "postcode"]
+
+# Stages after IDF creation read / write fixed paths of main_config.json,
+# so shard runs skip them; run them once on the merged outputs instead.
+SHARD_SKIPPED_STAGES = {
+    "structuring": {"perform_structuring": False},
+    "modification": {"perform_modification": False},
+    "validation": {"perform_validation": False},
+    "sensitivity": {"perform_sensitivity": False},
+    "surrogate": {"perform_surrogate": False},
+    "calibration": {"perform_calibration": False}
+}
+
+
+def shard_dir(shards_root, shard, num_shards):
+    return os.path.join(shards_root, f"shard-{shard:03d}-of-{num_shards:03d}")
+
+
+def shard_of(key, num_shards):
+    """Stable shard number in [0, num_shards) of a partition key."""
+    digest = hashlib.sha1(str(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def partition_key(building_row, partition_by="ogc_fid"):
+    """
+    The value building_row is partitioned on. For "epw" this is the EPW file
+    picked from the lookup (user JSON overrides are not applied; any stable
+    key still gives a valid partition).
+    """
+    if partition_by == "epw":
+        from epw.assign_epw_file import assign_epw_for_building_with_overrides
+        return assign_epw_for_building_with_overrides(building_row)
+    if partition_by == "postcode":
+        return building_row.get("postcode")
+    return building_row.get("ogc_fid")
+
+
+def select_shard(df_buildings, shard, num_shards, partition_by="ogc_fid"):
+    """Rows of df_buildings that belong to shard (index preserved)."""
+    if partition_by not in PARTITION_KEYS:
+        raise ValueError(f"partition_by must be one of {PARTITION_KEYS}, got '{partition_by}'")
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+    if df_buildings.empty:
+        return df_buildings
+    mask = [
+        shard_of(partition_key(row, partition_by), num_shards) == shard
+        for _, row in df_buildings.iterrows()
+    ]
+    return df_buildings[mask]
+
+
+def run_shard(shard, num_shards, partition_by="ogc_fid", shards_root="output/shards", workers=None):
+    """
+    Runs IDF creation (+ simulation and post-processing, as configured in
+    main_config.json) for one shard, into shard_dir(shards_root, shard, num_shards).
+    """
+    from main import load_json, build_run_context, orchestrate_workflow
+
+    out_root = shard_dir(shards_root, shard, num_shards)
+    main_config = load_json(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         "user_configs", "main_config.json"))
+    run_context = build_run_context(main_config, output_root=out_root)
+
+    config_overrides = dict(SHARD_SKIPPED_STAGES)
+    config_overrides["stage_cache"] = {"cache_file": os.path.join(out_root, "stage_cache.json")}
+    config_overrides["metrics"] = {"report_dir": os.path.join(out_root, "metrics")}
+    if workers:
+        config_overrides["idf_creation"] = {"num_workers": workers, "idf_workers": workers}
+
+    def _filter(df_buildings):
+        df_shard = select_shard(df_buildings, shard, num_shards, partition_by)
+        logging.info(
+            f"[shard_batch] Shard {shard}/{num_shards} ({partition_by}) => "
+            f"{len(df_shard)} of {len(df_buildings)} buildings."
+        )
+        return df_shard
+
+    return orchestrate_workflow(
+        run_context=run_context,
+        building_filter=_filter,
+        config_overrides=config_overrides
+    )
+
+
+###############################################################################
+# Merge
+###############################################################################
+def _concat_csv_files(paths, out_path):
+    """
+    Concatenates CSVs with the same header, streaming row by row.
+    """
+    header = None
+    with open(out_path, "w", newline="") as out:
+        writer = csv.writer(out)
+        for path in paths:
+            with open(path, "r", newline="") as f:
+                reader = csv.reader(f)
+                file_header = next(reader, None)
+                if file_header is None:
+                    continue
+                if header is None:
+                    header = file_header
+                    writer.writerow(header)
+                elif file_header != header:
+                    raise ValueError(f"Column mismatch between {paths[0]} and {path}")
+                writer.writerows(reader)
+
+
+def _merge_result_csvs(paths, out_path):
+    """
+    Combines merged result CSVs (BuildingID, VariableName, <time columns>)
+    of several shards; time columns missing in a shard are left empty.
+    """
+    import pandas as pd
+
+    frames = [pd.read_csv(p) for p in paths]
+    columns = []
+    for df in frames:
+        columns += [c for c in df.columns if c not in columns]
+    final_df = pd.concat(frames, ignore_index=True)[columns]
+    final_df.sort_values(by=["BuildingID", "VariableName"], inplace=True)
+    final_df.to_csv(out_path, index=False)
+
+
+def merge_shards(num_shards, shards_root="output/shards", output_root="output"):
+    """
+    Combines the outputs of all shards into output_root:
+      - results/*.csv             : merged simulation results per output
+      - param_log/                : parameter log shards of every shard
+      - assigned/assigned_*.csv   : exported from the combined parameter log
+      - assigned/assigned_archetypes.csv
+      - param_matrix.csv / param_matrix_ranges.csv (if pre-sampled)
+      - lint_report.json (if the models were linted)
+
+    Returns {"shards": [...], "missing": [...], "outputs": [...]}.
+    """
+    shard_dirs = []
+    missing = []
+    for k in range(num_shards):
+        d = shard_dir(shards_root, k, num_shards)
+        if os.path.isdir(d):
+            shard_dirs.append(d)
+        else:
+            missing.append(k)
+    if missing:
+        logging.warning(f"[shard_batch] Missing shard outputs: {missing}")
+
+    outputs = []
+
+    # 1) Parameter logs: copy every shard file, prefixed with its shard dir
+    param_dir = os.path.join(output_root, "param_log")
+    os.makedirs(param_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(param_dir, "shard-*")):
+        os.remove(path)
+    for d in shard_dirs:
+        tag = os.path.basename(d)[len("shard-"):]  # e.g. "003-of-008"
+        for path in sorted(glob.glob(os.path.join(d, "param_log", "shard-*"))):
+            name = os.path.basename(path)[len("shard-"):]
+            shutil.copyfile(path, os.path.join(param_dir, f"shard-{tag}-{name}"))
+    assigned_dir = os.path.join(output_root, "assigned")
+    outputs += export_legacy_csvs(param_dir, assigned_dir)
+
+    # 2) Archetype logs
+    archetype_csvs = [
+        os.path.join(d, "assigned", "assigned_archetypes.csv") for d in shard_dirs
+        if os.path.isfile(os.path.join(d, "assigned", "assigned_archetypes.csv"))
+    ]
+    if archetype_csvs:
+        out_path = os.path.join(assigned_dir, "assigned_archetypes.csv")
+        _concat_csv_files(archetype_csvs, out_path)
+        outputs.append(out_path)
+
+    # 3) Pre-sampled parameter matrices (presample.py), if the shards wrote them
+    matrix_csvs = [
+        os.path.join(d, "param_matrix.csv") for d in shard_dirs
+        if os.path.isfile(os.path.join(d, "param_matrix.csv"))
+    ]
+    if matrix_csvs:
+        import pandas as pd
+
+        out_path = os.path.join(output_root, "param_matrix.csv")
+        # shards may draw different parameter sets => union of the columns
+        pd.concat([pd.read_csv(p, index_col="ogc_fid") for p in matrix_csvs]).to_csv(out_path)
+        ranges_path = os.path.join(output_root, "param_matrix_ranges.csv")
+        _concat_csv_files([p[:-4] + "_ranges.csv" for p in matrix_csvs], ranges_path)
+        outputs += [out_path, ranges_path]
+
+    # 3b) Pre-simulation lint reports (idf_objects/other/idf_linter.py)
+    lint_reports = [
+        os.path.join(d, "lint_report.json") for d in shard_dirs
+        if os.path.isfile(os.path.join(d, "lint_report.json"))
+    ]
+    if lint_reports:
+        models = []
+        for path in lint_reports:
+            with open(path, "r") as f:
+                models += json.load(f).get("models", [])
+        out_path = os.path.join(output_root, "lint_report.json")
+        with open(out_path, "w") as f:
+            json.dump({
+                "summary": {
+                    "checked": len(models),
+                    "rejected": sum(1 for m in models if not m.get("ok", True)),
+                    "warnings": sum(len(m.get("warnings", [])) for m in models)
+                },
+                "models": models
+            }, f, indent=2)
+        outputs.append(out_path)
+
+    # 4) Merged simulation results, by file name
+    result_files = {}
+    for d in shard_dirs:
+        for path in sorted(glob.glob(os.path.join(d, "results", "*.csv"))):
+            result_files.setdefault(os.path.basename(path), []).append(path)
+    results_dir = os.path.join(output_root, "results")
+    os.makedirs(results_dir, exist_ok=True)
+    for name, paths in sorted(result_files.items()):
+        out_path = os.path.join(results_dir, name)
+        _merge_result_csvs(paths, out_path)
+        outputs.append(out_path)
+
+    logging.info(f"[shard_batch] Merged {len(shard_dirs)}/{num_shards} shards into {output_root}.")
+    return {"shards": shard_dirs, "missing": missing, "outputs": outputs}
+
+
+###############################################################################
+# CLI
+###############################################################################
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one shard of the portfolio, or merge all shards.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run shard k of N")
+    p_run.add_argument("--shard", type=int, required=True, help="Shard number k (0-based)")
+    p_run.add_argument("--num-shards", type=int, required=True, help="Number of shards N")
+    p_run.add_argument("--partition-by", choices=PARTITION_KEYS, default="ogc_fid")
+    p_run.add_argument("--shards-root", default="output/shards")
+    p_run.add_argument("--workers", type=int, default=None,
+                       help="Simulation and IDF-creation processes (default: main_config.json)")
+
+    p_merge = sub.add_parser("merge", help="Combine the outputs of all shards")
+    p_merge.add_argument("--num-shards", type=int, required=True)
+    p_merge.add_argument("--shards-root", default="output/shards")
+    p_merge.add_argument("--output-root", default="output")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "run":
+        result = run_shard(args.shard, args.num_shards, args.partition_by, args.shards_root, args.workers)
+        print(result)
+    else:
+        result = merge_shards(args.num_shards, args.shards_root, args.output_root)
+        print(f"Merged {len(result['shards'])} shard(s); missing: {result['missing']}")
+        for path in result["outputs"]:
+            print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+stage_cache.py
+
+Content-hashed cache for the stages of orchestrate_workflow (main.py).
+
+Every stage is a node in STAGE_GRAPH. Its cache key is a SHA-256 over:
+  - the relevant main_config.json section(s),
+  - the content of its input files (user_configs/*.json, input CSVs, ...),
+  - any extra in-memory inputs (e.g. the buildings DataFrame),
+  - the output fingerprints last recorded for its upstream stages.
+
+If the key matches the one recorded after the last successful run, and the
+recorded outputs are still on disk unchanged, the stage is skipped and its
+outputs are reused. The cache table is a small JSON file:
+
+    {
+      "idf_creation": {
+          "key": "ab12...",
+          "outputs": ["output/output_IDFs", "output/assigned", ...],
+          "output_fingerprint": "cd34...",
+          "recorded_at": "2025-01-01T10:00:00"
+      },
+      ...
+    }
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+# Stage => upstream stages whose outputs it consumes
+STAGE_GRAPH = {
+    "idf_creation": [],
+    "structuring":  ["idf_creation"],
+    "modification": ["structuring"],
+    "validation":   ["modification"],
+    "sensitivity":  ["modification"],
+    "surrogate":    ["modification"],
+    "calibration":  ["sensitivity", "surrogate"]
+}
+
+
+def _hash_file(path, h, chunk_size=1 << 20):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+
+
+def fingerprint_paths(paths):
+    """
+    Returns a hex digest describing the current state of a list of paths.
+      - Files are hashed by content.
+      - Directories are hashed by (relative path, size, mtime) of every file
+        inside, which avoids re-reading gigabytes of simulation output.
+      - Missing paths contribute a "<missing>" marker.
+    """
+    h = hashlib.sha256()
+    for path in sorted(set(p for p in paths if p)):
+        h.update(path.encode("utf-8"))
+        if os.path.isfile(path):
+            _hash_file(path, h)
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for fname in sorted(files):
+                    fpath = os.path.join(root, fname)
+                    try:
+                        st = os.stat(fpath)
+                    except OSError:
+                        continue
+                    rel = os.path.relpath(fpath, path)
+                    h.update(f"{rel}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+        else:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    cache_path : str
+        JSON file holding the last recorded key + outputs per stage.
+    enabled : bool
+        If False, is_fresh() always returns False (every stage re-runs),
+        but record() still updates the table so later runs can use it.
+    force_stages : list of str
+        Stages that must re-run even when their key matches.
+    """
+
+    def __init__(self, cache_path="output/stage_cache.json", enabled=True, force_stages=None):
+        self.cache_path = cache_path
+        self.enabled = enabled
+        self.force_stages = set(force_stages or [])
+        self._records = {}
+        if os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self._records = json.load(f)
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"[StageCache] Ignoring unreadable cache {cache_path}: {e}")
+                self._records = {}
+
+    def _save(self):
+        folder = os.path.dirname(self.cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._records, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def stage_key(self, stage_name, config=None, input_paths=None, extra=None):
+        """
+        Computes the cache key for stage_name.
+
+        config      : dict (or any JSON-serializable) config section(s) of the stage
+        input_paths : list of files/folders the stage reads
+        extra       : optional bytes or str digest for in-memory inputs
+        """
+        h = hashlib.sha256()
+        h.update(stage_name.encode("utf-8"))
+        h.update(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+        h.update(fingerprint_paths(input_paths or []).encode("utf-8"))
+        if extra is not None:
+            h.update(extra if isinstance(extra, bytes) else str(extra).encode("utf-8"))
+
+        for upstream in STAGE_GRAPH.get(stage_name, []):
+            rec = self._records.get(upstream, {})
+            h.update(f"{upstream}:{rec.get('output_fingerprint', '')}".encode("utf-8"))
+        return h.hexdigest()
+
+    def is_fresh(self, stage_name, key):
+        """
+        True if the stage can be skipped: caching enabled, not forced, same key
+        as last time, and all recorded outputs still exist unchanged.
+        """
+        if not self.enabled or stage_name in self.force_stages:
+            return False
+        rec = self._records.get(stage_name)
+        if not rec or rec.get("key") != key:
+            return False
+        outputs = rec.get("outputs", [])
+        if not all(os.path.exists(p) for p in outputs):
+            return False
+        return fingerprint_paths(outputs) == rec.get("output_fingerprint")
+
+    def record(self, stage_name, key, output_paths):
+        """
+        Stores the key + output fingerprint after a successful stage run.
+        """
+        outputs = sorted(set(p for p in output_paths if p))
+        self._records[stage_name] = {
+            "key": key,
+            "outputs": outputs,
+            "output_fingerprint": fingerprint_paths(outputs),
+            "recorded_at": datetime.now().isoformat(timespec="seconds")
+        }
+        self._save()
+
+    def invalidate(self, stage_name):
+        """
+        Drops the cached record of stage_name and all stages downstream of it.
+        """
+        to_drop = {stage_name}
+        changed = True
+        while changed:
+            changed = False
+            for stage, ups in STAGE_GRAPH.items():
+                if stage not in to_drop and to_drop.intersection(ups):
+                    to_drop.add(stage)
+                    changed = True
+        for stage in to_drop:
+            self._records.pop(stage, None)
+        self._save()
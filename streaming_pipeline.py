@@ -0,0 +1,206 @@
+"""
+streaming_pipeline.py
+
+Pipelined create -> simulate -> post-process mode.
+
+In the default mode the stages are barriers: all IDFs are written, then all
+simulations run (pool.map), then merge_all_results walks the whole output
+tree. Here the three stages overlap:
+
+    [generator] --(bounded)--> [simulation pool] --> [post-process thread]
+
+  - The generator (caller's iterator) builds one IDF at a time and yields its
+    simulation task; it blocks once `max_pending` buildings are built but not
+    yet post-processed, so memory and disk in flight stay bounded.
+  - Each task is submitted to a multiprocessing Pool as soon as it is ready.
+  - Each finished simulation is read into the ResultMergers right away
+    (postproc/merge_results.py) and, optionally, its raw output files are
+    deleted.
+
+The makespan becomes roughly max(stage) instead of sum(stage).
+
+Usage:
+    summary = run_streaming_pipeline(
+        sim_tasks=my_task_generator(),       # yields (idf, epw, idd, out_dir, idx)
+        merge_outputs=[{"output_csv": "output/results/merged_as_is.csv"}],
+        num_workers=4,
+        max_pending=8
+    )
+"""
+
+import os
+import re
+import queue
+import logging
+import threading
+from multiprocessing import Pool
+
+from epw.run_epw_sims import run_simulation
+from postproc.merge_results import ResultMerger
+from metrics import track, add_items
+
+_STOP = object()
+
+
+def simulation_csv_path(output_dir, bldg_idx):
+    """The main results CSV written by run_simulation for one building."""
+    return os.path.join(output_dir, f"simulation_bldg{bldg_idx}.csv")
+
+
+def remove_simulation_outputs(output_dir, bldg_idx):
+    """
+    Deletes all files of one simulation (simulation_bldg<idx>*.*), keeping
+    other buildings' files (simulation_bldg<idx>0... is not matched).
+    """
+    pattern = re.compile(rf"^simulation_bldg{bldg_idx}(?!\d)")
+    if not os.path.isdir(output_dir):
+        return
+    for f in os.listdir(output_dir):
+        if pattern.match(f):
+            try:
+                os.remove(os.path.join(output_dir, f))
+            except OSError as e:
+                logging.warning(f"[streaming_pipeline] Could not remove {f}: {e}")
+
+
+def run_streaming_pipeline(
+    sim_tasks,
+    merge_outputs,
+    num_workers=4,
+    max_pending=None,
+    fanout_map=None,
+    cleanup_sim_outputs=False,
+    journal=None,
+    reuse_results=None
+):
+    """
+    Runs simulations as their tasks are produced and post-processes each one
+    as soon as it finishes.
+
+    Parameters
+    ----------
+    sim_tasks : iterable
+        Lazily produced (idf_path, epwfile, iddfile, output_dir, building_index)
+        tuples, same format as epw.run_epw_sims.generate_simulations.
+    merge_outputs : list of dict
+        One merged CSV per entry: {"output_csv", "convert_to_daily",
+        "convert_to_monthly", "aggregator"} (as in post_process_config["outputs"]).
+    num_workers : int
+        Simulation processes.
+    max_pending : int or None
+        Maximum buildings submitted but not yet post-processed
+        (default: 2 * num_workers).
+    fanout_map : dict or None
+        {simulated_bldg_id: [other bldg_ids]} applied before writing; may be
+        filled by the generator while it runs.
+    cleanup_sim_outputs : bool
+        Delete each building's raw simulation files once merged.
+    journal : RunJournal or None
+        Records each simulation's exit code and the merged buildings; in
+        resume mode, simulations still valid on disk are merged without
+        running them again.
+    reuse_results : set or None
+        Building indices unchanged since the last run (change_detection.py);
+        their existing results are merged without simulating them again.
+
+    Returns
+    -------
+    dict
+        {"submitted": n, "merged": n, "resumed": n, "outputs": [output_csv, ...]}
+    """
+    max_pending = max_pending or 2 * num_workers
+    mergers = [
+        (
+            item.get("output_csv", "output/results/merged_default.csv"),
+            ResultMerger(
+                convert_to_daily=item.get("convert_to_daily", False),
+                daily_aggregator=item.get("aggregator", "mean"),
+                convert_to_monthly=item.get("convert_to_monthly", False)
+            )
+        )
+        for item in merge_outputs
+    ]
+
+    slots = threading.BoundedSemaphore(max_pending)
+    finished = queue.Queue()
+    counts = {"submitted": 0, "merged": 0, "resumed": 0}
+
+    # 1) Post-process thread: consumes finished simulations in completion order
+    def _postprocess_worker():
+        while True:
+            task = finished.get()
+            if task is _STOP:
+                break
+            _, _, _, output_dir, bldg_idx = task
+            try:
+                csv_path = simulation_csv_path(output_dir, bldg_idx)
+                if os.path.isfile(csv_path):
+                    with track("pipeline.postprocess_building", items=1):
+                        for _, merger in mergers:
+                            merger.add_csv(csv_path, bldg_idx)
+                    counts["merged"] += 1
+                    if journal is not None:
+                        journal.record_post([bldg_idx])
+                else:
+                    logging.warning(f"[streaming_pipeline] No results for building {bldg_idx} in {output_dir}.")
+                if cleanup_sim_outputs:
+                    remove_simulation_outputs(output_dir, bldg_idx)
+            except Exception as e:
+                logging.error(f"[streaming_pipeline] Post-processing failed for building {bldg_idx}: {e}",
+                              exc_info=True)
+            finally:
+                slots.release()
+
+    def _on_simulated(task, exit_code):
+        if journal is not None:
+            journal.record_sim(task[4], task[0], task[1], task[3], exit_code)
+        finished.put(task)
+
+    consumer = threading.Thread(target=_postprocess_worker, name="pipeline-postprocess", daemon=True)
+    consumer.start()
+
+    # 2) Generator -> simulation pool (blocks while max_pending are in flight)
+    with track("pipeline.streaming", items=None):
+        with Pool(num_workers) as pool:
+            try:
+                for task in sim_tasks:
+                    slots.acquire()
+                    reused = (
+                        reuse_results is not None and task[4] in reuse_results
+                        and os.path.isfile(simulation_csv_path(task[3], task[4]))
+                    )
+                    if reused or (journal is not None and journal.sim_done(task[4], task[0], task[1], task[3])):
+                        # finished in an earlier attempt / run => only merge it
+                        counts["resumed"] += 1
+                        finished.put(task)
+                        continue
+                    counts["submitted"] += 1
+                    add_items(1)
+                    pool.apply_async(
+                        run_simulation,
+                        (task,),
+                        callback=lambda code, t=task: _on_simulated(t, code),
+                        error_callback=lambda e, t=task: _on_simulated(t, 1)
+                    )
+            finally:
+                pool.close()
+                pool.join()
+                finished.put(_STOP)
+                consumer.join()
+
+    # 3) Fan out archetype results and write the merged CSVs
+    outputs = []
+    for output_csv, merger in mergers:
+        merger.fan_out(fanout_map)
+        folder = os.path.dirname(output_csv)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        merger.write(output_csv)
+        outputs.append(output_csv)
+
+    logging.info(
+        f"[streaming_pipeline] {counts['submitted']} simulations submitted "
+        f"({counts['resumed']} reused from an earlier attempt), "
+        f"{counts['merged']} merged into {len(outputs)} output(s)."
+    )
+    return dict(counts, outputs=outputs)
@@ -0,0 +1,156 @@
+"""
+Equivalence of the epJSON emitter with the IDF path.
+
+The unit tests use a two-object schema and run anywhere. The end-to-end test
+builds a small model with eppy, writes it both ways and diffs the epJSON
+against EnergyPlus' own ConvertInputFormat conversion of the IDF; it needs
+eppy, the IDD (IDD_PATH, else main_config.json) with Energy+.schema.epJSON
+next to it, and ConvertInputFormat on the PATH.
+"""
+
+import io
+import json
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from idf_objects.other.epjson_emitter import (
+    _convert_value, default_schema_path, diff_epjson, idf_to_epjson, save_epjson, verify_epjson
+)
+
+SCHEMA = {
+    "properties": {
+        "Zone": {
+            "legacy_idd": {
+                "fields": ["name", "direction_of_relative_north", "multiplier"],
+                "field_info": {
+                    "direction_of_relative_north": {"field_type": "n"},
+                    "multiplier": {"field_type": "n"}
+                }
+            }
+        },
+        "BuildingSurface:Detailed": {
+            "legacy_idd": {
+                "fields": ["name", "surface_type", "zone_name", "number_of_vertices"],
+                "field_info": {
+                    "number_of_vertices": {"field_type": "n"},
+                    "vertex_x_coordinate": {"field_type": "n"},
+                    "vertex_y_coordinate": {"field_type": "n"},
+                    "vertex_z_coordinate": {"field_type": "n"}
+                },
+                "extensibles": ["vertex_x_coordinate", "vertex_y_coordinate", "vertex_z_coordinate"],
+                "extension": "vertices"
+            }
+        },
+        "SimulationControl": {
+            "legacy_idd": {
+                "fields": ["do_zone_sizing_calculation"],
+                "field_info": {}
+            }
+        }
+    }
+}
+
+
+def _model(objects):
+    """Stand-in for an eppy IDF: idfobjects of objects with an .obj list."""
+    idfobjects = {}
+    for values in objects:
+        idfobjects.setdefault(values[0].upper(), []).append(SimpleNamespace(obj=list(values)))
+    return SimpleNamespace(idfobjects=idfobjects)
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    path = tmp_path / "Energy+.schema.epJSON"
+    path.write_text(json.dumps(SCHEMA))
+    return str(path)
+
+
+def test_convert_value():
+    assert _convert_value("3", True) == 3
+    assert _convert_value("3.0", True) == 3.0
+    assert _convert_value(2.5, True) == 2.5
+    assert _convert_value("Autosize", True) == "Autosize"
+    assert _convert_value("  ", True) is None
+    assert _convert_value(12, False) == "12"
+
+
+def test_idf_to_epjson_fields_and_extensibles(schema_path):
+    model = _model([
+        ["ZONE", "Zone1", "0", "3"],
+        ["BUILDINGSURFACE:DETAILED", "Zone1_Wall_1", "Wall", "Zone1", "",
+         0, 0, 3, 0, 0, 0, 10, 0, 0, 10, 0, 3],
+        ["SIMULATIONCONTROL", "Yes"],
+    ])
+    out = idf_to_epjson(model, schema_path)
+
+    assert out["Zone"] == {"Zone1": {"direction_of_relative_north": 0, "multiplier": 3}}
+    wall = out["BuildingSurface:Detailed"]["Zone1_Wall_1"]
+    assert "number_of_vertices" not in wall
+    assert wall["vertices"][1] == {"vertex_x_coordinate": 0, "vertex_y_coordinate": 0, "vertex_z_coordinate": 0}
+    assert len(wall["vertices"]) == 4
+    assert out["SimulationControl"] == {"SimulationControl 1": {"do_zone_sizing_calculation": "Yes"}}
+
+
+def test_idf_to_epjson_unknown_type(schema_path):
+    with pytest.raises(KeyError):
+        idf_to_epjson(_model([["LIGHTS", "L1"]]), schema_path)
+
+
+def test_diff_epjson():
+    expected = {"Zone": {"ZONE1": {"multiplier": 3, "vertices": [{"x": 1.0}]}}}
+    assert diff_epjson(expected, {"Zone": {"Zone1": {"multiplier": 3.0000000001, "vertices": [{"x": 1}]}}}) == []
+    diffs = diff_epjson(expected, {"Zone": {"Zone1": {"multiplier": 2, "vertices": []}}})
+    assert any("multiplier" in d for d in diffs)
+    assert any("length differs" in d for d in diffs)
+
+
+###############################################################################
+# End-to-end: eppy model => IDF + epJSON => ConvertInputFormat diff
+###############################################################################
+def _iddfile():
+    iddfile = os.environ.get("IDD_PATH")
+    if not iddfile:
+        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "user_configs", "main_config.json")
+        with open(config_path, "r") as f:
+            iddfile = json.load(f)["idf_creation"]["iddfile"]
+    return iddfile
+
+
+def test_epjson_matches_converted_idf(tmp_path):
+    eppy_modeleditor = pytest.importorskip("eppy.modeleditor")
+    iddfile = _iddfile()
+    if not os.path.isfile(iddfile) or not os.path.isfile(default_schema_path(iddfile)):
+        pytest.skip("EnergyPlus IDD / Energy+.schema.epJSON not found")
+    if not shutil.which("ConvertInputFormat"):
+        pytest.skip("ConvertInputFormat not on the PATH")
+
+    IDF = eppy_modeleditor.IDF
+    try:
+        IDF.setiddname(iddfile)
+    except eppy_modeleditor.IDDAlreadySetError:
+        pass
+
+    # Built the way the idf_objects builders do: newidfobject + field setattr
+    idf = IDF(io.StringIO("Version, 22.2;"))
+    idf.newidfobject("BUILDING", Name="Sample_Building_0", North_Axis=30)
+    idf.newidfobject("ZONE", Name="Zone1", Multiplier=3)
+    wall = idf.newidfobject(
+        "BUILDINGSURFACE:DETAILED", Name="Zone1_Wall_1", Surface_Type="Wall",
+        Construction_Name="Ext_Walls1C", Zone_Name="Zone1", Outside_Boundary_Condition="Outdoors"
+    )
+    for n, (x, y, z) in enumerate([(0, 0, 3), (0, 0, 0), (10.5, 0, 0), (10.5, 0, 3)], start=1):
+        setattr(wall, f"Vertex_{n}_Xcoordinate", x)
+        setattr(wall, f"Vertex_{n}_Ycoordinate", y)
+        setattr(wall, f"Vertex_{n}_Zcoordinate", z)
+    sched = idf.newidfobject("SCHEDULE:COMPACT", Name="AlwaysOnSched", Schedule_Type_Limits_Name="Fraction")
+    sched.Field_1 = "Through: 12/31"
+    sched.Field_2 = "For: AllDays"
+    sched.Field_3 = "Until: 24:00"
+    sched.Field_4 = 1.0
+
+    epjson_path = save_epjson(idf, str(tmp_path / "building_0.epJSON"), default_schema_path(iddfile))
+    assert verify_epjson(idf, epjson_path) == []
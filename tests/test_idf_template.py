@@ -0,0 +1,51 @@
+"""
+Template snapshots hand out clones that match a fresh parse of the template
+and do not share state. Uses the IDD and small IDF that ship with eppy.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("geomeppy")
+
+import eppy
+from geomeppy import IDF
+
+from idf_objects.other.idf_template import clear_snapshots, get_base_snapshot
+
+RESOURCES = os.path.join(os.path.dirname(eppy.__file__), "resources")
+IDDFILE = os.path.join(RESOURCES, "iddfiles", "Energy+V9_2_0.idd")
+IDFFILE = os.path.join(RESOURCES, "idffiles", "V9_2", "smallfile.idf")
+
+
+@pytest.fixture
+def snapshot():
+    if not (os.path.isfile(IDDFILE) and os.path.isfile(IDFFILE)):
+        pytest.skip("eppy resources not found")
+    if IDF.iddname not in (None, IDDFILE):
+        pytest.skip("another IDD is already set for this process")
+    clear_snapshots()
+    yield get_base_snapshot(IDDFILE, IDFFILE)
+    clear_snapshots()
+
+
+def test_clone_matches_parse(snapshot):
+    assert snapshot.new_idf().idfstr() == IDF(IDFFILE).idfstr()
+
+
+def test_clones_are_independent(snapshot):
+    text = snapshot.idf_text
+    first = snapshot.new_idf()
+    first.newidfobject("ZONE", Name="Zone1")
+    first.idfobjects["BUILDING"][0].Name = "Changed"
+
+    second = snapshot.new_idf()
+    assert second.idfstr() == text
+    assert snapshot.idf_text == text
+    assert len(second.idfobjects["ZONE"]) == len(first.idfobjects["ZONE"]) - 1
+
+
+def test_clone_does_not_save_over_template(snapshot):
+    with pytest.raises(Exception):
+        snapshot.new_idf().save()